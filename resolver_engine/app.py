@@ -1,19 +1,24 @@
 import json
 import os
 import time
+from contextlib import asynccontextmanager
+from pathlib import Path
 from string import Template
-from typing import Any, Callable
+from typing import Any, AsyncIterator, Callable, Iterator, Mapping
 
 import duckdb
 
 from fastapi import Depends, FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse, PlainTextResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
 
-from .core.schema import FACT_SCHEMAS
+from .core.cost_model import COST_MODEL
+from .core.schema import FACT_SCHEMAS, FactSchema
 from .core.merge import merge_outputs
-from .core.resolver_base import RESOLVER_REGISTRY, ResolverOutput
+from .core.registry import RegistrySnapshot
+from .core.resolver_base import RESOLVER_REGISTRY, BaseResolver, ResolverOutput
 from .core.state import ResolutionContext
-from .core.planner import Planner
+from .core.plan_cache import PlanCache
+from .core.planner import FactEvent, Planner, PlannerResult
 
 _rate_buckets: dict[str, list[float]] = {}
 
@@ -79,7 +84,22 @@ def _register_demo_data() -> None:
     register_support_resolvers()
 
 
-def create_app(rate_limit_per_minute: int = 60, include_demo_data: bool = False) -> FastAPI:
+def create_app(
+    rate_limit_per_minute: int = 60,
+    include_demo_data: bool = False,
+    learned_costs: bool = False,
+    cost_model_path: str | Path | None = None,
+    registry: RegistrySnapshot | None = None,
+    optimal: bool = False,
+) -> FastAPI:
+    """Build the API app.
+
+    Without ``registry`` the endpoints read the live module-level registries; with a
+    compiled :class:`RegistrySnapshot` they only ever see that snapshot, so several
+    apps (tenants) with different resolvers can share one process. ``optimal``
+    switches every endpoint to the cost-optimal planner.
+    """
+
     _rate_buckets.clear()
 
     include_demo_env = os.getenv("RESOLVER_INCLUDE_DEMO_DATA")
@@ -89,7 +109,23 @@ def create_app(rate_limit_per_minute: int = 60, include_demo_data: bool = False)
     if include_demo_data:
         _register_demo_data()
 
-    app = FastAPI()
+    cost_model_env = os.getenv("RESOLVER_COST_MODEL_PATH")
+    if cost_model_env:
+        cost_model_path = cost_model_env
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        # Persisted estimates let a restarted worker schedule with warm costs.
+        if cost_model_path is not None:
+            COST_MODEL.load(Path(cost_model_path))
+        yield
+        if cost_model_path is not None:
+            COST_MODEL.save(Path(cost_model_path))
+
+    app = FastAPI(lifespan=lifespan)
+    plan_cache = PlanCache()
+    schemas: Mapping[Any, FactSchema] = FACT_SCHEMAS if registry is None else registry.schemas
+    resolver_registry: Mapping[str, BaseResolver] = RESOLVER_REGISTRY if registry is None else registry.resolvers
 
     @app.get("/health")
     def health() -> dict[str, str]:
@@ -102,31 +138,118 @@ def create_app(rate_limit_per_minute: int = 60, include_demo_data: bool = False)
                 "description": schema.description,
                 "type": schema.py_type.__name__,
             }
-            for fid, schema in FACT_SCHEMAS.items()
+            for fid, schema in schemas.items()
         }
 
-    @app.post("/api/run", dependencies=[Depends(_check_rate_limit(rate_limit_per_minute))])
-    def run(body: dict[str, Any]) -> dict[str, Any]:
-        def resolve_fact_id(identifier: object) -> object:
-            for fid in FACT_SCHEMAS.keys():
-                if str(fid) == str(identifier):
-                    return fid
-            return identifier
+    def resolve_fact_id(identifier: object) -> object:
+        if registry is not None:
+            return registry.resolve_fact_id(identifier)
+        for fid in FACT_SCHEMAS.keys():
+            if str(fid) == str(identifier):
+                return fid
+        return identifier
 
+    def build_request(body: dict[str, Any]) -> tuple[ResolutionContext, set[object]]:
         inputs = {resolve_fact_id(k): v for k, v in body.get("inputs", {}).items()}
         required = {resolve_fact_id(fid) for fid in body.get("required_facts", [])}
         ctx = ResolutionContext()
         merge_outputs(
             ctx,
             [ResolverOutput(fact_id, value, source="input") for fact_id, value in inputs.items()],
+            schemas,
         )
-        planner = Planner(required_facts=required, user_priority={})
-        result = planner.run(ctx)
+        return ctx, required
+
+    def build_planner(body: dict[str, Any], required: set[object]) -> Planner:
+        deadline_ms = body.get("deadline_ms")
+        if deadline_ms is not None and (
+            isinstance(deadline_ms, bool) or not isinstance(deadline_ms, (int, float)) or not deadline_ms >= 0
+        ):
+            raise HTTPException(status_code=422, detail="deadline_ms must be a non-negative number")
+        return Planner(
+            required_facts=required,
+            user_priority={},
+            plan_cache=plan_cache,
+            optimal=optimal,
+            learned_costs=learned_costs,
+            deadline_ms=float(deadline_ms) if deadline_ms is not None else None,
+            registry=registry,
+        )
+
+    def run_summary(result: PlannerResult) -> dict[str, Any]:
+        return {
+            "trace": result.executed_resolvers,
+            "unresolved_facts": [getattr(fid, "value", str(fid)) for fid in result.unresolved_facts],
+            "timed_out": result.timed_out_resolvers,
+            "skipped": result.skipped_resolvers,
+        }
+
+    @app.post("/api/run", dependencies=[Depends(_check_rate_limit(rate_limit_per_minute))])
+    async def run(body: dict[str, Any]) -> dict[str, Any]:
+        ctx, required = build_request(body)
+        result = await build_planner(body, required).arun(ctx)
         facts = {
             getattr(fid, "value", str(fid)): _normalize_json_value(fv.value)
             for fid, fv in ctx.state.items()
         }
-        return {"facts": facts, "trace": result.executed_resolvers}
+        return {"facts": facts, **run_summary(result)}
+
+    @app.post("/api/run/stream", dependencies=[Depends(_check_rate_limit(rate_limit_per_minute))])
+    def run_stream(body: dict[str, Any], request: Request) -> StreamingResponse:
+        """Stream each fact as it resolves: NDJSON by default, Server-Sent Events when requested.
+
+        Every resolved fact is a ``fact`` event; a final ``done`` event carries the
+        same trace and unresolved/timed-out/skipped lists as ``/api/run``.
+        """
+
+        ctx, required = build_request(body)
+        planner = build_planner(body, required)
+        sse = "text/event-stream" in request.headers.get("accept", "")
+
+        def encode(event: str, payload: dict[str, Any]) -> str:
+            if sse:
+                return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+            return json.dumps({"event": event, **payload}) + "\n"
+
+        def fact_payload(event: FactEvent) -> dict[str, Any]:
+            return {
+                "fact": getattr(event.fact_id, "value", str(event.fact_id)),
+                "value": _normalize_json_value(event.value.value),
+                "status": event.value.status.value,
+                "provenance": list(event.value.provenance),
+                "resolver": event.resolver,
+            }
+
+        def events() -> Iterator[str]:
+            stream = planner.iter_run(ctx)
+            while True:
+                try:
+                    event = next(stream)
+                except StopIteration as stop:
+                    yield encode("done", run_summary(stop.value))
+                    return
+                yield encode("fact", fact_payload(event))
+
+        media_type = "text/event-stream" if sse else "application/x-ndjson"
+        return StreamingResponse(events(), media_type=media_type)
+
+    @app.post("/api/plan", dependencies=[Depends(_check_rate_limit(rate_limit_per_minute))])
+    def plan(body: dict[str, Any]) -> dict[str, Any]:
+        """Dry run: report the plan ``/api/run`` would follow, its estimated cost and predicted cache hits."""
+
+        ctx, required = build_request(body)
+        planner = build_planner(body, required)
+        execution_plan = planner.compile_plan(ctx.state.keys(), staged=True)
+        return {
+            "plan": [list(stage) for stage in execution_plan.stages],
+            "estimated_cost": execution_plan.estimated_cost,
+            "predicted_cache_hits": planner.predict_cache_hits(ctx, execution_plan),
+            "relevant_resolvers": (
+                None
+                if execution_plan.relevant_resolvers is None
+                else list(execution_plan.relevant_resolvers)
+            ),
+        }
 
     @app.get("/api/explain")
     def explain() -> dict[str, list[dict[str, Any]]]:
@@ -145,7 +268,7 @@ def create_app(rate_limit_per_minute: int = 60, include_demo_data: bool = False)
                 },
                 "cost": resolver.spec.cost,
             }
-            for resolver in sorted(RESOLVER_REGISTRY.values(), key=lambda r: r.spec.name)
+            for resolver in sorted(resolver_registry.values(), key=lambda r: r.spec.name)
         ]
 
         return {"resolvers": resolvers}
@@ -153,7 +276,7 @@ def create_app(rate_limit_per_minute: int = 60, include_demo_data: bool = False)
     @app.get("/", response_class=HTMLResponse)
     def index() -> str:
         inputs_html = "".join(
-            f"<label>{fid}<input name='{fid}' /></label>" for fid in FACT_SCHEMAS.keys()
+            f"<label>{fid}<input name='{fid}' /></label>" for fid in schemas.keys()
         )
         return f"<html><body><form>{inputs_html}</form></body></html>"
 
@@ -1,9 +1,15 @@
 from .schema import FactSchema, register_fact_schema, FACT_SCHEMAS
-from .types import FactStatus, FactValue
+from .types import CandidateList, FactStatus, FactValue, Provenance
 from .state import ResolutionContext
-from .resolver_base import BaseResolver, ResolverSpec, ResolverOutput, RESOLVER_REGISTRY
-from .merge import merge_outputs
-from .planner import Planner
+from .resolver_base import AsyncBaseResolver, BaseResolver, ResolverSpec, ResolverOutput, RESOLVER_REGISTRY
+from .merge import merge_outputs, merge_outputs_bulk
+from .planner import FactEvent, Planner
+from .batch import BatchPlanner
+from .columnar import ColumnarContext, RowContext
+from .cost_model import COST_MODEL, CostModel
+from .process_pool import configure_process_pool, shutdown_process_pool
+from .plan_cache import ExecutionPlan, PlanCache
+from .registry import Registry, RegistrySnapshot
 
 __all__ = [
     "FactSchema",
@@ -11,11 +17,27 @@ __all__ = [
     "FACT_SCHEMAS",
     "FactStatus",
     "FactValue",
+    "CandidateList",
+    "Provenance",
     "ResolutionContext",
     "BaseResolver",
+    "AsyncBaseResolver",
     "ResolverSpec",
     "ResolverOutput",
     "RESOLVER_REGISTRY",
+    "Registry",
+    "RegistrySnapshot",
     "merge_outputs",
+    "merge_outputs_bulk",
     "Planner",
+    "FactEvent",
+    "BatchPlanner",
+    "ColumnarContext",
+    "RowContext",
+    "ExecutionPlan",
+    "PlanCache",
+    "COST_MODEL",
+    "CostModel",
+    "configure_process_pool",
+    "shutdown_process_pool",
 ]
@@ -0,0 +1,76 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence, Set
+
+from .planner import Planner, PlannerResult
+from .registry import RegistrySnapshot
+from .state import ResolutionContext
+
+
+@dataclass
+class BatchPlannerResult:
+    results: List[PlannerResult] = field(default_factory=list)
+    waves: List[List[str]] = field(default_factory=list)
+
+
+class BatchPlanner:
+    """Advance many independent contexts in lockstep with one resolver call per wave.
+
+    Every context makes the same picks :meth:`Planner.run` would make for it alone.
+    Each wave takes the next pick of every unfinished context and groups the
+    contexts by resolver, so a resolver runs once per wave through
+    ``execute_batch``/``run_batch`` instead of once per context.
+    """
+
+    def __init__(
+        self,
+        required_facts: Set[Any],
+        user_priority: Dict[Any, float],
+        incremental: bool = False,
+        prune: bool = True,
+        learned_costs: bool = False,
+        registry: RegistrySnapshot | None = None,
+    ):
+        self.planner = Planner(
+            required_facts,
+            user_priority,
+            incremental=incremental,
+            prune=prune,
+            learned_costs=learned_costs,
+            registry=registry,
+        )
+
+    def run(self, contexts: Sequence[ResolutionContext]) -> BatchPlannerResult:
+        planner = self.planner
+        batch = BatchPlannerResult()
+        queues = []
+        for ctx in contexts:
+            relevant = planner._candidates(ctx)
+            batch.results.append(PlannerResult(relevant_resolvers=relevant))
+            queues.append(planner._queue(ctx, relevant))
+        active = list(range(len(contexts)))
+
+        while active:
+            groups: Dict[str, List[int]] = {}
+            still_active: List[int] = []
+            for index in active:
+                if planner._required_satisfied(contexts[index]):
+                    continue
+                name = queues[index].pop()
+                if name is None:
+                    continue
+                groups.setdefault(name, []).append(index)
+                still_active.append(index)
+            active = still_active
+            if not groups:
+                break
+
+            for name, indices in groups.items():
+                resolver = planner.resolvers[name]
+                group = [contexts[index] for index in indices]
+                new_facts = planner._merge_batch(group, resolver.execute_batch(group), name)
+                for index, added in zip(indices, new_facts):
+                    queues[index].facts_added(added)
+                    batch.results[index].executed_resolvers.append(name)
+            batch.waves.append(list(groups))
+
+        return batch
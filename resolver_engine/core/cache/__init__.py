@@ -1,4 +1,6 @@
+from .fingerprint import fingerprint, register_hasher
 from .sqlite_cache import SQLiteCachePolicy
 from .parquet_cache import ParquetCachePolicy
+from .tiered_cache import TieredCachePolicy
 
-__all__ = ["SQLiteCachePolicy", "ParquetCachePolicy"]
+__all__ = ["SQLiteCachePolicy", "ParquetCachePolicy", "TieredCachePolicy", "fingerprint", "register_hasher"]
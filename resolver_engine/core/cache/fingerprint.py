@@ -0,0 +1,250 @@
+"""Fixed-size content digests of fact values, used to build cache keys.
+
+Every value is fed into a BLAKE2b hash by the hasher registered for its type
+(looked up along the MRO), with a tag and length prefix so that values of
+different types or shapes never share a byte stream. Arrow data is hashed
+buffer by buffer without copying. Parquet files are keyed by path, mtime, size
+and footer. DuckDB relations are keyed by their normalized SQL, plus the
+fingerprints of any Parquet files they scan, and by content when the SQL only
+names in-memory objects. Dataclasses and other objects without a hasher are
+hashed field by field; anything else raises ``TypeError``. Digests are memoized
+on ``FactValue``, so each fact is hashed at most once.
+"""
+
+import dataclasses
+import hashlib
+import os
+import re
+import struct
+from enum import Enum
+from pathlib import PurePath
+from typing import Any, Callable, Dict, List, Tuple
+
+import duckdb
+import pyarrow as pa
+
+from ..resolver_base import ResolverSpec
+from ..types import FactValue
+
+DIGEST_SIZE = 16
+
+Hasher = Callable[[Any, Any], None]
+_HASHERS: Dict[type, Hasher] = {}
+
+_ALIAS = re.compile(r"\b(unnamed_relation|arrow_object|parquet)_[0-9a-f]{16}\b")
+_PARQUET_SCAN = re.compile(r"parquet_scan\(\[([^\]]*)\]")
+_QUOTED = re.compile(r"'((?:[^']|'')*)'")
+# SQL that points at process memory instead of describing the data
+_IN_MEMORY = ("arrow_scan(0x", "ColumnDataCollection", "pandas_scan(0x")
+
+
+def register_hasher(cls: type) -> Callable[[Hasher], Hasher]:
+    """Register ``hasher(value, h)`` to feed values of ``cls`` (and subclasses) into ``h``."""
+
+    def decorator(hasher: Hasher) -> Hasher:
+        _HASHERS[cls] = hasher
+        return hasher
+
+    return decorator
+
+
+def _hasher_for(cls: type) -> Hasher | None:
+    for base in cls.__mro__:
+        hasher = _HASHERS.get(base)
+        if hasher is not None:
+            return hasher
+    return None
+
+
+def _tagged(h: Any, tag: bytes, payload: bytes) -> None:
+    h.update(tag)
+    h.update(struct.pack("<Q", len(payload)))
+    h.update(payload)
+
+
+def feed(value: Any, h: Any) -> None:
+    hasher = _hasher_for(type(value))
+    if hasher is not None:
+        hasher(value, h)
+    elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+        _hash_fields(value, [(field.name, getattr(value, field.name)) for field in dataclasses.fields(value)], h)
+    elif hasattr(value, "__dict__") and not isinstance(value, type):
+        _hash_fields(value, sorted(vars(value).items()), h)
+    else:
+        raise TypeError(f"Cannot fingerprint {type(value).__name__}; register a hasher for it")
+
+
+def _hash_fields(value: Any, fields: List[Tuple[str, Any]], h: Any) -> None:
+    _tagged(h, b"O", f"{type(value).__module__}.{type(value).__qualname__}".encode())
+    h.update(struct.pack("<Q", len(fields)))
+    for name, item in fields:
+        _tagged(h, b"K", name.encode())
+        feed(item, h)
+
+
+def fingerprint(value: Any) -> bytes:
+    h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    feed(value, h)
+    return h.digest()
+
+
+def fact_fingerprint(fact: FactValue) -> bytes:
+    """Digest of ``fact.value``, computed once and kept until the value is replaced."""
+
+    memo = fact._digest
+    if memo is not None and memo[0] is fact.value:
+        return memo[1]
+    digest = fingerprint(fact.value)
+    fact._digest = (fact.value, digest)
+    return digest
+
+
+def cache_key(ctx: Any, spec: ResolverSpec) -> str:
+    """Hex digest of the resolver name and the fingerprints of its available inputs."""
+
+    h = hashlib.blake2b(spec.name.encode(), digest_size=DIGEST_SIZE)
+    for fid in sorted(spec.input_facts, key=str):
+        if fid in ctx.state:
+            _tagged(h, b"F", str(fid).encode())
+            h.update(fact_fingerprint(ctx.state[fid]))
+    return h.hexdigest()
+
+
+@register_hasher(type(None))
+def _hash_none(value: None, h: Any) -> None:
+    h.update(b"N")
+
+
+@register_hasher(bool)
+def _hash_bool(value: bool, h: Any) -> None:
+    h.update(b"T" if value else b"F")
+
+
+@register_hasher(int)
+def _hash_int(value: int, h: Any) -> None:
+    _tagged(h, b"I", str(value).encode())
+
+
+@register_hasher(float)
+def _hash_float(value: float, h: Any) -> None:
+    h.update(b"D" + struct.pack("<d", value))
+
+
+@register_hasher(str)
+def _hash_str(value: str, h: Any) -> None:
+    if value.endswith(".parquet") and os.path.isfile(value):
+        _hash_parquet_file(value, h)
+    else:
+        _tagged(h, b"S", value.encode("utf-8", "surrogatepass"))
+
+
+@register_hasher(bytes)
+def _hash_bytes(value: bytes, h: Any) -> None:
+    _tagged(h, b"B", value)
+
+
+@register_hasher(Enum)
+def _hash_enum(value: Enum, h: Any) -> None:
+    _tagged(h, b"E", f"{type(value).__module__}.{type(value).__qualname__}".encode())
+    feed(value.value, h)
+
+
+@register_hasher(list)
+@register_hasher(tuple)
+def _hash_sequence(value: Any, h: Any) -> None:
+    h.update(b"L" + struct.pack("<Q", len(value)))
+    for item in value:
+        feed(item, h)
+
+
+@register_hasher(dict)
+def _hash_dict(value: Dict[Any, Any], h: Any) -> None:
+    # order-insensitive, like dict equality
+    pairs = sorted(fingerprint(key) + fingerprint(item) for key, item in value.items())
+    h.update(b"M" + struct.pack("<Q", len(pairs)))
+    for pair in pairs:
+        h.update(pair)
+
+
+@register_hasher(set)
+@register_hasher(frozenset)
+def _hash_set(value: Any, h: Any) -> None:
+    items = sorted(fingerprint(item) for item in value)
+    h.update(b"U" + struct.pack("<Q", len(items)))
+    for item in items:
+        h.update(item)
+
+
+def _hash_parquet_file(path: Any, h: Any) -> None:
+    resolved = os.path.realpath(path)
+    stat = os.stat(resolved)
+    _tagged(h, b"Q", resolved.encode())
+    h.update(struct.pack("<qq", stat.st_mtime_ns, stat.st_size))
+    with open(resolved, "rb") as handle:
+        handle.seek(-8, os.SEEK_END)
+        length = struct.unpack("<I", handle.read(4))[0]
+        handle.seek(-8 - length, os.SEEK_END)
+        _tagged(h, b"O", handle.read(length))
+
+
+@register_hasher(PurePath)
+def _hash_path(value: PurePath, h: Any) -> None:
+    if value.suffix == ".parquet" and os.path.isfile(value):
+        _hash_parquet_file(value, h)
+    else:
+        _tagged(h, b"p", str(value).encode())
+
+
+def _hash_array(array: Any, h: Any) -> None:
+    if isinstance(array, pa.DictionaryArray):
+        h.update(b"d")
+        _hash_array(array.indices, h)
+        _hash_array(array.dictionary, h)
+        return
+    _tagged(h, b"A", str(array.type).encode())
+    h.update(struct.pack("<qqq", len(array), array.offset, array.null_count))
+    for buffer in array.buffers():
+        if buffer is None:
+            h.update(b"-")
+        else:
+            # pa.Buffer exposes the buffer protocol, so this hashes in place
+            h.update(struct.pack("<Q", buffer.size))
+            h.update(buffer)
+
+
+@register_hasher(pa.Array)
+def _hash_arrow_array(value: pa.Array, h: Any) -> None:
+    _hash_array(value, h)
+
+
+@register_hasher(pa.ChunkedArray)
+def _hash_chunked_array(value: pa.ChunkedArray, h: Any) -> None:
+    h.update(b"C" + struct.pack("<Q", value.num_chunks))
+    for chunk in value.chunks:
+        _hash_array(chunk, h)
+
+
+@register_hasher(pa.Table)
+@register_hasher(pa.RecordBatch)
+def _hash_table(value: Any, h: Any) -> None:
+    _tagged(h, b"R", value.schema.serialize().to_pybytes())
+    for column in value.columns:
+        feed(column, h)
+
+
+@register_hasher(duckdb.DuckDBPyRelation)
+def _hash_relation(value: duckdb.DuckDBPyRelation, h: Any) -> None:
+    try:
+        sql = value.sql_query()
+    except duckdb.Error:
+        sql = None
+    if sql is None or any(marker in sql for marker in _IN_MEMORY):
+        h.update(b"r")
+        _hash_table(value.to_arrow_table(), h)
+        return
+    _tagged(h, b"V", _ALIAS.sub(r"\1", sql).encode())
+    for files in _PARQUET_SCAN.findall(sql):
+        for quoted in _QUOTED.findall(files):
+            path = quoted.replace("''", "'")
+            if os.path.isfile(path):
+                _hash_parquet_file(path, h)
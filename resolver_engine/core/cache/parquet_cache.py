@@ -1,17 +1,354 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import duckdb
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ..resolver_base import ResolverOutput, ResolverSpec
+from .fingerprint import cache_key as fingerprint_key
+
+MANIFEST = "manifest.jsonl"
+# log records tolerated beyond twice the live entries before the manifest is compacted
+COMPACT_SLACK = 64
+
+
+@dataclass
+class _Entry:
+    # ``outputs`` is None for files found on disk that no manifest record describes
+    files: Tuple[str, ...]
+    size: int
+    outputs: List[Dict[str, Any]] | None = None
+    # wall-clock expiry; None never expires
+    expires: float | None = None
+
+    def expired(self, now: float) -> bool:
+        return self.expires is not None and self.expires <= now
 
 
 class ParquetCachePolicy:
-    def __init__(self, base_path: Path, max_total_bytes: int = 10_000_000):
+    """Resolver output cache on disk for relation-valued facts.
+
+    DuckDB relations and Arrow tables in the outputs are written to one file each,
+    Parquet by default or Arrow IPC with ``file_format="arrow"``. Scalar outputs are
+    kept inline in the manifest. ``fetch`` hands relations back lazily:
+    ``duckdb.read_parquet`` reads nothing until the relation is queried, and IPC
+    files are memory-mapped. Tables come back as Arrow tables.
+
+    ``manifest.jsonl`` is an append-only log of stores and evictions. It is
+    replayed on startup and compacted by :meth:`close`, or as soon as it holds
+    more than twice as many records as there are live entries. In memory, entries are
+    kept in access order with their byte sizes, so :meth:`enforce_limit` only
+    touches the entries it evicts. Files that other processes add to or remove
+    from ``base_path`` are picked up by a rescan, which runs only when the
+    directory's mtime changes.
+
+    Entries expire after ``ttl`` seconds (or the ``ttl`` passed to :meth:`store`,
+    which ``BaseResolver`` fills from ``ResolverSpec.cache_ttl``). Expired
+    entries are misses, and they are evicted when they are next looked up.
+
+    Because fetched relations read their file only when queried, files served in
+    the last ``keep_served_for`` seconds outlive the eviction of their entry by
+    that long (they no longer count towards ``max_total_bytes``). Later stores
+    and :meth:`close` delete them once the grace period is over. Other processes
+    sharing ``base_path`` do not see this bookkeeping.
+    """
+
+    def __init__(
+        self,
+        base_path: Path,
+        max_total_bytes: int = 10_000_000,
+        file_format: str = "parquet",
+        ttl: float | None = None,
+        keep_served_for: float = 60.0,
+    ):
+        if file_format not in ("parquet", "arrow"):
+            raise ValueError(f"Unknown cache file format {file_format!r}")
         self.base_path = Path(base_path)
         self.base_path.mkdir(parents=True, exist_ok=True)
         self.max_total_bytes = max_total_bytes
+        self.file_format = file_format
+        self.ttl = ttl
+        self.keep_served_for = keep_served_for
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # file name -> monotonic time it was last handed out, oldest first
+        self._served: "OrderedDict[str, float]" = OrderedDict()
+        # evicted but recently served files -> monotonic time they may be deleted
+        self._doomed: Dict[str, float] = {}
+        self._total_bytes = 0
+        # records in manifest.jsonl, live or superseded
+        self._records = 0
+        self._lock = threading.RLock()
+        self._load()
+        self._rescan()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def _manifest(self) -> Path:
+        return self.base_path / MANIFEST
+
+    def _load(self) -> None:
+        manifest = self._manifest()
+        if not manifest.exists():
+            return
+        with manifest.open() as handle:
+            for line in handle:
+                self._records += 1
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # a torn final line from a crash mid-append
+                    continue
+                if record["op"] == "put":
+                    entry = _Entry(tuple(record["files"]), record["size"], record["outputs"], record.get("expires"))
+                    self._put(record["key"], entry)
+                else:
+                    self._drop(record["key"])
+
+    def _append(self, *records: Dict[str, Any]) -> None:
+        # caller holds the lock
+        with self._manifest().open("a") as handle:
+            handle.writelines(json.dumps(record) + "\n" for record in records)
+        self._records += len(records)
+        if self._records > 2 * len(self._entries) + COMPACT_SLACK:
+            self._compact()
+
+    def _compact(self) -> None:
+        # caller holds the lock
+        tmp = self._manifest().with_suffix(".tmp")
+        self._records = 0
+        with tmp.open("w") as handle:
+            for cache_key, entry in self._entries.items():
+                # untracked files are re-adopted by the next rescan
+                if entry.outputs is not None:
+                    record = {"op": "put", "key": cache_key, "files": list(entry.files), "size": entry.size}
+                    record.update(outputs=entry.outputs, expires=entry.expires)
+                    handle.write(json.dumps(record) + "\n")
+                    self._records += 1
+        os.replace(tmp, self._manifest())
+        self._dir_mtime = self._mtime()
+
+    def _put(self, cache_key: str, entry: _Entry) -> None:
+        self._drop(cache_key)
+        self._entries[cache_key] = entry
+        self._total_bytes += entry.size
+
+    def _drop(self, cache_key: str) -> _Entry | None:
+        entry = self._entries.pop(cache_key, None)
+        if entry is not None:
+            self._total_bytes -= entry.size
+        return entry
+
+    def _rescan(self) -> None:
+        """Reconcile the index with the directory; O(files), only after outside changes."""
+
+        on_disk = {path.name: path for path in self.base_path.iterdir() if path.suffix in (".parquet", ".arrow")}
+        tracked = set(self._doomed)
+        for cache_key, entry in list(self._entries.items()):
+            if all(name in on_disk for name in entry.files):
+                tracked.update(entry.files)
+            else:
+                self._drop(cache_key)
+        orphans = sorted(
+            ((path.stat(), name) for name, path in on_disk.items() if name not in tracked),
+            key=lambda item: item[0].st_mtime,
+        )
+        for stat, name in orphans:
+            self._put(f"file:{name}", _Entry((name,), stat.st_size))
+        self._dir_mtime = self._mtime()
+
+    def _mtime(self) -> int:
+        return os.stat(self.base_path).st_mtime_ns
+
+    def _sync(self) -> None:
+        if self._mtime() != self._dir_mtime:
+            self._rescan()
+
+    def build_cache_key(self, ctx, spec: ResolverSpec) -> str:
+        return fingerprint_key(ctx, spec)
+
+    def _stem(self, cache_key: str) -> str:
+        return hashlib.blake2b(cache_key.encode(), digest_size=16).hexdigest()
+
+    def _write_table(self, table: pa.Table, path: Path) -> None:
+        tmp = path.with_suffix(".tmp")
+        if self.file_format == "parquet":
+            pq.write_table(table, tmp)
+        else:
+            with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, path)
+
+    def _read(self, name: str, kind: str) -> Any:
+        path = self.base_path / name
+        if path.suffix == ".parquet":
+            if kind == "relation":
+                return duckdb.read_parquet(str(path))
+            return pq.read_table(path, memory_map=True)
+        table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+        return duckdb.arrow(table) if kind == "relation" else table
+
+    def store(self, cache_key: str, outputs: Iterable[ResolverOutput], ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires = None if ttl is None else time.time() + ttl
+        stem = self._stem(cache_key)
+        suffix = ".parquet" if self.file_format == "parquet" else ".arrow"
+        records: List[Dict[str, Any]] = []
+        files: List[str] = []
+        size = 0
+        # files are written under the lock so a concurrent rescan never adopts them as orphans
+        with self._lock:
+            self._sync()
+            for index, out in enumerate(outputs):
+                record: Dict[str, Any] = {
+                    "fact_id": out.fact_id,
+                    "source": out.source,
+                    "note": out.note,
+                    "confidence": out.confidence,
+                }
+                if isinstance(out.value, (duckdb.DuckDBPyRelation, pa.Table)):
+                    kind = "relation" if isinstance(out.value, duckdb.DuckDBPyRelation) else "table"
+                    table = out.value.to_arrow_table() if kind == "relation" else out.value
+                    name = f"{stem}.{index}{suffix}"
+                    self._doomed.pop(name, None)
+                    path = self.base_path / name
+                    self._write_table(table, path)
+                    size += path.stat().st_size
+                    files.append(name)
+                    record.update(kind=kind, file=name)
+                else:
+                    record.update(kind="value", value=out.value)
+                records.append(record)
+            previous = self._drop(cache_key)
+            self._put(cache_key, _Entry(tuple(files), size, records, expires))
+            self._append(
+                {"op": "put", "key": cache_key, "files": files, "size": size, "outputs": records, "expires": expires}
+            )
+            if previous is not None:
+                self._unlink(name for name in previous.files if name not in files)
+            self.enforce_limit()
+
+    def _live(self, cache_key: str) -> _Entry | None:
+        # caller holds the lock
+        self._sync()
+        entry = self._entries.get(cache_key)
+        if entry is None or entry.outputs is None:
+            return None
+        if entry.expired(time.time()):
+            self._drop(cache_key)
+            self._unlink(entry.files)
+            self._append({"op": "del", "key": cache_key})
+            self._dir_mtime = self._mtime()
+            return None
+        return entry
+
+    def _serve(self, cache_key: str, entry: _Entry, now: float) -> None:
+        # caller holds the lock
+        self._entries.move_to_end(cache_key)
+        for name in entry.files:
+            self._served[name] = now
+            self._served.move_to_end(name)
+
+    def fetch(self, cache_key: str) -> List[ResolverOutput] | None:
+        with self._lock:
+            entry = self._live(cache_key)
+            if entry is None:
+                return None
+            self._serve(cache_key, entry, time.monotonic())
+        outputs = []
+        for record in entry.outputs:
+            kind = record["kind"]
+            value = record["value"] if kind == "value" else self._read(record["file"], kind)
+            outputs.append(
+                ResolverOutput(record["fact_id"], value, record.get("source"), record.get("note"), record.get("confidence", 1.0))
+            )
+        return outputs
+
+    def fetch_many(self, cache_keys: Sequence[str]) -> List[List[ResolverOutput] | None]:
+        # every relation output is its own file, so this only holds the lock once for the batch
+        with self._lock:
+            self._sync()
+            return [self.fetch(cache_key) for cache_key in cache_keys]
+
+    def store_many(self, items: Iterable[Tuple[str, Iterable[ResolverOutput]]], ttl: float | None = None) -> None:
+        with self._lock:
+            for cache_key, outputs in items:
+                self.store(cache_key, outputs, ttl)
+
+    def touch(self, cache_keys: Iterable[str]) -> None:
+        """Record accesses served by a cache in front of this one (e.g. a ``TieredCachePolicy`` L1)."""
+
+        with self._lock:
+            now = time.monotonic()
+            for cache_key in cache_keys:
+                entry = self._entries.get(cache_key)
+                if entry is not None:
+                    self._serve(cache_key, entry, now)
+
+    def contains(self, cache_key: str) -> bool:
+        with self._lock:
+            return self._live(cache_key) is not None
+
+    def _unlink(self, names: Iterable[str]) -> None:
+        # caller holds the lock
+        now = time.monotonic()
+        for name in names:
+            served = self._served.pop(name, None)
+            if served is not None and now - served < self.keep_served_for:
+                self._doomed[name] = served + self.keep_served_for
+            else:
+                (self.base_path / name).unlink(missing_ok=True)
+
+    def _reap(self, now: float) -> None:
+        # caller holds the lock
+        for name, due in list(self._doomed.items()):
+            if due <= now:
+                del self._doomed[name]
+                (self.base_path / name).unlink(missing_ok=True)
+        while self._served and next(iter(self._served.values())) <= now - self.keep_served_for:
+            self._served.popitem(last=False)
 
     def enforce_limit(self):
-        files = sorted(self.base_path.glob("*.parquet"), key=lambda p: p.stat().st_mtime)
-        total = sum(p.stat().st_size for p in files)
-        while total > self.max_total_bytes and files:
-            file_to_remove = files.pop(0)
-            size = file_to_remove.stat().st_size
-            file_to_remove.unlink(missing_ok=True)
-            total -= size
+        """Evict least recently used entries until the cache fits ``max_total_bytes``."""
+
+        with self._lock:
+            self._sync()
+            evicted = []
+            while self._total_bytes > self.max_total_bytes and self._entries:
+                cache_key, entry = self._entries.popitem(last=False)
+                self._total_bytes -= entry.size
+                self._unlink(entry.files)
+                evicted.append({"op": "del", "key": cache_key})
+            if evicted:
+                self._append(*evicted)
+            self._reap(time.monotonic())
+            self._dir_mtime = self._mtime()
+
+    def clear(self) -> None:
+        with self._lock:
+            for entry in self._entries.values():
+                self._unlink(entry.files)
+            self._entries.clear()
+            self._total_bytes = 0
+            self._records = 0
+            self._manifest().unlink(missing_ok=True)
+            self._dir_mtime = self._mtime()
+
+    def close(self) -> None:
+        """Compact the manifest to one record per live entry, in access order.
+
+        Evicted files still inside their grace period are deleted now.
+        """
+
+        with self._lock:
+            self._reap(float("inf"))
+            self._compact()
@@ -1,60 +1,358 @@
 import json
 import sqlite3
+import threading
+import time
+import weakref
 from pathlib import Path
-from typing import Any, Iterable, List
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
 
 from ..resolver_base import ResolverOutput, ResolverSpec
+from .fingerprint import cache_key as fingerprint_key
+
+
+_FETCH_SQL = "SELECT payload FROM cache WHERE cache_key=? AND (expires IS NULL OR expires > ?)"
+_CONTAINS_SQL = "SELECT 1 FROM cache WHERE cache_key=? AND (expires IS NULL OR expires > ?)"
+# an upsert rather than INSERT OR REPLACE, so the cache_stats triggers see replaced sizes
+_STORE_SQL = (
+    "INSERT INTO cache(cache_key, payload, expires, accessed, size) VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT(cache_key) DO UPDATE SET payload=excluded.payload, expires=excluded.expires, "
+    "accessed=excluded.accessed, size=excluded.size"
+)
+_TOUCH_SQL = "UPDATE cache SET accessed=? WHERE cache_key=?"
+_EXPIRED_SQL = "DELETE FROM cache WHERE rowid IN (SELECT rowid FROM cache WHERE expires <= ? LIMIT ?)"
+_OLDEST_SQL = "SELECT rowid, size FROM cache ORDER BY accessed LIMIT ?"
+_STATS_SQL = "SELECT rows, bytes FROM cache_stats"
+# running row count and byte total of ``cache``, kept by triggers so eviction never scans the table
+_STATS_TRIGGERS = (
+    "CREATE TRIGGER IF NOT EXISTS cache_stats_insert AFTER INSERT ON cache "
+    "BEGIN UPDATE cache_stats SET rows=rows+1, bytes=bytes+new.size; END",
+    "CREATE TRIGGER IF NOT EXISTS cache_stats_delete AFTER DELETE ON cache "
+    "BEGIN UPDATE cache_stats SET rows=rows-1, bytes=bytes-old.size; END",
+    "CREATE TRIGGER IF NOT EXISTS cache_stats_update AFTER UPDATE OF size ON cache "
+    "BEGIN UPDATE cache_stats SET bytes=bytes-old.size+new.size; END",
+)
+# keys per IN (...) lookup, well below SQLite's bound-parameter limit
+_MANY_CHUNK = 500
+
+# columns added after the original (cache_key, payload) table
+_COLUMNS = {"expires": "REAL", "accessed": "REAL NOT NULL DEFAULT 0", "size": "INTEGER NOT NULL DEFAULT 0"}
+
+
+class _Handle:
+    """Holds a thread's connection; thread-local values are dropped when their thread ends."""
+
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+
+def _release(policy_ref: "weakref.ReferenceType[SQLiteCachePolicy]", conn: sqlite3.Connection) -> None:
+    policy = policy_ref()
+    if policy is not None:
+        with policy._lock:
+            if conn in policy._connections:
+                policy._connections.remove(conn)
+    conn.close()
 
 
 class SQLiteCachePolicy:
-    def __init__(self, db_path: Path):
+    """Resolver output cache in a SQLite file.
+
+    Every thread keeps its own persistent connection (WAL journaling by default,
+    so readers never wait for writers), closed when the thread ends, and reuses
+    compiled statements through sqlite3's statement cache. With ``batch_size > 1`` stores are buffered and
+    committed together in one transaction; buffered entries are still visible to
+    ``fetch``. Call :meth:`flush` or :meth:`close` to persist a partial batch.
+
+    Entries expire after ``ttl`` seconds (or the ``ttl`` passed to :meth:`store`,
+    which ``BaseResolver`` fills from ``ResolverSpec.cache_ttl``); expired rows
+    are filtered by the key lookup itself. With ``max_rows`` / ``max_bytes`` the
+    least recently accessed rows are evicted. Accesses are only recorded in
+    memory and written by :meth:`evict`, which runs on a background thread every
+    ``evict_every`` stores. Row and byte totals live in a one-row ``cache_stats``
+    table kept current by triggers, so checking the budgets costs one lookup.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        synchronous: str = "NORMAL",
+        journal_mode: str = "WAL",
+        batch_size: int = 1,
+        timeout: float = 5.0,
+        ttl: float | None = None,
+        max_rows: int | None = None,
+        max_bytes: int | None = None,
+        evict_every: int = 256,
+    ):
         self.db_path = Path(db_path)
+        self.synchronous = synchronous
+        self.journal_mode = journal_mode
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.evict_every = evict_every
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._pending: Dict[str, tuple[str, float | None]] = {}
+        self._touched: Dict[str, float] = {}
+        self._stores = 0
+        self._evictor: threading.Thread | None = None
+        self._lock = threading.Lock()
         self._ensure()
 
+    def _connect(self) -> sqlite3.Connection:
+        # autocommit mode with explicit write transactions
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            isolation_level=None,
+            cached_statements=64,
+            check_same_thread=False,
+        )
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        handle = getattr(self._local, "handle", None)
+        if handle is None:
+            # other threads only ever close() it
+            conn = self._connect()
+            handle = self._local.handle = _Handle(conn)
+            with self._lock:
+                self._connections.append(conn)
+            weakref.finalize(handle, _release, weakref.ref(self), conn)
+        return handle.conn
+
     def _ensure(self):
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("CREATE TABLE IF NOT EXISTS cache (cache_key TEXT PRIMARY KEY, payload TEXT)")
-        conn.commit()
-        conn.close()
+        conn = self._connection()
+        conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "cache_key TEXT PRIMARY KEY, payload TEXT, expires REAL, "
+            "accessed REAL NOT NULL DEFAULT 0, size INTEGER NOT NULL DEFAULT 0)"
+        )
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(cache)")}
+        for column, declaration in _COLUMNS.items():
+            if column not in existing:
+                conn.execute(f"ALTER TABLE cache ADD COLUMN {column} {declaration}")
+        if "size" not in existing:
+            conn.execute("UPDATE cache SET size=length(payload)")
+        conn.execute("CREATE INDEX IF NOT EXISTS cache_expires ON cache(expires) WHERE expires IS NOT NULL")
+        conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache(accessed)")
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("CREATE TABLE IF NOT EXISTS cache_stats (rows INTEGER NOT NULL, bytes INTEGER NOT NULL)")
+            if conn.execute(_STATS_SQL).fetchone() is None:
+                # seeded once; the triggers keep it current from here on
+                conn.execute("INSERT INTO cache_stats SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache")
+            for trigger in _STATS_TRIGGERS:
+                conn.execute(trigger)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _transaction(self, conn: sqlite3.Connection, sql: str, rows: Iterable[tuple]) -> None:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(sql, rows)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _write(self, rows: List[tuple[str, tuple[str, float | None]]]) -> None:
+        now = time.time()
+        self._transaction(
+            self._connection(),
+            _STORE_SQL,
+            [(key, payload, expires, now, len(payload)) for key, (payload, expires) in rows],
+        )
+
+    def flush(self) -> None:
+        with self._lock:
+            rows, self._pending = list(self._pending.items()), {}
+        if rows:
+            self._write(rows)
+
+    def close(self) -> None:
+        self.flush()
+        evictor = self._evictor
+        if evictor is not None:
+            evictor.join()
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
 
     def clear(self):
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("DELETE FROM cache")
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self._pending.clear()
+            self._touched.clear()
+        self._connection().execute("DELETE FROM cache")
 
     def build_cache_key(self, ctx, spec: ResolverSpec) -> str:
-        key_parts = {str(fid): ctx.state[fid].value for fid in spec.input_facts if fid in ctx.state}
-        return json.dumps(key_parts, sort_keys=True)
+        return fingerprint_key(ctx, spec)
 
-    def fetch(self, cache_key: str):
-        conn = sqlite3.connect(self.db_path)
-        cur = conn.execute("SELECT payload FROM cache WHERE cache_key=?", (cache_key,))
-        row = cur.fetchone()
-        conn.close()
-        if not row:
+    def _payload(self, cache_key: str) -> str | None:
+        now = time.time()
+        pending = self._pending.get(cache_key)
+        if pending is not None:
+            payload, expires = pending
+            return payload if expires is None or expires > now else None
+        row = self._connection().execute(_FETCH_SQL, (cache_key, now)).fetchone()
+        if row is None:
             return None
-        payload = json.loads(row[0])
+        if self.max_rows is not None or self.max_bytes is not None:
+            self._touched[cache_key] = now
+        return row[0]
+
+    def _decode(self, payload: str) -> List[ResolverOutput]:
         return [
             ResolverOutput(item["fact_id"], item["value"], item.get("source"), item.get("note"), item.get("confidence", 1.0))
-            for item in payload
+            for item in json.loads(payload)
         ]
 
-    def store(self, cache_key: str, outputs: Iterable[ResolverOutput]):
-        payload = [
-            {
-                "fact_id": out.fact_id,
-                "value": out.value,
-                "source": out.source,
-                "note": out.note,
-                "confidence": out.confidence,
-            }
-            for out in outputs
-        ]
-        conn = sqlite3.connect(self.db_path)
-        conn.execute(
-            "INSERT OR REPLACE INTO cache(cache_key, payload) VALUES (?, ?)",
-            (cache_key, json.dumps(payload)),
+    def fetch(self, cache_key: str):
+        payload = self._payload(cache_key)
+        if payload is None:
+            return None
+        return self._decode(payload)
+
+    def fetch_many(self, cache_keys: Sequence[str]) -> List[List[ResolverOutput] | None]:
+        """Like :meth:`fetch` for every key, answered by one ``IN`` query per 500 distinct keys."""
+
+        now = time.time()
+        payloads: Dict[str, str] = {}
+        wanted = []
+        for cache_key in dict.fromkeys(cache_keys):
+            pending = self._pending.get(cache_key)
+            if pending is None:
+                wanted.append(cache_key)
+            elif pending[1] is None or pending[1] > now:
+                payloads[cache_key] = pending[0]
+        conn = self._connection()
+        for start in range(0, len(wanted), _MANY_CHUNK):
+            chunk = wanted[start : start + _MANY_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT cache_key, payload FROM cache WHERE cache_key IN ({placeholders}) "
+                "AND (expires IS NULL OR expires > ?)",
+                (*chunk, now),
+            )
+            payloads.update(rows)
+        if payloads and (self.max_rows is not None or self.max_bytes is not None):
+            self._touched.update(dict.fromkeys(payloads, now))
+        return [self._decode(payloads[key]) if key in payloads else None for key in cache_keys]
+
+    def touch(self, cache_keys: Iterable[str]) -> None:
+        """Record accesses served by a cache in front of this one (e.g. a ``TieredCachePolicy`` L1)."""
+
+        if self.max_rows is not None or self.max_bytes is not None:
+            self._touched.update(dict.fromkeys(cache_keys, time.time()))
+
+    def contains(self, cache_key: str) -> bool:
+        now = time.time()
+        pending = self._pending.get(cache_key)
+        if pending is not None:
+            return pending[1] is None or pending[1] > now
+        return self._connection().execute(_CONTAINS_SQL, (cache_key, now)).fetchone() is not None
+
+    def _encode(self, outputs: Iterable[ResolverOutput]) -> str:
+        return json.dumps(
+            [
+                {
+                    "fact_id": out.fact_id,
+                    "value": out.value,
+                    "source": out.source,
+                    "note": out.note,
+                    "confidence": out.confidence,
+                }
+                for out in outputs
+            ]
         )
-        conn.commit()
-        conn.close()
+
+    def store(self, cache_key: str, outputs: Iterable[ResolverOutput], ttl: float | None = None):
+        self.store_many([(cache_key, outputs)], ttl)
+
+    def store_many(self, items: Iterable[Tuple[str, Iterable[ResolverOutput]]], ttl: float | None = None) -> None:
+        """Store several entries; with ``batch_size <= 1`` they commit in one transaction."""
+
+        ttl = self.ttl if ttl is None else ttl
+        expires = None if ttl is None else time.time() + ttl
+        rows = [(cache_key, (self._encode(outputs), expires)) for cache_key, outputs in items]
+        if not rows:
+            return
+        if self.batch_size <= 1:
+            self._write(rows)
+        else:
+            with self._lock:
+                self._pending.update(rows)
+                full = len(self._pending) >= self.batch_size
+            if full:
+                self.flush()
+        before, self._stores = self._stores, self._stores + len(rows)
+        if before // self.evict_every != self._stores // self.evict_every:
+            self._evict_in_background()
+
+    def _evict_in_background(self) -> None:
+        with self._lock:
+            if self._evictor is not None and self._evictor.is_alive():
+                return
+            self._evictor = threading.Thread(target=self._evict_detached, name="sqlite-cache-evict", daemon=True)
+            self._evictor.start()
+
+    def _evict_detached(self) -> None:
+        conn = self._connect()
+        try:
+            self.evict(conn)
+        finally:
+            conn.close()
+
+    def evict(self, conn: sqlite3.Connection | None = None, chunk: int = 500) -> int:
+        """Record accesses, drop expired rows, then trim to ``max_rows`` / ``max_bytes``.
+
+        Deletes run in short transactions of at most ``chunk`` rows. Returns the
+        number of rows removed.
+        """
+
+        conn = conn or self._connection()
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        if touched:
+            self._transaction(conn, _TOUCH_SQL, [(accessed, key) for key, accessed in touched.items()])
+
+        removed = 0
+        now = time.time()
+        while True:
+            deleted = conn.execute(_EXPIRED_SQL, (now, chunk)).rowcount
+            removed += deleted
+            if deleted < chunk:
+                break
+
+        if self.max_rows is None and self.max_bytes is None:
+            return removed
+        rows, size = conn.execute(_STATS_SQL).fetchone()
+        while (self.max_rows is not None and rows > self.max_rows) or (
+            self.max_bytes is not None and size > self.max_bytes
+        ):
+            victims: List[int] = []
+            for rowid, row_size in conn.execute(_OLDEST_SQL, (chunk,)):
+                if not (
+                    (self.max_rows is not None and rows > self.max_rows)
+                    or (self.max_bytes is not None and size > self.max_bytes)
+                ):
+                    break
+                victims.append(rowid)
+                rows -= 1
+                size -= row_size
+            if not victims:
+                break
+            self._transaction(conn, "DELETE FROM cache WHERE rowid=?", [(rowid,) for rowid in victims])
+            removed += len(victims)
+        return removed
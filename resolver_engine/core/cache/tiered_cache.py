@@ -0,0 +1,275 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import FrozenInstanceError
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import duckdb
+
+from ..resolver_base import ResolverOutput, ResolverSpec
+
+
+class SharedOutput(ResolverOutput):
+    """Read-only ``ResolverOutput`` handed out by the in-memory tier to every caller."""
+
+    __slots__ = ()
+
+    @classmethod
+    def freeze(cls, output: ResolverOutput) -> "SharedOutput":
+        if isinstance(output, cls):
+            return output
+        shared = cls.__new__(cls)
+        for name in ("fact_id", "value", "source", "note", "confidence"):
+            object.__setattr__(shared, name, getattr(output, name))
+        return shared
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise FrozenInstanceError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name: str) -> None:
+        raise FrozenInstanceError(f"cannot delete field {name!r}")
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ResolverOutput):
+            return NotImplemented
+        return (self.fact_id, self.value, self.source, self.note, self.confidence) == (
+            other.fact_id,
+            other.value,
+            other.source,
+            other.note,
+            other.confidence,
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __reduce__(self) -> Any:
+        # pickled and deep copies are private again
+        return (ResolverOutput, (self.fact_id, self.value, self.source, self.note, self.confidence))
+
+
+def _estimate_bytes(value: Any, depth: int = 0) -> int:
+    size = sys.getsizeof(value)
+    if depth > 3:
+        return size
+    if isinstance(value, dict):
+        size += sum(_estimate_bytes(k, depth + 1) + _estimate_bytes(v, depth + 1) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_estimate_bytes(item, depth + 1) for item in value)
+    return size
+
+
+def _entry_bytes(outputs: Tuple[SharedOutput, ...]) -> int:
+    return sys.getsizeof(outputs) + sum(
+        sys.getsizeof(out) + _estimate_bytes(out.value) + _estimate_bytes(out.note) for out in outputs
+    )
+
+
+class TieredCachePolicy:
+    """In-process L1 in front of any persistent cache policy (the L2).
+
+    The L1 holds at most ``max_entries`` keys and roughly ``max_bytes`` of outputs
+    and evicts by ``"lru"`` or ``"lfu"``. L2 hits are promoted into the L1 and
+    stores write through to both tiers. Outputs served from the L1 are shared
+    :class:`SharedOutput` instances, so callers must not mutate them (or their
+    values) in place. Cache keys come from the L2 policy.
+
+    A ``ttl`` passed to :meth:`store` applies to both tiers; entries promoted from
+    the L2 live for at most ``ttl`` seconds in the L1.
+
+    L1 hits are reported to the L2's ``touch(cache_keys)`` when it has one, so
+    its own eviction still sees which keys are hot. Entries holding DuckDB
+    relations stay out of the L1: their size is unknown and relations from a
+    file-backed L2 read files that the L2 may delete once it evicts them.
+    """
+
+    def __init__(
+        self,
+        l2: Any,
+        max_entries: int = 1024,
+        max_bytes: int = 16_000_000,
+        eviction: str = "lru",
+        ttl: float | None = None,
+    ):
+        if eviction not in ("lru", "lfu"):
+            raise ValueError(f"Unknown eviction strategy {eviction!r}")
+        self.l2 = l2
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.eviction = eviction
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[SharedOutput, ...]]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._uses: Dict[str, int] = {}
+        self._expires: Dict[str, float] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+
+    @property
+    def l1_bytes(self) -> int:
+        return self._bytes
+
+    def build_cache_key(self, ctx, spec: ResolverSpec) -> str:
+        return self.l2.build_cache_key(ctx, spec)
+
+    def _victim(self, keep: str) -> str:
+        if self.eviction == "lru":
+            oldest = iter(self._entries)
+            victim = next(oldest)
+            return next(oldest, keep) if victim == keep else victim
+        # least used; ties go to the least recently used entry
+        return min((key for key in self._entries if key != keep), key=self._uses.__getitem__, default=keep)
+
+    def _remember(
+        self, cache_key: str, outputs: Iterable[ResolverOutput], ttl: float | None
+    ) -> Tuple[SharedOutput, ...]:
+        shared = tuple(SharedOutput.freeze(out) for out in outputs)
+        if any(isinstance(out.value, duckdb.DuckDBPyRelation) for out in shared):
+            return shared
+        size = _entry_bytes(shared)
+        with self._lock:
+            if cache_key in self._entries:
+                self._bytes -= self._sizes[cache_key]
+            elif size > self.max_bytes:
+                return shared
+            self._entries[cache_key] = shared
+            self._entries.move_to_end(cache_key)
+            self._sizes[cache_key] = size
+            self._uses[cache_key] = self._uses.get(cache_key, 0) + 1
+            self._bytes += size
+            if ttl is None:
+                self._expires.pop(cache_key, None)
+            else:
+                self._expires[cache_key] = time.monotonic() + ttl
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._evict(self._victim(cache_key))
+        return shared
+
+    def _evict(self, cache_key: str) -> None:
+        del self._entries[cache_key]
+        del self._uses[cache_key]
+        self._expires.pop(cache_key, None)
+        self._bytes -= self._sizes.pop(cache_key)
+
+    def _lookup(self, cache_key: str) -> Tuple[SharedOutput, ...] | None:
+        # caller holds the lock
+        shared = self._entries.get(cache_key)
+        expires = self._expires.get(cache_key)
+        if expires is not None and expires <= time.monotonic():
+            self._evict(cache_key)
+            return None
+        if shared is not None:
+            self._entries.move_to_end(cache_key)
+            self._uses[cache_key] += 1
+            self.l1_hits += 1
+        return shared
+
+    def _touch(self, cache_keys: List[str]) -> None:
+        touch = getattr(self.l2, "touch", None)
+        if touch is not None and cache_keys:
+            touch(cache_keys)
+
+    def touch(self, cache_keys: Iterable[str]) -> None:
+        """Record accesses served by a cache in front of this one."""
+
+        self._touch(list(cache_keys))
+
+    def fetch(self, cache_key: str) -> List[ResolverOutput] | None:
+        with self._lock:
+            shared = self._lookup(cache_key)
+        if shared is not None:
+            self._touch([cache_key])
+            return list(shared)
+        outputs = self.l2.fetch(cache_key)
+        if outputs is None:
+            self.misses += 1
+            return None
+        self.l2_hits += 1
+        return list(self._remember(cache_key, outputs, self.ttl))
+
+    def fetch_many(self, cache_keys: Sequence[str]) -> List[List[ResolverOutput] | None]:
+        """Serve what the L1 holds and ask the L2 for the rest in one ``fetch_many`` call."""
+
+        results: List[List[ResolverOutput] | None] = [None] * len(cache_keys)
+        missing: Dict[str, List[int]] = {}
+        hits: Dict[str, None] = {}
+        with self._lock:
+            for index, cache_key in enumerate(cache_keys):
+                shared = self._lookup(cache_key)
+                if shared is None:
+                    missing.setdefault(cache_key, []).append(index)
+                else:
+                    hits[cache_key] = None
+                    results[index] = list(shared)
+        self._touch(list(hits))
+        if not missing:
+            return results
+        keys = list(missing)
+        fetch_many = getattr(self.l2, "fetch_many", None)
+        found = fetch_many(keys) if fetch_many else [self.l2.fetch(key) for key in keys]
+        for cache_key, outputs in zip(keys, found):
+            if outputs is None:
+                self.misses += len(missing[cache_key])
+                continue
+            self.l2_hits += 1
+            shared = self._remember(cache_key, outputs, self.ttl)
+            for index in missing[cache_key]:
+                results[index] = list(shared)
+        return results
+
+    def contains(self, cache_key: str) -> bool:
+        if cache_key in self._entries and self._expires.get(cache_key, float("inf")) > time.monotonic():
+            return True
+        contains = getattr(self.l2, "contains", None)
+        return contains(cache_key) if contains else self.l2.fetch(cache_key) is not None
+
+    def store(self, cache_key: str, outputs: Iterable[ResolverOutput], ttl: float | None = None) -> None:
+        shared = self._remember(cache_key, outputs, self.ttl if ttl is None else ttl)
+        if ttl is None:
+            self.l2.store(cache_key, shared)
+        else:
+            self.l2.store(cache_key, shared, ttl=ttl)
+
+    def store_many(self, items: Iterable[Tuple[str, Iterable[ResolverOutput]]], ttl: float | None = None) -> None:
+        l1_ttl = self.ttl if ttl is None else ttl
+        shared = [(cache_key, self._remember(cache_key, outputs, l1_ttl)) for cache_key, outputs in items]
+        store_many = getattr(self.l2, "store_many", None)
+        if store_many is None:
+            for cache_key, outputs in shared:
+                if ttl is None:
+                    self.l2.store(cache_key, outputs)
+                else:
+                    self.l2.store(cache_key, outputs, ttl=ttl)
+        elif ttl is None:
+            store_many(shared)
+        else:
+            store_many(shared, ttl=ttl)
+
+    def invalidate(self, cache_key: str) -> None:
+        """Drop ``cache_key`` from the L1 only."""
+
+        with self._lock:
+            if cache_key in self._entries:
+                self._evict(cache_key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._uses.clear()
+            self._expires.clear()
+            self._bytes = 0
+        self.l2.clear()
+
+    def flush(self) -> None:
+        flush = getattr(self.l2, "flush", None)
+        if flush is not None:
+            flush()
+
+    def close(self) -> None:
+        close = getattr(self.l2, "close", None)
+        if close is not None:
+            close()
@@ -0,0 +1,284 @@
+"""Columnar storage for many contexts that resolve the same facts.
+
+A :class:`ColumnarContext` keeps one column per fact id instead of one
+``FactValue`` per row: values of ``int``/``float``/``bool`` facts (by schema
+``py_type``) in unboxed typed buffers and anything else in a plain slot list,
+status and confidence in compact typed arrays, and provenance as indices into a
+pool of interned source tuples. Arrow exports read the typed buffers in place
+through vectorized kernels rather than converting row by row.
+:meth:`ColumnarContext.rows` hands out lightweight :class:`RowContext` views
+that scalar resolvers (and ``BatchPlanner``) use like any ``ResolutionContext``;
+vectorized resolvers read whole columns with :meth:`ColumnarContext.column`.
+"""
+
+from array import array
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from .merge import merge_outputs_bulk
+from .resolver_base import ResolverOutput
+from .schema import FACT_SCHEMAS, FactSchema
+from .state import ResolutionContext
+from .types import FactStatus, FactValue
+
+_ABSENT = -1
+_STATUSES = list(FactStatus)
+_STATUS_CODES = {status: code for code, status in enumerate(_STATUSES)}
+# schema types kept unboxed: array typecode and the Arrow type sharing its layout
+_TYPED = {int: ("q", pa.int64()), float: ("d", pa.float64()), bool: ("b", pa.int8())}
+
+
+def _view(buffer: array, arrow_type: pa.DataType) -> pa.Array:
+    return pa.Array.from_buffers(arrow_type, len(buffer), [None, pa.py_buffer(buffer)])
+
+
+class _FactColumn:
+    __slots__ = ("py_type", "values", "boxed", "status", "confidence", "provenance", "notes")
+
+    def __init__(self, size: int, py_type: type | None = None):
+        self.py_type = py_type if py_type in _TYPED else None
+        self.values: Any = [None] * size if self.py_type is None else array(_TYPED[self.py_type][0], [0]) * size
+        # rows of a typed column whose value does not fit the buffer (candidates, off-type values)
+        self.boxed: Dict[int, Any] = {}
+        self.status = array("b", [_ABSENT]) * size
+        self.confidence = array("d", [1.0]) * size
+        self.provenance = array("i", [0]) * size
+        self.notes: Dict[int, List[str]] = {}
+
+    def value(self, row: int) -> Any:
+        if self.py_type is None:
+            return self.values[row]
+        if row in self.boxed:
+            return self.boxed[row]
+        return self.py_type(self.values[row])
+
+    def set_value(self, row: int, value: Any) -> None:
+        if self.py_type is None:
+            self.values[row] = value
+        elif type(value) is self.py_type:
+            self.values[row] = value
+            self.boxed.pop(row, None)
+        else:
+            self.values[row] = 0
+            self.boxed[row] = value
+
+    def present(self) -> pa.Array:
+        return pc.not_equal(_view(self.status, pa.int8()), _ABSENT)
+
+    def solid(self) -> pa.Array:
+        solid = pc.equal(_view(self.status, pa.int8()), _STATUS_CODES[FactStatus.SOLID])
+        if self.boxed:
+            # off-type values cannot live in the typed Arrow column
+            solid = pc.and_not(solid, pa.array([row in self.boxed for row in range(len(self.status))]))
+        return solid
+
+
+class ColumnarContext:
+    """``size`` resolution contexts stored column by column.
+
+    Columns are typed by the ``py_type`` of the fact's schema in ``schemas``
+    (``FACT_SCHEMAS`` by default) when they are first written.
+    """
+
+    def __init__(self, size: int, schemas: Mapping[Any, FactSchema] | None = None):
+        self.size = size
+        self.schemas = FACT_SCHEMAS if schemas is None else schemas
+        self.columns: Dict[Any, _FactColumn] = {}
+        # interned provenance tuples; index 0 is "no sources"
+        self._provenance: List[Tuple[str, ...]] = [()]
+        self._provenance_index: Dict[Tuple[str, ...], int] = {(): 0}
+
+    def _column(self, fid: Any) -> _FactColumn:
+        column = self.columns.get(fid)
+        if column is None:
+            schema = self.schemas.get(fid)
+            column = self.columns[fid] = _FactColumn(self.size, schema.py_type if schema is not None else None)
+        return column
+
+    def _intern_provenance(self, sources: Iterable[str]) -> int:
+        key = tuple(sources)
+        index = self._provenance_index.get(key)
+        if index is None:
+            index = self._provenance_index[key] = len(self._provenance)
+            self._provenance.append(key)
+        return index
+
+    def has(self, fid: Any, row: int) -> bool:
+        column = self.columns.get(fid)
+        return column is not None and column.status[row] != _ABSENT
+
+    def get(self, fid: Any, row: int) -> FactValue:
+        column = self.columns.get(fid)
+        if column is None or column.status[row] == _ABSENT:
+            raise KeyError(fid)
+        return FactValue(
+            fact_id=fid,
+            value=column.value(row),
+            status=_STATUSES[column.status[row]],
+            provenance=self._provenance[column.provenance[row]],
+            notes=list(column.notes[row]) if row in column.notes else None,
+            confidence=column.confidence[row],
+        )
+
+    def put(self, fid: Any, row: int, fact: FactValue) -> None:
+        column = self._column(fid)
+        column.set_value(row, fact.value)
+        column.status[row] = _STATUS_CODES[fact.status]
+        column.confidence[row] = fact.confidence
+        column.provenance[row] = self._intern_provenance(fact.provenance)
+        if fact.notes:
+            column.notes[row] = list(fact.notes)
+        else:
+            column.notes.pop(row, None)
+
+    def discard(self, fid: Any, row: int) -> None:
+        column = self.columns.get(fid)
+        if column is not None:
+            column.set_value(row, None)
+            column.status[row] = _ABSENT
+            column.notes.pop(row, None)
+
+    def rows(self) -> List["RowContext"]:
+        return [RowContext(self, row) for row in range(self.size)]
+
+    def set_column(
+        self,
+        fid: Any,
+        values: Iterable[Any],
+        source: str | None = None,
+        schemas: Mapping[Any, FactSchema] | None = None,
+    ) -> None:
+        """Merge one value per row for ``fid`` (``None`` skips a row), normalizing in one batch."""
+
+        rows = self.rows()
+        outputs = [[] if value is None else [ResolverOutput(fid, value, source=source)] for value in values]
+        if len(outputs) != self.size:
+            raise ValueError(f"Expected {self.size} values for {fid}, got {len(outputs)}")
+        merge_outputs_bulk(rows, outputs, schemas)
+
+    def column(self, fid: Any) -> pa.Array:
+        """Values of ``fid`` as an Arrow array; rows without a solid value are null."""
+
+        column = self.columns.get(fid)
+        if column is None:
+            return pa.nulls(self.size)
+        solid = column.solid()
+        if column.py_type is None:
+            return pa.array(column.values, mask=pc.invert(solid))
+        values = _view(column.values, _TYPED[column.py_type][1])
+        if column.py_type is bool:
+            values = values.cast(pa.bool_())
+        return pc.if_else(solid, values, pa.scalar(None, values.type))
+
+    def _status_array(self, column: _FactColumn) -> pa.Array:
+        codes = pc.if_else(column.present(), _view(column.status, pa.int8()), pa.scalar(None, pa.int8()))
+        return pa.DictionaryArray.from_arrays(codes, pa.array([status.value for status in _STATUSES]))
+
+    def _provenance_array(self, column: _FactColumn) -> pa.Array:
+        sources: Dict[str, int] = {}
+        offsets = [0]
+        indices: List[int] = []
+        for row, code in enumerate(column.status):
+            if code != _ABSENT:
+                pooled = self._provenance[column.provenance[row]]
+                indices.extend(sources.setdefault(source, len(sources)) for source in pooled)
+            offsets.append(len(indices))
+        dictionary = pa.DictionaryArray.from_arrays(
+            pa.array(indices, type=pa.int32()), pa.array(list(sources), type=pa.string())
+        )
+        absent = pc.invert(column.present())
+        return pa.ListArray.from_arrays(pa.array(offsets, type=pa.int32()), dictionary, mask=absent)
+
+    def to_arrow(self) -> pa.Table:
+        """One value/status/confidence/provenance/notes column group per fact id.
+
+        Status and provenance are dictionary-encoded; candidates of ambiguous or
+        conflicting rows are kept in a ``<fact>.candidates`` list column.
+        """
+
+        arrays: Dict[str, pa.Array] = {}
+        for fid, column in self.columns.items():
+            name = str(getattr(fid, "value", fid))
+            solid = _STATUS_CODES[FactStatus.SOLID]
+            arrays[name] = self.column(fid)
+            arrays[f"{name}.status"] = self._status_array(column)
+            confidence = _view(column.confidence, pa.float64())
+            arrays[f"{name}.confidence"] = pc.if_else(column.present(), confidence, pa.scalar(None, pa.float64()))
+            arrays[f"{name}.provenance"] = self._provenance_array(column)
+            arrays[f"{name}.notes"] = pa.array(
+                [column.notes.get(row) for row in range(self.size)], type=pa.list_(pa.string())
+            )
+            if any(code not in (solid, _ABSENT) for code in column.status):
+                arrays[f"{name}.candidates"] = pa.array(
+                    [
+                        list(column.value(row)) if code not in (solid, _ABSENT) else None
+                        for row, code in enumerate(column.status)
+                    ]
+                )
+        return pa.table(arrays)
+
+    def to_parquet(self, path: Path | str) -> None:
+        pq.write_table(self.to_arrow(), Path(path))
+
+
+class _RowState(MutableMapping):  # type: ignore[type-arg]
+    """``ctx.state`` of one row, reading and writing the owning columns."""
+
+    __slots__ = ("store", "row")
+
+    def __init__(self, store: ColumnarContext, row: int):
+        self.store = store
+        self.row = row
+
+    def __getitem__(self, fid: Any) -> FactValue:
+        return self.store.get(fid, self.row)
+
+    def __setitem__(self, fid: Any, fact: FactValue) -> None:
+        self.store.put(fid, self.row, fact)
+
+    def __delitem__(self, fid: Any) -> None:
+        if not self.store.has(fid, self.row):
+            raise KeyError(fid)
+        self.store.discard(fid, self.row)
+
+    def __contains__(self, fid: object) -> bool:
+        return self.store.has(fid, self.row)
+
+    def __iter__(self) -> Iterator[Any]:
+        return (fid for fid in self.store.columns if self.store.has(fid, self.row))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+_ROW_DEFAULTS: Dict[str, Callable[[], Any]] = {"trace": list, "derivations": dict, "executions": dict}
+
+
+class RowContext(ResolutionContext):
+    """A row of a :class:`ColumnarContext` usable wherever a ``ResolutionContext`` is.
+
+    Only the row's state view is allocated up front; ``trace``, ``derivations``
+    and ``executions`` are created the first time the row uses them.
+    """
+
+    __slots__ = ("state", "store", "row")
+
+    def __init__(self, store: ColumnarContext, row: int):
+        # ResolutionContext.__init__ would allocate the per-row bookkeeping eagerly
+        self.state = _RowState(store, row)  # type: ignore[assignment]
+        self.store = store
+        self.row = row
+
+    def __getattr__(self, name: str) -> Any:
+        factory = _ROW_DEFAULTS.get(name)
+        if factory is None:
+            raise AttributeError(name)
+        value = factory()
+        setattr(self, name, value)
+        return value
+
@@ -0,0 +1,113 @@
+import json
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict
+
+
+@dataclass
+class CostEstimate:
+    """Exponentially weighted moving averages of one resolver's observed runtimes."""
+
+    wall_ms: float = 0.0
+    cpu_ms: float = 0.0
+    samples: int = 0
+
+    def observe(self, wall_ms: float, cpu_ms: float | None, alpha: float) -> None:
+        if self.samples == 0:
+            self.wall_ms = wall_ms
+            self.cpu_ms = cpu_ms or 0.0
+        else:
+            self.wall_ms += alpha * (wall_ms - self.wall_ms)
+            if cpu_ms is not None:
+                self.cpu_ms += alpha * (cpu_ms - self.cpu_ms)
+        self.samples += 1
+
+
+class CostModel:
+    """Learned per-resolver costs in milliseconds, kept separately for cache hits and misses.
+
+    ``BaseResolver.execute`` records every call here; planners created with
+    ``learned_costs=True`` use :meth:`expected_cost` instead of ``ResolverSpec.cost``.
+
+    ``version`` is bumped whenever an estimate first becomes available or moves
+    by more than ``replan_tolerance`` (relative, at least 1ms) since the last
+    bump. ``PlanCache`` keys of learned-cost planners include it, so cached plans
+    follow the costs without being recompiled on every observation.
+    """
+
+    def __init__(
+        self, alpha: float = 0.2, track_cpu: bool = False, min_samples: int = 1, replan_tolerance: float = 0.25
+    ):
+        self.alpha = alpha
+        self.track_cpu = track_cpu
+        self.min_samples = min_samples
+        self.replan_tolerance = replan_tolerance
+        self.hits: Dict[str, CostEstimate] = {}
+        self.misses: Dict[str, CostEstimate] = {}
+        self.version = 0
+        self._published: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, wall_ms: float, cpu_ms: float | None = None, cache_hit: bool = False) -> None:
+        table = self.hits if cache_hit else self.misses
+        with self._lock:
+            table.setdefault(name, CostEstimate()).observe(wall_ms, cpu_ms, self.alpha)
+            cost = self.expected_cost(name)
+            published = self._published.get(name)
+            if cost is not None and (
+                published is None or abs(cost - published) > self.replan_tolerance * max(published, 1.0)
+            ):
+                self._published[name] = cost
+                self.version += 1
+
+    def expected_cost(self, name: str) -> float | None:
+        """Hit-rate weighted wall time, or ``None`` until enough calls were observed."""
+
+        hit = self.hits.get(name)
+        miss = self.misses.get(name)
+        hit_samples = hit.samples if hit else 0
+        miss_samples = miss.samples if miss else 0
+        total = hit_samples + miss_samples
+        if total < self.min_samples:
+            return None
+        cost = 0.0
+        if hit:
+            cost += hit.wall_ms * hit_samples / total
+        if miss:
+            cost += miss.wall_ms * miss_samples / total
+        return cost
+
+    def clear(self) -> None:
+        with self._lock:
+            self.hits.clear()
+            self.misses.clear()
+            self._published.clear()
+            self.version += 1
+
+    def save(self, path: Path) -> None:
+        with self._lock:
+            payload = {
+                "hits": {name: asdict(est) for name, est in self.hits.items()},
+                "misses": {name: asdict(est) for name, est in self.misses.items()},
+            }
+        path = Path(path)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(payload, sort_keys=True))
+        tmp_path.replace(path)
+
+    def load(self, path: Path) -> None:
+        path = Path(path)
+        if not path.exists():
+            return
+        payload = json.loads(path.read_text())
+        with self._lock:
+            self.hits = {name: CostEstimate(**est) for name, est in payload.get("hits", {}).items()}
+            self.misses = {name: CostEstimate(**est) for name, est in payload.get("misses", {}).items()}
+            self._published = {
+                name: cost for name in {*self.hits, *self.misses} if (cost := self.expected_cost(name)) is not None
+            }
+            self.version += 1
+
+
+COST_MODEL = CostModel()
@@ -1,59 +1,107 @@
-from typing import Iterable, TYPE_CHECKING, Any
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, TYPE_CHECKING
 
-from .schema import FACT_SCHEMAS
-from .types import FactStatus, FactValue
+from .schema import FACT_SCHEMAS, FactSchema
+from .types import CandidateList, FactStatus, FactValue
 from .state import ResolutionContext
 
 if TYPE_CHECKING:  # pragma: no cover
     from .resolver_base import ResolverOutput
 
 
-def merge_outputs(ctx: ResolutionContext, outputs: Iterable[Any]):
-    for output in outputs:
-        fact_id = output.fact_id
-        if fact_id not in FACT_SCHEMAS:
-            raise KeyError(f"Schema for {fact_id} not registered")
-        schema = FACT_SCHEMAS[fact_id]
-        normalized = schema.apply_normalization(output.value)
-
-        if fact_id not in ctx.state:
-            ctx.state[fact_id] = FactValue(
-                fact_id=fact_id,
-                value=normalized,
-                status=FactStatus.SOLID,
-                provenance=[output.source] if output.source else [],
-                notes=[output.note] if output.note else [],
-                confidence=output.confidence,
-            )
-            continue
-
-        existing = ctx.state[fact_id]
-        # same value
-        if existing.value == normalized or (
-            isinstance(existing.value, list) and normalized in existing.value
-        ):
-            existing.provenance += [output.source] if output.source else []
-            if output.note:
-                existing.notes.append(output.note)
-            existing.confidence = max(existing.confidence, output.confidence)
-            continue
-
-        # conflict or ambiguity
-        if schema.allow_ambiguity:
-            values = existing.value if isinstance(existing.value, list) else [existing.value]
-            if normalized not in values:
-                values.append(normalized)
-            existing.value = values
-            existing.status = FactStatus.AMBIGUOUS
-        else:
-            values = existing.value if isinstance(existing.value, list) else [existing.value]
-            if normalized not in values:
-                values.append(normalized)
-            existing.value = values
-            existing.status = FactStatus.CONFLICT
-        existing.provenance += [output.source] if output.source else []
+def _same_value(current: Any, normalized: Any) -> bool:
+    if isinstance(current, CandidateList):
+        # membership is indexed; the list as a whole can only equal a list of the same length
+        return normalized in current or (
+            isinstance(normalized, list) and len(normalized) == len(current) and current == normalized
+        )
+    return current is normalized or current == normalized or (isinstance(current, list) and normalized in current)
+
+
+def _merge_normalized(ctx: ResolutionContext, schema: FactSchema, output: Any, normalized: Any) -> None:
+    fact_id = output.fact_id
+    if fact_id not in ctx.state:
+        ctx.state[fact_id] = FactValue(
+            fact_id=fact_id,
+            value=normalized,
+            status=FactStatus.SOLID,
+            provenance=(output.source,) if output.source else None,
+            notes=[output.note] if output.note else None,
+            confidence=output.confidence,
+        )
+        return
+
+    existing = ctx.fact_for_update(fact_id)
+    # same value
+    if _same_value(existing.value, normalized):
+        if output.source:
+            existing.provenance.append(output.source)
         if output.note:
             existing.notes.append(output.note)
         existing.confidence = max(existing.confidence, output.confidence)
+        ctx.state[fact_id] = existing
+        return
+
+    # conflict or ambiguity
+    values = existing.value
+    if not isinstance(values, CandidateList):
+        # copied, so a solid list value handed in by a resolver is never mutated
+        values = CandidateList(values if isinstance(values, list) else [values])
+    values.add(normalized)
+    existing.value = values
+    # the candidate list may have grown in place
+    existing._digest = None
+    existing.status = FactStatus.AMBIGUOUS if schema.allow_ambiguity else FactStatus.CONFLICT
+    if output.source:
+        existing.provenance.append(output.source)
+    if output.note:
+        existing.notes.append(output.note)
+    existing.confidence = max(existing.confidence, output.confidence)
+    # write back so mapping-backed states (columnar rows) keep the in-place updates
+    ctx.state[fact_id] = existing
+
+
+def _schema(schemas: Mapping[Any, FactSchema], fact_id: Any) -> FactSchema:
+    if fact_id not in schemas:
+        raise KeyError(f"Schema for {fact_id} not registered")
+    return schemas[fact_id]
+
+
+def merge_outputs(ctx: ResolutionContext, outputs: Iterable[Any], schemas: Mapping[Any, FactSchema] | None = None):
+    if schemas is None:
+        schemas = FACT_SCHEMAS
+    for output in outputs:
+        schema = _schema(schemas, output.fact_id)
+        _merge_normalized(ctx, schema, output, schema.apply_normalization(output.value))
 
     return ctx
+
+
+def merge_outputs_bulk(
+    contexts: Sequence[ResolutionContext],
+    outputs: Sequence[Iterable[Any]],
+    schemas: Mapping[Any, FactSchema] | None = None,
+) -> Sequence[ResolutionContext]:
+    """Merge one output list per context, normalizing each fact id's values in a single call.
+
+    Values are grouped by fact id across every context and passed to
+    ``FactSchema.normalize_batch`` (or ``normalize`` per value when a schema has no
+    batch hook); merging then follows :func:`merge_outputs` in the original order.
+    """
+
+    if len(contexts) != len(outputs):
+        raise ValueError(f"Got {len(outputs)} output lists for {len(contexts)} contexts")
+    if schemas is None:
+        schemas = FACT_SCHEMAS
+    rows = [list(row) for row in outputs]
+    groups: Dict[Any, List[Any]] = {}
+    for row in rows:
+        for output in row:
+            _schema(schemas, output.fact_id)
+            groups.setdefault(output.fact_id, []).append(output.value)
+    normalized = {
+        fact_id: iter(schemas[fact_id].apply_normalization_batch(values)) for fact_id, values in groups.items()
+    }
+    for ctx, row in zip(contexts, rows):
+        for output in row:
+            _merge_normalized(ctx, schemas[output.fact_id], output, next(normalized[output.fact_id]))
+    return contexts
@@ -0,0 +1,80 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, Set, Tuple
+
+from .resolver_base import RESOLVER_REGISTRY
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    """Resolver stages compiled for one (known facts, required facts, priority) signature.
+
+    Each stage is executed together (a single resolver in sequential mode, a wave
+    in parallel mode) assuming every resolver yields exactly its ``output_facts``.
+    """
+
+    stages: Tuple[Tuple[str, ...], ...]
+    relevant_resolvers: Tuple[str, ...] | None = None
+    estimated_cost: float = 0.0
+
+
+class PlanCache:
+    """Bounded LRU of compiled plans.
+
+    Plans stored with ``live_registry=True`` (the default) were compiled against
+    the mutable ``RESOLVER_REGISTRY`` and are dropped whenever it changes. Plans
+    of planners on an immutable ``RegistrySnapshot`` carry the snapshot in their
+    key, so they skip that check and survive global registrations.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._plans: "OrderedDict[Hashable, ExecutionPlan]" = OrderedDict()
+        # keys of plans compiled against the live registry
+        self._live: Set[Hashable] = set()
+        self._version = RESOLVER_REGISTRY.version
+        self._lock = threading.Lock()
+
+    def _check_version(self) -> None:
+        if self._version != RESOLVER_REGISTRY.version:
+            for key in self._live:
+                del self._plans[key]
+            self._live.clear()
+            self._version = RESOLVER_REGISTRY.version
+
+    def get(self, key: Hashable, live_registry: bool = True) -> ExecutionPlan | None:
+        with self._lock:
+            if live_registry:
+                self._check_version()
+            plan = self._plans.get(key)
+            if plan is None:
+                self.misses += 1
+                return None
+            self._plans.move_to_end(key)
+            self.hits += 1
+            return plan
+
+    def put(self, key: Hashable, plan: ExecutionPlan, live_registry: bool = True) -> None:
+        with self._lock:
+            if live_registry:
+                self._check_version()
+                self._live.add(key)
+            self._plans[key] = plan
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.maxsize:
+                evicted, _ = self._plans.popitem(last=False)
+                self._live.discard(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
+            self._live.clear()
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._plans
@@ -1,50 +1,902 @@
+import asyncio
+import heapq
+import queue
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from dataclasses import dataclass, field
-from typing import Any, Dict, Iterable, List, Set
+from typing import Any, Callable, Dict, Generator, Hashable, Iterable, List, Mapping, Set, Tuple
 
-from .resolver_base import RESOLVER_REGISTRY, BaseResolver
-from .merge import merge_outputs
+from .cost_model import COST_MODEL
+from .resolver_base import RESOLVER_REGISTRY, BaseResolver, ResolverOutput
+from .merge import merge_outputs, merge_outputs_bulk
+from .plan_cache import ExecutionPlan, PlanCache
+from .registry import RegistrySnapshot
+from .schema import FACT_SCHEMAS, FactSchema
 from .state import ResolutionContext
+from .types import FactStatus, FactValue
 
 
 @dataclass
 class PlannerResult:
     executed_resolvers: List[str] = field(default_factory=list)
+    relevant_resolvers: List[str] | None = None
+    waves: List[List[str]] = field(default_factory=list)
+    skipped_resolvers: List[str] = field(default_factory=list)
+    timed_out_resolvers: List[str] = field(default_factory=list)
+    unresolved_facts: List[Any] = field(default_factory=list)
+    budget_exhausted: bool = False
+
+
+@dataclass(frozen=True)
+class FactEvent:
+    """A fact as it stood right after one resolver's outputs were merged."""
+
+    fact_id: Any
+    value: FactValue
+    resolver: str
+
+
+FactListener = Callable[[FactEvent], None]
+
+
+def _snapshot(fact: FactValue) -> FactValue:
+    # later merges mutate FactValue in place; events must keep what was seen
+    snapshot = fact.copy()
+    if isinstance(fact.value, list):
+        snapshot.value = list(fact.value)
+    return snapshot
+
+
+class _Budget:
+    """Remaining time of a planner run with an optional ``deadline_ms``."""
+
+    def __init__(self, deadline_ms: float | None):
+        self.expires_at = None if deadline_ms is None else time.monotonic() + deadline_ms / 1000
+
+    def remaining_ms(self) -> float | None:
+        if self.expires_at is None:
+            return None
+        return (self.expires_at - time.monotonic()) * 1000
+
+    def exhausted(self) -> bool:
+        remaining = self.remaining_ms()
+        return remaining is not None and remaining <= 0
+
+
+_STREAM_END = object()
+# producer threads shared by every pipelining planner in the process
+PRODUCER_WORKERS = 8
+
+
+class _ProducerPool:
+    """Fixed set of reused daemon threads running streaming producers.
+
+    Daemon threads, unlike ``ThreadPoolExecutor`` workers, never hold up
+    interpreter exit for a producer abandoned at a deadline.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.tasks: "queue.SimpleQueue[Callable[[], None]]" = queue.SimpleQueue()
+        self.started = False
+        self.lock = threading.Lock()
+
+    def submit(self, task: Callable[[], None]) -> None:
+        with self.lock:
+            if not self.started:
+                for index in range(self.size):
+                    threading.Thread(target=self._work, name=f"resolver-producer-{index}", daemon=True).start()
+                self.started = True
+        self.tasks.put(task)
+
+    def _work(self) -> None:
+        while True:
+            self.tasks.get()()
+
+
+_PRODUCERS = _ProducerPool(PRODUCER_WORKERS)
+
+
+class _Pipeline:
+    """Streaming resolvers running on producer threads while the planner keeps scheduling.
+
+    Outputs are merged on the planner thread one at a time, so a fact yielded
+    early unlocks its consumers before the producer has finished. Producers
+    read ``ctx.state`` while the planner writes to it, which is why pipelining
+    is opt-in (``Planner(pipeline=True)``).
+    """
+
+    def __init__(
+        self, planner: "Planner", ctx: ResolutionContext, result: PlannerResult, on_fact: FactListener | None
+    ):
+        self.planner = planner
+        self.ctx = ctx
+        self.result = result
+        self.on_fact = on_fact
+        self.events: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+        self.active: Set[str] = set()
+        self.yielded: Set[Any] = set()
+
+    def start(self, name: str) -> None:
+        resolver = self.planner.resolvers[name]
+        self.active.add(name)
+
+        def produce() -> None:
+            try:
+                for output in resolver.execute_iter(self.ctx):
+                    self.events.put((name, output))
+            except BaseException as exc:  # re-raised on the planner thread
+                self.events.put((name, exc))
+            else:
+                self.events.put((name, _STREAM_END))
+
+        _PRODUCERS.submit(produce)
+
+    def _handle(self, name: str, item: Any) -> Set[Any]:
+        if name not in self.active:
+            # late output of a producer abandoned at the deadline
+            return set()
+        if item is _STREAM_END:
+            self.active.remove(name)
+            self.result.executed_resolvers.append(name)
+            return set()
+        if isinstance(item, BaseException):
+            self.active.remove(name)
+            raise item
+        new_facts = self.planner._merge(self.ctx, [item], name, self.on_fact)
+        self.yielded |= new_facts
+        return new_facts
+
+    def admits(self, name: str) -> bool:
+        """Whether ``name`` may start while producers are in flight.
+
+        Active producers claim their output facts, as in ``Planner._select_wave``,
+        and only consumers of facts they have already yielded may overlap them;
+        anything else waits, so the picks match a sequential run.
+        """
+
+        if not self.active:
+            return True
+        spec = self.planner.resolvers[name].spec
+        claimed: Set[Any] = set()
+        for producer in self.active:
+            claimed |= self.planner.resolvers[producer].spec.output_facts
+        return not spec.output_facts & claimed and bool(spec.input_facts & self.yielded)
+
+    def merge_ready(self) -> Set[Any]:
+        new_facts: Set[Any] = set()
+        while True:
+            try:
+                name, item = self.events.get_nowait()
+            except queue.Empty:
+                return new_facts
+            new_facts |= self._handle(name, item)
+
+    def merge_next(self, budget: _Budget) -> Set[Any]:
+        """Block for the next output; producers still running at the deadline are abandoned."""
+
+        remaining = budget.remaining_ms()
+        try:
+            name, item = self.events.get(timeout=None if remaining is None else max(remaining, 0.0) / 1000)
+        except queue.Empty:
+            self.result.timed_out_resolvers.extend(sorted(self.active))
+            self.active.clear()
+            return set()
+        return self._handle(name, item) | self.merge_ready()
+
+    def drain(self, budget: _Budget) -> None:
+        while self.active:
+            self.merge_next(budget)
+
+
+class _ScanQueue:
+    """Eligibility by rescanning pending resolvers with ``can_run`` on every pick."""
+
+    def __init__(self, planner: "Planner", ctx: ResolutionContext, names: Iterable[str]):
+        self.planner = planner
+        self.ctx = ctx
+        self.pending = set(names)
+
+    def _eligible(self) -> List[BaseResolver]:
+        # registry order keeps ties deterministic; max() keeps the first best
+        return [
+            resolver
+            for name, resolver in self.planner.resolvers.items()
+            if name in self.pending and resolver.can_run(self.ctx)
+        ]
+
+    def pop(self) -> str | None:
+        eligible = self._eligible()
+        if not eligible:
+            return None
+        # pick best by score
+        best = max(eligible, key=self.planner._score_resolver)
+        self.pending.remove(best.spec.name)
+        return best.spec.name
+
+    def drain(self) -> List[str]:
+        eligible = self._eligible()
+        # sorted() is stable, so equal scores keep registry order
+        eligible.sort(key=self.planner._score_resolver, reverse=True)
+        names = [resolver.spec.name for resolver in eligible]
+        self.pending.difference_update(names)
+        return names
+
+    def push_back(self, names: Iterable[str]) -> None:
+        self.pending.update(names)
+
+    def facts_added(self, fact_ids: Iterable[Any]) -> None:
+        pass
+
+
+class _IndexQueue:
+    """Event-driven eligibility that picks resolvers in the same order as :class:`_ScanQueue`.
+
+    A fact -> waiting consumers index and a count of missing inputs per resolver
+    are updated only when a merge adds a new fact. Eligible resolvers sit in a heap
+    keyed by score and registry position, matching the first-best tie breaking of
+    the scan. Resolvers are assumed to use the default ``can_run`` input check.
+    """
+
+    def __init__(self, planner: "Planner", ctx: ResolutionContext, names: Iterable[str]):
+        self.planner = planner
+        self.waiting: Dict[Any, List[str]] = {}
+        self.missing: Dict[str, int] = {}
+        self.ready: List[Tuple[float, int, str]] = []
+        self.positions = planner._positions()
+
+        candidates = set(names)
+        for name, resolver in self.planner.resolvers.items():
+            if name not in candidates:
+                continue
+            absent = [fid for fid in resolver.spec.input_facts if fid not in ctx.state]
+            for fid in absent:
+                self.waiting.setdefault(fid, []).append(name)
+            self.missing[name] = len(absent)
+            if not absent:
+                self._push(name)
+
+    def _push(self, name: str) -> None:
+        score = self.planner._score_resolver(self.planner.resolvers[name])
+        heapq.heappush(self.ready, (-score, self.positions[name], name))
+
+    def pop(self) -> str | None:
+        if not self.ready:
+            return None
+        return heapq.heappop(self.ready)[2]
+
+    def drain(self) -> List[str]:
+        names = [heapq.heappop(self.ready)[2] for _ in range(len(self.ready))]
+        return names
+
+    def push_back(self, names: Iterable[str]) -> None:
+        for name in names:
+            self._push(name)
+
+    def facts_added(self, fact_ids: Iterable[Any]) -> None:
+        for fid in fact_ids:
+            for name in self.waiting.pop(fid, []):
+                self.missing[name] -= 1
+                if self.missing[name] == 0:
+                    self._push(name)
 
 
 class Planner:
-    def __init__(self, required_facts: Set[Any], user_priority: Dict[Any, float]):
+    def __init__(
+        self,
+        required_facts: Set[Any],
+        user_priority: Dict[Any, float],
+        incremental: bool = False,
+        prune: bool = True,
+        max_workers: int | None = None,
+        executor: Executor | None = None,
+        plan_cache: PlanCache | None = None,
+        optimal: bool = False,
+        max_expansions: int = 10_000,
+        learned_costs: bool = False,
+        deadline_ms: float | None = None,
+        registry: RegistrySnapshot | None = None,
+        pipeline: bool = False,
+    ):
         self.required_facts = set(required_facts)
         self.user_priority = user_priority
+        self.incremental = incremental
+        self.prune = prune
+        self.max_workers = max_workers
+        self.executor = executor
+        self.plan_cache = plan_cache
+        self.optimal = optimal
+        self.max_expansions = max_expansions
+        self.learned_costs = learned_costs
+        self.deadline_ms = deadline_ms
+        self.pipeline = pipeline
+        # a compiled snapshot keeps hot paths off the mutable module-level registries
+        self.registry = registry
+        self.resolvers: Mapping[str, BaseResolver] = RESOLVER_REGISTRY if registry is None else registry.resolvers
+        self.schemas: Mapping[Any, FactSchema] = FACT_SCHEMAS if registry is None else registry.schemas
+
+    def _positions(self) -> Mapping[str, int]:
+        if self.registry is not None:
+            return self.registry.positions
+        return {name: position for position, name in enumerate(self.resolvers)}
+
+    def _producers(self) -> Callable[[Any], Iterable[str]]:
+        if self.registry is not None:
+            return self.registry.producers_of
+        producers: Dict[Any, List[str]] = {}
+        for name, resolver in self.resolvers.items():
+            for fid in resolver.spec.output_facts:
+                producers.setdefault(fid, []).append(name)
+        return lambda fid: producers.get(fid, [])
+
+    def _resolver_cost(self, resolver: BaseResolver) -> float:
+        if self.learned_costs:
+            learned = COST_MODEL.expected_cost(resolver.spec.name)
+            if learned:
+                return learned
+        return resolver.spec.cost if resolver.spec.cost else 1.0
 
     def _score_resolver(self, resolver: BaseResolver) -> float:
         impact = sum(
             resolver.spec.impact.get(fid, 0) * self.user_priority.get(fid, 1.0)
             for fid in resolver.spec.output_facts
         )
-        cost = resolver.spec.cost if resolver.spec.cost else 1.0
-        return impact / cost
+        return impact / self._resolver_cost(resolver)
+
+    def _required_satisfied(self, ctx: ResolutionContext) -> bool:
+        return bool(self.required_facts) and self.required_facts.issubset(ctx.state.keys())
+
+    def relevant_resolvers(self, ctx: ResolutionContext) -> List[str]:
+        """Names of resolvers on some path from the known facts to a required fact.
+
+        Walks the resolver hypergraph backwards from ``required_facts``: every
+        producer of a missing goal is relevant, and its missing inputs become goals
+        in turn. Facts already in ``ctx.state`` are not expanded.
+        """
+
+        producers = self._producers()
+        relevant: Set[str] = set()
+        seen: Set[Any] = set()
+        goals = [fid for fid in self.required_facts if fid not in ctx.state]
+        while goals:
+            fid = goals.pop()
+            if fid in seen:
+                continue
+            seen.add(fid)
+            for name in producers(fid):
+                if name in relevant:
+                    continue
+                relevant.add(name)
+                goals.extend(
+                    input_fid
+                    for input_fid in self.resolvers[name].spec.input_facts
+                    if input_fid not in ctx.state and input_fid not in seen
+                )
+        return [name for name in self.resolvers if name in relevant]
+
+    def _candidates(self, ctx: ResolutionContext) -> List[str] | None:
+        if self.prune and self.required_facts:
+            return self.relevant_resolvers(ctx)
+        return None
+
+    def _queue(
+        self,
+        ctx: ResolutionContext,
+        relevant: List[str] | None,
+        done: Iterable[str] = (),
+    ) -> "_ScanQueue | _IndexQueue":
+        names = set(self.resolvers.keys() if relevant is None else relevant)
+        names.difference_update(done)
+        queue_cls = _IndexQueue if self.incremental else _ScanQueue
+        return queue_cls(self, ctx, names)
+
+    def _next_stage(self, queue: "_ScanQueue | _IndexQueue", staged: bool) -> List[str]:
+        if not staged:
+            name = queue.pop()
+            return [] if name is None else [name]
+        ready = queue.drain()
+        wave = self._select_wave(ready)
+        queue.push_back(name for name in ready if name not in wave)
+        return wave
+
+    def _select_wave(self, names: List[str]) -> List[str]:
+        """Greedily pick, in priority order, resolvers that do not touch each other's facts."""
+
+        wave: List[str] = []
+        claimed: Set[Any] = set()
+        written: Set[Any] = set()
+        for name in names:
+            spec = self.resolvers[name].spec
+            touched = spec.input_facts | spec.output_facts
+            if spec.output_facts & claimed or touched & written:
+                continue
+            wave.append(name)
+            claimed |= touched
+            written |= spec.output_facts
+        return wave
+
+    def _fits_wave(self, wave: List[str], name: str) -> bool:
+        return self._select_wave(wave + [name]) == wave + [name]
+
+    def _plan_key(self, ctx: ResolutionContext, staged: bool) -> Hashable:
+        return (
+            self.registry,
+            staged,
+            self.prune,
+            self.optimal,
+            COST_MODEL.version if self.learned_costs else None,
+            frozenset(ctx.state.keys()),
+            frozenset(self.required_facts),
+            frozenset(self.user_priority.items()),
+        )
+
+    def compile_plan(self, known_facts: Iterable[Any], staged: bool = False) -> ExecutionPlan:
+        """Plan over fact presence alone, assuming every resolver yields its ``output_facts``.
+
+        With ``optimal`` set and required facts given, the cheapest covering
+        resolver set is searched first; otherwise (or when the search gives up)
+        the greedy scheduling loop is simulated.
+        """
+
+        known = set(known_facts)
+        if self.optimal and self.required_facts:
+            sequence = self._search_optimal(known)
+            if sequence is not None:
+                stages = self._stage_sequence(sequence, known) if staged else [(name,) for name in sequence]
+                return self._plan(stages, self._candidates(ResolutionContext(state=dict.fromkeys(known))))
+
+        ctx = ResolutionContext(state={fid: FactValue(fid, None) for fid in known})
+        relevant = self._candidates(ctx)
+        queue = self._queue(ctx, relevant)
+        stages: List[Tuple[str, ...]] = []
+        while not self._required_satisfied(ctx):
+            stage = self._next_stage(queue, staged)
+            if not stage:
+                break
+            new_facts: Set[Any] = set()
+            for name in stage:
+                for fid in self.resolvers[name].spec.output_facts:
+                    if fid not in ctx.state:
+                        ctx.state[fid] = FactValue(fid, None)
+                        new_facts.add(fid)
+            queue.facts_added(new_facts)
+            stages.append(tuple(stage))
+        return self._plan(stages, relevant)
+
+    def _plan(self, stages: List[Tuple[str, ...]], relevant: List[str] | None) -> ExecutionPlan:
+        return ExecutionPlan(
+            stages=tuple(stages),
+            relevant_resolvers=None if relevant is None else tuple(relevant),
+            estimated_cost=sum(
+                self._resolver_cost(self.resolvers[name]) for stage in stages for name in stage
+            ),
+        )
+
+    def _search_optimal(self, known: Set[Any]) -> List[str] | None:
+        """Min-cost hyperpath from ``known`` to ``required_facts`` by best-first search.
+
+        States are sets of known facts and each step applies one relevant resolver
+        that adds a new fact. The heuristic (largest cheapest-producer cost over the
+        missing goals) never overestimates, so the first goal state popped is
+        cost-optimal. Returns ``None`` when the goals are unreachable or the search
+        exceeds ``max_expansions``.
+        """
+
+        names = self.relevant_resolvers(ResolutionContext(state=dict.fromkeys(known)))
+        costs = {name: self._resolver_cost(self.resolvers[name]) for name in names}
+        cheapest: Dict[Any, float] = {}
+        for name in names:
+            for fid in self.resolvers[name].spec.output_facts:
+                cheapest[fid] = min(cheapest.get(fid, float("inf")), costs[name])
+
+        goals = frozenset(self.required_facts)
+
+        def estimate(state: frozenset) -> float:
+            return max((cheapest.get(fid, float("inf")) for fid in goals - state), default=0.0)
+
+        start = frozenset(known)
+        if estimate(start) == float("inf"):
+            return None
+        best: Dict[frozenset, float] = {start: 0.0}
+        frontier: List[Tuple[float, float, int, frozenset, Tuple[str, ...]]] = [
+            (estimate(start), 0.0, 0, start, ())
+        ]
+        counter = 1
+        expansions = 0
+        while frontier:
+            _, cost, _, state, path = heapq.heappop(frontier)
+            if goals <= state:
+                return list(path)
+            if cost > best.get(state, float("inf")):
+                continue
+            expansions += 1
+            if expansions > self.max_expansions:
+                return None
+            for name in names:
+                spec = self.resolvers[name].spec
+                if not spec.input_facts <= state or spec.output_facts <= state:
+                    continue
+                next_state = state | spec.output_facts
+                next_cost = cost + costs[name]
+                if next_cost >= best.get(next_state, float("inf")):
+                    continue
+                best[next_state] = next_cost
+                heapq.heappush(
+                    frontier,
+                    (next_cost + estimate(next_state), next_cost, counter, next_state, path + (name,)),
+                )
+                counter += 1
+        return None
+
+    def _stage_sequence(self, sequence: List[str], known: Set[Any]) -> List[Tuple[str, ...]]:
+        """Pack an ordered resolver sequence into the earliest non-conflicting waves."""
+
+        ready_at: Dict[Any, int] = {fid: 0 for fid in known}
+        stages: List[List[str]] = []
+        for name in sequence:
+            spec = self.resolvers[name].spec
+            index = max((ready_at.get(fid, 0) for fid in spec.input_facts), default=0)
+            while index < len(stages) and not self._fits_wave(stages[index], name):
+                index += 1
+            if index == len(stages):
+                stages.append([])
+            stages[index].append(name)
+            for fid in spec.output_facts:
+                ready_at.setdefault(fid, index + 1)
+        return [tuple(stage) for stage in stages]
+
+    def predict_cache_hits(self, ctx: ResolutionContext, plan: ExecutionPlan) -> List[str]:
+        """Planned resolvers whose inputs are already known and whose cache holds their key.
+
+        Resolvers fed by facts that only exist after execution cannot be keyed up
+        front, so they are never predicted as hits.
+        """
+
+        hits: List[str] = []
+        for stage in plan.stages:
+            for name in stage:
+                spec = self.resolvers[name].spec
+                policy = spec.cache_policy
+                if policy is None or not spec.input_facts <= ctx.state.keys():
+                    continue
+                cache_key = policy.build_cache_key(ctx, spec)
+                contains = getattr(policy, "contains", None)
+                hit = contains(cache_key) if contains else policy.fetch(cache_key) is not None
+                if hit:
+                    hits.append(name)
+        return hits
+
+    def _cached_plan(self, ctx: ResolutionContext, staged: bool) -> ExecutionPlan | None:
+        if self.plan_cache is None:
+            return self.compile_plan(ctx.state.keys(), staged) if self.optimal else None
+        key = self._plan_key(ctx, staged)
+        live_registry = self.registry is None
+        plan = self.plan_cache.get(key, live_registry)
+        if plan is None:
+            plan = self.compile_plan(ctx.state.keys(), staged)
+            self.plan_cache.put(key, plan, live_registry)
+        return plan
+
+    def _streams(self, name: str) -> bool:
+        if not self.pipeline:
+            return False
+        resolver = self.resolvers[name]
+        return resolver.spec.timeout_ms is None and resolver.streams_outputs()
+
+    def _merge(
+        self, ctx: ResolutionContext, outputs: Iterable[Any], name: str, on_fact: FactListener | None = None
+    ) -> Set[Any]:
+        outputs = list(outputs)
+        new_facts = {output.fact_id for output in outputs if output.fact_id not in ctx.state}
+        merge_outputs(ctx, outputs, self.schemas)
+        spec = self.resolvers[name].spec
+        ctx.record_execution(name, spec.input_facts, (output.fact_id for output in outputs))
+        if on_fact is not None:
+            for fid in dict.fromkeys(output.fact_id for output in outputs):
+                on_fact(FactEvent(fid, _snapshot(ctx.state[fid]), name))
+        return new_facts
+
+    def _merge_batch(self, contexts: List[ResolutionContext], outputs: List[Any], name: str) -> List[Set[Any]]:
+        """Merge one resolver's outputs into many contexts with one normalization call per fact id."""
+
+        rows = [list(row) for row in outputs]
+        new_facts = [
+            {output.fact_id for output in row if output.fact_id not in ctx.state} for ctx, row in zip(contexts, rows)
+        ]
+        merge_outputs_bulk(contexts, rows, self.schemas)
+        spec = self.resolvers[name].spec
+        for ctx, row in zip(contexts, rows):
+            ctx.record_execution(name, spec.input_facts, (output.fact_id for output in row))
+        return new_facts
+
+    def _merge_stage(
+        self,
+        ctx: ResolutionContext,
+        stage: List[str],
+        results: List[Any],
+        result: PlannerResult,
+        staged: bool,
+        on_fact: FactListener | None = None,
+    ) -> Tuple[Set[Any], bool]:
+        """Merge a finished stage in priority order; report new facts and whether outputs matched the specs.
+
+        A ``None`` result marks a resolver abandoned after its timeout.
+        """
+
+        new_facts: Set[Any] = set()
+        expected = True
+        for name, outputs in zip(stage, results):
+            if outputs is None:
+                result.timed_out_resolvers.append(name)
+                expected = False
+                continue
+            outputs = list(outputs)
+            produced = {output.fact_id for output in outputs}
+            expected = expected and produced == self.resolvers[name].spec.output_facts
+            new_facts |= self._merge(ctx, outputs, name, on_fact)
+            result.executed_resolvers.append(name)
+        if staged:
+            result.waves.append(list(stage))
+        return new_facts, expected
+
+    def _over_budget(self, stage: Iterable[str], budget: _Budget) -> List[str]:
+        """Resolvers whose estimated cost exceeds the remaining budget."""
+
+        remaining = budget.remaining_ms()
+        if remaining is None:
+            return []
+        return [name for name in stage if self._resolver_cost(self.resolvers[name]) > remaining]
+
+    def _affordable(self, stage: List[str], budget: _Budget, result: PlannerResult) -> List[str]:
+        over = self._over_budget(stage, budget)
+        result.skipped_resolvers.extend(over)
+        return [name for name in stage if name not in over]
+
+    def _timeout(self, name: str, budget: _Budget) -> float | None:
+        """Seconds a resolver may run: its own ``timeout_ms`` capped by the remaining budget."""
+
+        limits = [self.resolvers[name].spec.timeout_ms, budget.remaining_ms()]
+        limits = [limit for limit in limits if limit is not None]
+        return max(min(limits), 0.0) / 1000 if limits else None
+
+    def _run_stage(
+        self,
+        ctx: ResolutionContext,
+        stage: List[str],
+        pool: Executor | None,
+        result: PlannerResult,
+        budget: _Budget,
+        on_fact: FactListener | None = None,
+    ) -> Tuple[Set[Any], bool]:
+        timeouts = [self._timeout(name, budget) for name in stage]
+        if pool is None and all(timeout is None for timeout in timeouts):
+            results = [self.resolvers[name].execute(ctx) for name in stage]
+            return self._merge_stage(ctx, stage, results, result, False, on_fact)
+
+        # Overruns cannot be interrupted, so their threads are abandoned and any
+        # late outputs discarded; a transient pool keeps them off the wave pool.
+        runner = pool or ThreadPoolExecutor(max_workers=len(stage))
+        try:
+            submitted = time.monotonic()
+            futures = [runner.submit(self.resolvers[name].execute, ctx) for name in stage]
+            results: List[Any] = []
+            for future, timeout in zip(futures, timeouts):
+                wait = None if timeout is None else max(submitted + timeout - time.monotonic(), 0.0)
+                try:
+                    results.append(future.result(timeout=wait))
+                except FutureTimeoutError:
+                    future.cancel()
+                    results.append(None)
+        finally:
+            if runner is not pool:
+                runner.shutdown(wait=False)
+        return self._merge_stage(ctx, stage, results, result, pool is not None, on_fact)
+
+    def _finish(self, ctx: ResolutionContext, result: PlannerResult) -> PlannerResult:
+        unresolved: List[Any] = []
+        for name in result.skipped_resolvers + result.timed_out_resolvers:
+            for fid in self.resolvers[name].spec.output_facts:
+                if fid not in ctx.state and fid not in unresolved:
+                    unresolved.append(fid)
+        if result.skipped_resolvers or result.timed_out_resolvers or result.budget_exhausted:
+            # required facts further down a chain the budget cut short are lost as well
+            for fid in sorted(self.required_facts, key=str):
+                if fid not in ctx.state and fid not in unresolved:
+                    unresolved.append(fid)
+        result.unresolved_facts = unresolved
+        return result
+
+    def _out_of_budget(self, queue: "_ScanQueue | _IndexQueue", budget: _Budget, result: PlannerResult) -> bool:
+        if not budget.exhausted():
+            return False
+        result.budget_exhausted = True
+        result.skipped_resolvers.extend(queue.drain())
+        return True
+
+    def _done(self, result: PlannerResult) -> List[str]:
+        return result.executed_resolvers + result.skipped_resolvers + result.timed_out_resolvers
 
     def run(self, ctx: ResolutionContext) -> PlannerResult:
-        executed: List[str] = []
-        pending = set(RESOLVER_REGISTRY.keys())
+        return self._run_with_pool(ctx, skip=())
+
+    def iter_run(self, ctx: ResolutionContext) -> Generator[FactEvent, None, PlannerResult]:
+        """Run like :meth:`run` but yield a :class:`FactEvent` for every merged fact as soon as it lands.
+
+        The planner runs on a background thread so events reach the caller while
+        later resolvers are still executing; the generator's return value is the
+        :class:`PlannerResult`.
+        """
+
+        events: "queue.Queue[FactEvent | None]" = queue.Queue()
+        outcome: Dict[str, Any] = {}
+
+        def worker() -> None:
+            try:
+                outcome["result"] = self._run_with_pool(ctx, skip=(), on_fact=events.put)
+            except BaseException as exc:  # re-raised in the consuming thread
+                outcome["error"] = exc
+            finally:
+                events.put(None)
+
+        thread = threading.Thread(target=worker, name="planner-iter-run", daemon=True)
+        thread.start()
+        while (event := events.get()) is not None:
+            yield event
+        thread.join()
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["result"]
 
+    def update_inputs(self, ctx: ResolutionContext, inputs: Dict[Any, Any], source: str = "input") -> PlannerResult:
+        """Change input facts of a resolved context and re-run only what depends on them.
+
+        Facts derived (transitively) from a changed input are dropped using the
+        derivations recorded in ``ctx``; resolvers that read them run again while
+        untouched branches keep their values without executing or hitting caches.
+        """
+
+        changed: Dict[Any, Any] = {}
+        for fid, value in inputs.items():
+            existing = ctx.state.get(fid)
+            normalized = self.schemas[fid].apply_normalization(value) if fid in self.schemas else value
+            if existing is None or existing.status is not FactStatus.SOLID or existing.value != normalized:
+                changed[fid] = value
+
+        ctx.invalidate(changed)
+        for fid in changed:
+            ctx.state.pop(fid, None)
+        merge_outputs(ctx, [ResolverOutput(fid, value, source=source) for fid, value in changed.items()], self.schemas)
+        return self._run_with_pool(ctx, skip=ctx.executions.keys())
+
+    def _run_with_pool(
+        self, ctx: ResolutionContext, skip: Iterable[str], on_fact: FactListener | None = None
+    ) -> PlannerResult:
+        if not (self.max_workers or self.executor):
+            return self._run(ctx, None, skip, on_fact)
+
+        # Waves: every non-conflicting eligible resolver runs on the pool, and outputs
+        # are merged in priority order so results do not depend on thread scheduling.
+        pool = self.executor or ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            return self._run(ctx, pool, skip, on_fact)
+        finally:
+            if pool is not self.executor:
+                pool.shutdown(wait=False)
+
+    def _run(
+        self,
+        ctx: ResolutionContext,
+        pool: Executor | None,
+        skip: Iterable[str] = (),
+        on_fact: FactListener | None = None,
+    ) -> PlannerResult:
+        staged = pool is not None
+        budget = _Budget(self.deadline_ms)
+        result = PlannerResult()
+        skip = list(skip)
+
+        # compiled plans assume a fresh run, so partial re-runs always plan dynamically
+        plan = None if skip else self._cached_plan(ctx, staged)
+        if plan is not None:
+            result.relevant_resolvers = None if plan.relevant_resolvers is None else list(plan.relevant_resolvers)
+            for stage in plan.stages:
+                if self._required_satisfied(ctx):
+                    return self._finish(ctx, result)
+                if budget.exhausted() or self._over_budget(stage, budget):
+                    # let the dynamic loop below skip what the budget cannot cover
+                    break
+                if pool is None and any(self._streams(name) for name in stage):
+                    # streaming producers unlock consumers mid-run, which only the dynamic loop can use
+                    break
+                _, expected = self._run_stage(ctx, list(stage), pool, result, budget, on_fact)
+                if not expected:
+                    # unexpected outputs invalidate the compiled plan; continue dynamically
+                    break
+            else:
+                return self._finish(ctx, result)
+        else:
+            result.relevant_resolvers = self._candidates(ctx)
+
+        queue = self._queue(ctx, result.relevant_resolvers, done=self._done(result) + skip)
+        pipeline = _Pipeline(self, ctx, result, on_fact)
         while True:
+            queue.facts_added(pipeline.merge_ready())
             # stop if required satisfied
-            if self.required_facts and self.required_facts.issubset(ctx.state.keys()):
+            if self._required_satisfied(ctx) or self._out_of_budget(queue, budget, result):
                 break
+            stage = self._next_stage(queue, staged)
+            if not stage:
+                if not pipeline.active:
+                    break
+                queue.facts_added(pipeline.merge_next(budget))
+                continue
+            if pool is None and not pipeline.admits(stage[0]):
+                queue.push_back(stage)
+                queue.facts_added(pipeline.merge_next(budget))
+                continue
+            stage = self._affordable(stage, budget, result)
+            if not stage:
+                continue
+            if pool is None and self._streams(stage[0]):
+                pipeline.start(stage[0])
+                continue
+            new_facts, _ = self._run_stage(ctx, stage, pool, result, budget, on_fact)
+            queue.facts_added(new_facts)
 
-            eligible = [
-                RESOLVER_REGISTRY[name]
-                for name in list(pending)
-                if RESOLVER_REGISTRY[name].can_run(ctx)
-            ]
-            if not eligible:
+        # producers always run to completion (or the deadline) so their facts stay whole
+        pipeline.drain(budget)
+        return self._finish(ctx, result)
+
+    async def arun(self, ctx: ResolutionContext) -> PlannerResult:
+        """Asynchronous wave execution that awaits independent resolvers concurrently.
+
+        ``AsyncBaseResolver`` subclasses are awaited on the running loop while
+        synchronous resolvers are moved to worker threads via ``asyncio.to_thread``.
+        Timed-out coroutines are cancelled; threads behind synchronous resolvers
+        are abandoned.
+        """
+
+        budget = _Budget(self.deadline_ms)
+        result = PlannerResult()
+
+        async def execute(name: str) -> Any:
+            timeout = self._timeout(name, budget)
+            try:
+                return await asyncio.wait_for(self.resolvers[name].aexecute(ctx), timeout)
+            except asyncio.TimeoutError:
+                return None
+
+        async def run_stage(stage: List[str]) -> Tuple[Set[Any], bool]:
+            results = await asyncio.gather(*(execute(name) for name in stage))
+            return self._merge_stage(ctx, stage, list(results), result, True)
+
+        plan = self._cached_plan(ctx, staged=True)
+        if plan is not None:
+            result.relevant_resolvers = None if plan.relevant_resolvers is None else list(plan.relevant_resolvers)
+            for stage in plan.stages:
+                if self._required_satisfied(ctx):
+                    return self._finish(ctx, result)
+                if budget.exhausted() or self._over_budget(stage, budget):
+                    break
+                _, expected = await run_stage(list(stage))
+                if not expected:
+                    break
+            else:
+                return self._finish(ctx, result)
+        else:
+            result.relevant_resolvers = self._candidates(ctx)
+
+        queue = self._queue(ctx, result.relevant_resolvers, done=self._done(result))
+        while not (self._required_satisfied(ctx) or self._out_of_budget(queue, budget, result)):
+            stage = self._next_stage(queue, staged=True)
+            if not stage:
                 break
-            # pick best by score
-            best = max(eligible, key=self._score_resolver)
-            pending.remove(best.spec.name)
-            outputs = best.execute(ctx)
-            merge_outputs(ctx, outputs)
-            executed.append(best.spec.name)
-
-        return PlannerResult(executed_resolvers=executed)
+            stage = self._affordable(stage, budget, result)
+            if not stage:
+                continue
+            new_facts, _ = await run_stage(stage)
+            queue.facts_added(new_facts)
+
+        return self._finish(ctx, result)
@@ -0,0 +1,102 @@
+"""Persistent process pool for resolvers declared with ``ResolverSpec(executor="process")``.
+
+Resolver classes are usually defined inside registration functions, so they cannot
+be pickled. Workers therefore rebuild the registry once at start-up by calling the
+configured initializers (``"package.module:function"`` strings), and each call only
+ships the resolver name plus its input facts and receives the outputs back.
+"""
+
+import importlib
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence
+
+from .state import ResolutionContext
+from .types import FactValue
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .resolver_base import BaseResolver, ResolverOutput
+
+
+_pool: ProcessPoolExecutor | None = None
+_initializers: tuple[str, ...] = ()
+_max_workers: int | None = None
+_start_method = "spawn"
+_lock = threading.Lock()
+
+
+def configure_process_pool(
+    initializers: Sequence[str] = (),
+    max_workers: int | None = None,
+    start_method: str = "spawn",
+) -> None:
+    """Set how worker processes are started; replaces any running pool."""
+
+    global _initializers, _max_workers, _start_method
+    shutdown_process_pool()
+    with _lock:
+        _initializers = tuple(initializers)
+        _max_workers = max_workers
+        _start_method = start_method
+
+
+def shutdown_process_pool() -> None:
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=_max_workers,
+                mp_context=multiprocessing.get_context(_start_method),
+                initializer=_initialize_worker,
+                initargs=(_initializers,),
+            )
+        return _pool
+
+
+def _initialize_worker(initializers: Sequence[str]) -> None:
+    for target in initializers:
+        module_name, _, func_name = target.partition(":")
+        getattr(importlib.import_module(module_name), func_name)()
+
+
+def _input_facts(resolver: "BaseResolver", ctx: ResolutionContext) -> Dict[Any, FactValue]:
+    return {fid: ctx.state[fid] for fid in resolver.spec.input_facts if fid in ctx.state}
+
+
+def _worker_resolver(name: str) -> "BaseResolver":
+    from .resolver_base import RESOLVER_REGISTRY
+
+    if name not in RESOLVER_REGISTRY:
+        raise KeyError(f"Resolver {name} is not registered in the worker process; check the pool initializers")
+    return RESOLVER_REGISTRY[name]
+
+
+def _run_in_worker(name: str, facts: Dict[Any, FactValue]) -> List["ResolverOutput"]:
+    return list(_worker_resolver(name).run(ResolutionContext(state=facts)))
+
+
+def _run_batch_in_worker(name: str, batch: List[Dict[Any, FactValue]]) -> List[List["ResolverOutput"]]:
+    contexts = [ResolutionContext(state=facts) for facts in batch]
+    return [list(outputs) for outputs in _worker_resolver(name).run_batch(contexts)]
+
+
+def run_in_process(resolver: "BaseResolver", ctx: ResolutionContext) -> List["ResolverOutput"]:
+    future = _get_pool().submit(_run_in_worker, resolver.spec.name, _input_facts(resolver, ctx))
+    return future.result()
+
+
+def run_batch_in_process(
+    resolver: "BaseResolver", contexts: Sequence[ResolutionContext]
+) -> List[List["ResolverOutput"]]:
+    batch = [_input_facts(resolver, ctx) for ctx in contexts]
+    future = _get_pool().submit(_run_batch_in_worker, resolver.spec.name, batch)
+    return future.result()
@@ -0,0 +1,122 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, Mapping, Tuple
+
+from .resolver_base import RESOLVER_REGISTRY, BaseResolver, ResolverSpec
+from .schema import FACT_SCHEMAS, FactSchema
+
+
+class Registry:
+    """Fact schemas and resolvers for one app or tenant, independent of the module globals.
+
+    Build it up with :meth:`add_schema` / :meth:`register` (or copy the globals with
+    :meth:`from_globals`) and hand :meth:`compile` snapshots to ``Planner`` and
+    ``create_app``; later changes to the registry never affect existing snapshots.
+    """
+
+    def __init__(self) -> None:
+        self.schemas: Dict[Any, FactSchema] = {}
+        self.resolvers: Dict[str, BaseResolver] = {}
+
+    @classmethod
+    def from_globals(cls) -> "Registry":
+        registry = cls()
+        registry.schemas.update(FACT_SCHEMAS)
+        registry.resolvers.update(RESOLVER_REGISTRY)
+        return registry
+
+    def add_schema(self, schema: FactSchema) -> FactSchema:
+        if schema.fact_id in self.schemas:
+            raise ValueError(f"Schema for {schema.fact_id} already registered")
+        self.schemas[schema.fact_id] = schema
+        return schema
+
+    def add_resolver(self, resolver: BaseResolver) -> BaseResolver:
+        self.resolvers[resolver.spec.name] = resolver
+        return resolver
+
+    def register(self, spec: ResolverSpec) -> Callable[[type], type]:
+        """Class decorator like ``BaseResolver.register`` that targets this registry only."""
+
+        def decorator(resolver_cls: type) -> type:
+            resolver_cls.spec = spec  # type: ignore[attr-defined]
+            self.add_resolver(resolver_cls())
+            return resolver_cls
+
+        return decorator
+
+    def compile(self) -> "RegistrySnapshot":
+        fact_ids: Dict[Any, int] = {}
+
+        def intern(fid: Any) -> int:
+            return fact_ids.setdefault(fid, len(fact_ids))
+
+        for fid in self.schemas:
+            intern(fid)
+        inputs: Dict[str, FrozenSet[int]] = {}
+        outputs: Dict[str, FrozenSet[int]] = {}
+        for name, resolver in self.resolvers.items():
+            inputs[name] = frozenset(intern(fid) for fid in resolver.spec.input_facts)
+            outputs[name] = frozenset(intern(fid) for fid in resolver.spec.output_facts)
+
+        producers: list[list[str]] = [[] for _ in fact_ids]
+        consumers: list[list[str]] = [[] for _ in fact_ids]
+        for name in self.resolvers:
+            for index in outputs[name]:
+                producers[index].append(name)
+            for index in inputs[name]:
+                consumers[index].append(name)
+
+        lookup: Dict[str, Any] = {}
+        for fid in fact_ids:
+            lookup.setdefault(str(fid), fid)
+            value = getattr(fid, "value", None)
+            if isinstance(value, str):
+                lookup.setdefault(value, fid)
+
+        return RegistrySnapshot(
+            schemas=MappingProxyType(dict(self.schemas)),
+            resolvers=MappingProxyType(dict(self.resolvers)),
+            fact_ids=tuple(fact_ids),
+            fact_index=MappingProxyType(fact_ids),
+            resolver_inputs=MappingProxyType(inputs),
+            resolver_outputs=MappingProxyType(outputs),
+            producers=tuple(tuple(names) for names in producers),
+            consumers=tuple(tuple(names) for names in consumers),
+            positions=MappingProxyType({name: position for position, name in enumerate(self.resolvers)}),
+            lookup=MappingProxyType(lookup),
+        )
+
+
+@dataclass(frozen=True, eq=False)
+class RegistrySnapshot:
+    """Immutable compiled view of a :class:`Registry`.
+
+    Fact ids are interned to dense integers (``fact_index`` / ``fact_ids``) and the
+    producer/consumer adjacency is stored per interned id. Snapshots hash by
+    identity, so plan cache entries never leak between tenants.
+    """
+
+    schemas: Mapping[Any, FactSchema]
+    resolvers: Mapping[str, BaseResolver]
+    fact_ids: Tuple[Any, ...]
+    fact_index: Mapping[Any, int]
+    resolver_inputs: Mapping[str, FrozenSet[int]]
+    resolver_outputs: Mapping[str, FrozenSet[int]]
+    producers: Tuple[Tuple[str, ...], ...]
+    consumers: Tuple[Tuple[str, ...], ...]
+    positions: Mapping[str, int]
+    lookup: Mapping[str, Any]
+
+    def resolve_fact_id(self, identifier: Any) -> Any:
+        """Map a string from a request to its fact id; unknown identifiers pass through."""
+
+        return self.lookup.get(str(identifier), identifier)
+
+    def producers_of(self, fid: Any) -> Tuple[str, ...]:
+        index = self.fact_index.get(fid)
+        return () if index is None else self.producers[index]
+
+    def consumers_of(self, fid: Any) -> Tuple[str, ...]:
+        index = self.fact_index.get(fid)
+        return () if index is None else self.consumers[index]
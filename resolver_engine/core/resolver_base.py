@@ -1,15 +1,66 @@
+import asyncio
+import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, Optional, Set
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set
 
+from .cost_model import COST_MODEL
+from .process_pool import run_batch_in_process, run_in_process
 from .state import ResolutionContext
-from .types import FactStatus, FactValue
+from .types import FactStatus, FactValue, intern_source
 from .merge import merge_outputs
 
 
-RESOLVER_REGISTRY: Dict[str, "BaseResolver"] = {}
+class ResolverRegistry(Dict[str, "BaseResolver"]):
+    """Name -> resolver mapping that counts mutations so derived plans can be invalidated."""
 
+    version: int = 0
 
-@dataclass
+    def _bump(self) -> None:
+        self.version += 1
+
+    def __setitem__(self, key: str, value: "BaseResolver") -> None:
+        super().__setitem__(key, value)
+        self._bump()
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        self._bump()
+
+    def __ior__(self, other: Any) -> "ResolverRegistry":
+        result = super().__ior__(other)
+        self._bump()
+        return result
+
+    def clear(self) -> None:
+        super().clear()
+        self._bump()
+
+    def pop(self, *args: Any) -> Any:
+        result = super().pop(*args)
+        self._bump()
+        return result
+
+    def popitem(self) -> tuple[str, "BaseResolver"]:
+        result = super().popitem()
+        self._bump()
+        return result
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        result = super().setdefault(key, default)
+        self._bump()
+        return result
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        super().update(*args, **kwargs)
+        self._bump()
+
+
+RESOLVER_REGISTRY: ResolverRegistry = ResolverRegistry()
+
+
+@dataclass(slots=True)
 class ResolverOutput:
     fact_id: Any
     value: Any
@@ -17,6 +68,9 @@ class ResolverOutput:
     note: str | None = None
     confidence: float = 1.0
 
+    def __post_init__(self) -> None:
+        self.source = intern_source(self.source)
+
 
 @dataclass
 class ResolverSpec:
@@ -27,6 +81,11 @@ class ResolverSpec:
     impact: Dict[Any, float]
     cost: float = 1.0
     cache_policy: Any | None = None
+    # seconds before cached outputs of this resolver expire; None defers to the policy
+    cache_ttl: float | None = None
+    # "process" runs the resolver on the persistent process pool (see core.process_pool)
+    executor: str = "inline"
+    timeout_ms: float | None = None
 
 
 class BaseResolver:
@@ -47,7 +106,7 @@ class BaseResolver:
     def run(self, ctx: ResolutionContext) -> Iterable[ResolverOutput]:  # pragma: no cover - abstract
         raise NotImplementedError
 
-    def execute(self, ctx: ResolutionContext, provided_inputs: Optional[Iterable[ResolverOutput]] = None):
+    def _provide_inputs(self, ctx: ResolutionContext, provided_inputs: Optional[Iterable[ResolverOutput]]) -> Set[Any]:
         provided_ids = set()
         if provided_inputs:
             for output in provided_inputs:
@@ -56,23 +115,182 @@ class BaseResolver:
                     fact_id=output.fact_id,
                     value=output.value,
                     status=FactStatus.SOLID,
-                    provenance=[output.source] if output.source else [],
+                    provenance=(output.source,) if output.source else None,
                     confidence=output.confidence,
-                    notes=[output.note] if output.note else [],
+                    notes=[output.note] if output.note else None,
                 )
-        if self.spec.cache_policy:
-            cache_key = self.spec.cache_policy.build_cache_key(ctx, self.spec)
-            cached = self.spec.cache_policy.fetch(cache_key)
-            if cached is not None:
-                for fid in provided_ids:
-                    if fid in self.spec.output_facts:
-                        ctx.state.pop(fid, None)
-                return cached
-        outputs = list(self.run(ctx))
-        if self.spec.cache_policy:
-            cache_key = self.spec.cache_policy.build_cache_key(ctx, self.spec)
-            self.spec.cache_policy.store(cache_key, outputs)
+        return provided_ids
+
+    def _release_inputs(self, ctx: ResolutionContext, provided_ids: Set[Any]) -> None:
         for fid in provided_ids:
             if fid in self.spec.output_facts:
                 ctx.state.pop(fid, None)
-        return outputs
+
+    def _fetch_cached(self, ctx: ResolutionContext) -> tuple[Any, Any]:
+        if not self.spec.cache_policy:
+            return None, None
+        cache_key = self.spec.cache_policy.build_cache_key(ctx, self.spec)
+        return cache_key, self.spec.cache_policy.fetch(cache_key)
+
+    def _store_cached(self, cache_key: Any, outputs: list[ResolverOutput]) -> None:
+        if not self.spec.cache_policy:
+            return
+        if self.spec.cache_ttl is None:
+            self.spec.cache_policy.store(cache_key, outputs)
+        else:
+            self.spec.cache_policy.store(cache_key, outputs, ttl=self.spec.cache_ttl)
+
+    def _fetch_cached_many(self, contexts: Sequence[ResolutionContext]) -> tuple[List[Any], List[Any]]:
+        policy = self.spec.cache_policy
+        if not policy:
+            return [None] * len(contexts), [None] * len(contexts)
+        keys = [policy.build_cache_key(ctx, self.spec) for ctx in contexts]
+        fetch_many = getattr(policy, "fetch_many", None)
+        if fetch_many is None:
+            return keys, [policy.fetch(key) for key in keys]
+        return keys, list(fetch_many(keys))
+
+    def _store_cached_many(self, items: List[tuple[Any, list[ResolverOutput]]]) -> None:
+        policy = self.spec.cache_policy
+        if not policy or not items:
+            return
+        store_many = getattr(policy, "store_many", None)
+        if store_many is None:
+            for cache_key, outputs in items:
+                self._store_cached(cache_key, outputs)
+        elif self.spec.cache_ttl is None:
+            store_many(items)
+        else:
+            store_many(items, ttl=self.spec.cache_ttl)
+
+    def _record_cost(self, started: float, cpu_started: float | None, cache_hit: bool) -> None:
+        wall_ms = (time.perf_counter() - started) * 1000
+        cpu_ms = (time.thread_time() - cpu_started) * 1000 if cpu_started is not None else None
+        COST_MODEL.record(self.spec.name, wall_ms, cpu_ms, cache_hit=cache_hit)
+
+    def execute(self, ctx: ResolutionContext, provided_inputs: Optional[Iterable[ResolverOutput]] = None):
+        provided_ids = self._provide_inputs(ctx, provided_inputs)
+        started = time.perf_counter()
+        cpu_started = time.thread_time() if COST_MODEL.track_cpu else None
+        try:
+            cache_key, cached = self._fetch_cached(ctx)
+            if cached is not None:
+                self._record_cost(started, cpu_started, cache_hit=True)
+                return cached
+            if self.spec.executor == "process":
+                outputs = run_in_process(self, ctx)
+            else:
+                outputs = list(self.run(ctx))
+            self._store_cached(cache_key, outputs)
+            self._record_cost(started, cpu_started, cache_hit=False)
+            return outputs
+        finally:
+            self._release_inputs(ctx, provided_ids)
+
+    def streams_outputs(self) -> bool:
+        """Whether ``run`` is a generator the planner can merge output by output."""
+
+        return inspect.isgeneratorfunction(type(self).run) and self.spec.executor != "process"
+
+    def execute_iter(self, ctx: ResolutionContext) -> Iterator[ResolverOutput]:
+        """Yield outputs as ``run`` produces them; the cache stores the full list once exhausted."""
+
+        started = time.perf_counter()
+        cpu_started = time.thread_time() if COST_MODEL.track_cpu else None
+        cache_key, cached = self._fetch_cached(ctx)
+        if cached is not None:
+            self._record_cost(started, cpu_started, cache_hit=True)
+            yield from cached
+            return
+        outputs: List[ResolverOutput] = []
+        for output in self.run(ctx):
+            outputs.append(output)
+            yield output
+        self._store_cached(cache_key, outputs)
+        self._record_cost(started, cpu_started, cache_hit=False)
+
+    def run_batch(self, contexts: Sequence[ResolutionContext]) -> List[Iterable[ResolverOutput]]:
+        """Resolve several ready contexts in one call; override for vectorized resolvers.
+
+        Must return one output iterable per context, in the same order.
+        """
+
+        return [self.run(ctx) for ctx in contexts]
+
+    def execute_batch(self, contexts: Sequence[ResolutionContext]) -> List[List[ResolverOutput]]:
+        started = time.perf_counter()
+        # one cache round trip for the lookups and one for the stores
+        keys, results = self._fetch_cached_many(contexts)
+        missed = [index for index, cached in enumerate(results) if cached is None]
+        if missed:
+            missed_contexts = [contexts[index] for index in missed]
+            if self.spec.executor == "process":
+                computed = run_batch_in_process(self, missed_contexts)
+            else:
+                computed = self.run_batch(missed_contexts)
+            stored: List[tuple[Any, list[ResolverOutput]]] = []
+            for index, outputs in zip(missed, computed):
+                outputs = list(outputs)
+                stored.append((keys[index], outputs))
+                results[index] = outputs
+            self._store_cached_many(stored)
+        if contexts:
+            # one vectorized call covers every row, so each row is charged its share
+            wall_ms = (time.perf_counter() - started) * 1000 / len(contexts)
+            missed_rows = set(missed)
+            for index in range(len(contexts)):
+                COST_MODEL.record(self.spec.name, wall_ms, cache_hit=index not in missed_rows)
+        return results
+
+    async def aexecute(self, ctx: ResolutionContext, provided_inputs: Optional[Iterable[ResolverOutput]] = None):
+        # synchronous resolvers run on a worker thread so they never block the event loop
+        return await asyncio.to_thread(self.execute, ctx, provided_inputs)
+
+
+def _run_coroutine(coro: Any) -> Any:
+    """``asyncio.run(coro)``, moved to a helper thread when this thread already runs a loop."""
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="resolver-async") as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+class AsyncBaseResolver(BaseResolver):
+    """Resolver whose ``run`` is a coroutine, awaited natively by ``Planner.arun``.
+
+    The synchronous ``execute`` and ``run_batch`` run the coroutines on their own
+    event loop. Called from inside a running loop (say, a synchronous planner in an
+    async endpoint), that loop lives on a helper thread, and the caller's loop is
+    blocked until it finishes; use ``Planner.arun`` there instead.
+    """
+
+    async def run(self, ctx: ResolutionContext) -> Iterable[ResolverOutput]:  # pragma: no cover - abstract
+        raise NotImplementedError
+
+    async def aexecute(self, ctx: ResolutionContext, provided_inputs: Optional[Iterable[ResolverOutput]] = None):
+        provided_ids = self._provide_inputs(ctx, provided_inputs)
+        # CPU time is not attributable to one coroutine, so only wall time is recorded
+        started = time.perf_counter()
+        try:
+            cache_key, cached = self._fetch_cached(ctx)
+            if cached is not None:
+                self._record_cost(started, None, cache_hit=True)
+                return cached
+            outputs = list(await self.run(ctx))
+            self._store_cached(cache_key, outputs)
+            self._record_cost(started, None, cache_hit=False)
+            return outputs
+        finally:
+            self._release_inputs(ctx, provided_ids)
+
+    def execute(self, ctx: ResolutionContext, provided_inputs: Optional[Iterable[ResolverOutput]] = None):
+        return _run_coroutine(self.aexecute(ctx, provided_inputs))
+
+    def run_batch(self, contexts: Sequence[ResolutionContext]) -> List[Iterable[ResolverOutput]]:
+        async def gather() -> List[Iterable[ResolverOutput]]:
+            return list(await asyncio.gather(*(self.run(ctx) for ctx in contexts)))
+
+        return _run_coroutine(gather())
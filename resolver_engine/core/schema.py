@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, List, Sequence
 
 
 @dataclass
@@ -9,12 +9,24 @@ class FactSchema:
     description: str
     normalize: Callable[[Any], Any] | None = None
     allow_ambiguity: bool = False
+    # optional vectorized form of ``normalize``: a list of raw values in, one normalized value each out
+    normalize_batch: Callable[[List[Any]], Sequence[Any]] | None = None
 
     def apply_normalization(self, value: Any) -> Any:
         if self.normalize:
             return self.normalize(value)
         return value
 
+    def apply_normalization_batch(self, values: List[Any]) -> List[Any]:
+        if self.normalize_batch:
+            normalized = list(self.normalize_batch(values))
+            if len(normalized) != len(values):
+                raise ValueError(
+                    f"normalize_batch for {self.fact_id} returned {len(normalized)} values for {len(values)} inputs"
+                )
+            return normalized
+        return [self.apply_normalization(value) for value in values]
+
 
 FACT_SCHEMAS: Dict[Any, FactSchema] = {}
 
@@ -1,13 +1,153 @@
+from collections.abc import MutableMapping
 from dataclasses import dataclass, field
-from typing import Any, Dict
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Mapping, Set, Tuple
 
-from .types import FactValue
+from .types import CandidateList, FactValue, Provenance
+
+
+@dataclass(frozen=True)
+class Derivation:
+    resolver: str
+    inputs: FrozenSet[Any]
+
+
+class ForkState(MutableMapping):  # type: ignore[type-arg]
+    """Copy-on-write view of a parent state: reads fall through, changes stay local.
+
+    The parent is only read, so many forks may resolve concurrently over one
+    base context as long as the base itself is left alone meanwhile.
+    """
+
+    __slots__ = ("parent", "local", "removed")
+
+    def __init__(self, parent: Mapping[Any, FactValue]):
+        self.parent = parent
+        self.local: Dict[Any, FactValue] = {}
+        self.removed: Set[Any] = set()
+
+    def __getitem__(self, fid: Any) -> FactValue:
+        fact = self.local.get(fid)
+        if fact is not None:
+            return fact
+        if fid in self.removed:
+            raise KeyError(fid)
+        return self.parent[fid]
+
+    def __setitem__(self, fid: Any, fact: FactValue) -> None:
+        self.local[fid] = fact
+        self.removed.discard(fid)
+
+    def __delitem__(self, fid: Any) -> None:
+        if fid not in self:
+            raise KeyError(fid)
+        self.local.pop(fid, None)
+        if fid in self.parent:
+            self.removed.add(fid)
+
+    def __contains__(self, fid: object) -> bool:
+        return fid in self.local or (fid not in self.removed and fid in self.parent)
+
+    def __iter__(self) -> Iterator[Any]:
+        yield from self.local
+        for fid in self.parent:
+            if fid not in self.local and fid not in self.removed:
+                yield fid
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def materialize(self, fid: Any) -> FactValue:
+        """Local copy of a shared fact, made the first time the fork changes it."""
+
+        fact = self.local.get(fid)
+        if fact is None:
+            fact = self[fid].copy()
+            # sibling forks may append concurrently, so the fork gets its own buffer
+            fact.provenance = Provenance(fact.provenance)
+            if isinstance(fact.value, CandidateList):
+                fact.value = CandidateList(fact.value)
+            self.local[fid] = fact
+        return fact
 
 
 @dataclass
 class ResolutionContext:
-    state: Dict[Any, FactValue] = field(default_factory=dict)
+    state: MutableMapping[Any, FactValue] = field(default_factory=dict)
     trace: list[str] = field(default_factory=list)
+    # fact id -> resolvers (and the inputs they read) that contributed to it
+    derivations: Dict[Any, List[Derivation]] = field(default_factory=dict)
+    # resolver name -> input fact ids it read when it last ran
+    executions: Dict[str, FrozenSet[Any]] = field(default_factory=dict)
 
     def add_trace(self, entry: str):
         self.trace.append(entry)
+
+    def fork(self) -> "ResolutionContext":
+        """Child context sharing every unchanged fact with this one (copy-on-write)."""
+
+        return ResolutionContext(
+            state=ForkState(self.state),
+            trace=list(self.trace),
+            derivations=dict(self.derivations),
+            executions=dict(self.executions),
+        )
+
+    def fact_for_update(self, fid: Any) -> FactValue:
+        """The fact at ``fid``, safe to change in place; forks copy shared facts first."""
+
+        if isinstance(self.state, ForkState):
+            return self.state.materialize(fid)
+        return self.state[fid]
+
+    def record_execution(self, resolver: str, inputs: Iterable[Any], produced: Iterable[Any]):
+        derivation = Derivation(resolver, frozenset(inputs))
+        self.executions[resolver] = derivation.inputs
+        for fid in produced:
+            derivations = self.derivations.get(fid, [])
+            if derivation not in derivations:
+                # rebinding instead of appending keeps lists shared with forks intact
+                self.derivations[fid] = derivations + [derivation]
+
+    def invalidate(self, changed: Iterable[Any]) -> Tuple[Set[Any], Set[str]]:
+        """Drop every fact derived, directly or transitively, from ``changed``.
+
+        Returns the removed fact ids and the resolvers that must run again: those
+        that read a changed or removed fact, plus every other contributor to a
+        removed fact so ambiguous values are rebuilt completely.
+        """
+
+        dirty = set(changed)
+        stale: Set[Any] = set()
+        affected: Set[str] = set()
+        while True:
+            newly_affected = {
+                name
+                for name, inputs in self.executions.items()
+                if name not in affected and inputs & dirty
+            }
+            newly_affected |= {
+                derivation.resolver
+                for fid in stale
+                for derivation in self.derivations.get(fid, [])
+                if derivation.resolver not in affected
+            }
+            if not newly_affected:
+                break
+            affected |= newly_affected
+            produced = {
+                fid
+                for fid, derivations in self.derivations.items()
+                if fid not in changed and any(d.resolver in newly_affected for d in derivations)
+            }
+            stale |= produced
+            dirty |= produced
+
+        for fid in stale:
+            self.state.pop(fid, None)
+            self.derivations.pop(fid, None)
+        for fid in changed:
+            # an explicitly set value is an input now, not a derived fact
+            self.derivations.pop(fid, None)
+        for name in affected:
+            self.executions.pop(name, None)
+        return stale, affected
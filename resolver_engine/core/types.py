@@ -1,6 +1,102 @@
+import sys
 from enum import Enum
-from dataclasses import dataclass, field
-from typing import Any, List, Optional
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+
+_LIST = object()
+_DICT = object()
+_SET = object()
+
+
+def _fingerprint(value: Any) -> Any:
+    """Hashable stand-in that is equal exactly when the values are, or ``None`` if there is none."""
+
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        pass
+    # the private tags keep frozen containers from matching genuine tuples or frozensets
+    if isinstance(value, list):
+        items = [_fingerprint(item) for item in value]
+        return None if any(item is None for item in items) else (_LIST, tuple(items))
+    if isinstance(value, dict):
+        pairs = [(key, _fingerprint(item)) for key, item in value.items()]
+        return None if any(item is None for _, item in pairs) else (_DICT, frozenset(pairs))
+    if isinstance(value, (set, frozenset)):
+        return (_SET, frozenset(value))
+    return None
+
+
+class CandidateList(List[Any]):
+    """Insertion-ordered candidates of an ambiguous or conflicting fact.
+
+    Reads like the plain list ``FactValue.value`` has always been, but membership
+    is answered from a fingerprint index so merging many candidates stays linear.
+    Values without a fingerprint fall back to equality scans.
+    """
+
+    def __init__(self, values: Iterable[Any] = ()):
+        super().__init__(values)
+        self._index: Dict[Any, None] | None = None
+        self._loose: List[Any] = []
+
+    def _indexed(self) -> Dict[Any, None]:
+        index = getattr(self, "_index", None)
+        if index is None:
+            index, loose = {}, []
+            for value in self:
+                key = _fingerprint(value)
+                if key is None:
+                    loose.append(value)
+                else:
+                    index[key] = None
+            self._index, self._loose = index, loose
+        return index
+
+    def __reduce__(self) -> Any:
+        # the index holds process-local tags, so copies and pickles rebuild it
+        return (type(self), (list(self),))
+
+    def _has(self, value: object, key: Any) -> bool:
+        if key is None:
+            return super().__contains__(value)
+        return key in self._indexed() or any(candidate == value for candidate in self._loose)
+
+    def __contains__(self, value: object) -> bool:
+        self._indexed()
+        return self._has(value, _fingerprint(value))
+
+    def add(self, value: Any) -> bool:
+        """Append ``value`` unless an equal candidate exists; report whether it was added."""
+
+        index = self._indexed()
+        key = _fingerprint(value)
+        if self._has(value, key):
+            return False
+        super().append(value)
+        if key is None:
+            self._loose.append(value)
+        else:
+            index[key] = None
+        return True
+
+
+def _invalidating(name: str) -> Any:
+    method = getattr(list, name)
+
+    def wrapper(self: CandidateList, *args: Any) -> Any:
+        self._index = None
+        return method(self, *args)
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+# direct list mutations drop the index, which is rebuilt on the next lookup
+for _name in ("append", "extend", "insert", "remove", "pop", "clear", "__setitem__", "__delitem__", "__iadd__", "__imul__"):
+    setattr(CandidateList, _name, _invalidating(_name))
 
 
 class FactStatus(Enum):
@@ -9,11 +105,143 @@ class FactStatus(Enum):
     CONFLICT = "conflict"
 
 
-@dataclass
+def intern_source(source: Any) -> Any:
+    """Share one string object per distinct source name across all facts and outputs."""
+
+    return sys.intern(source) if type(source) is str else source
+
+
+class Provenance(Sequence[str]):
+    """Append-only sequence of sources whose copies share storage.
+
+    Each view remembers how much of a shared buffer it owns. Appending to the
+    newest view extends the buffer in place; appending to an older view forks
+    it. Compares equal to lists and tuples holding the same sources.
+    """
+
+    __slots__ = ("_items", "_size")
+
+    def __init__(self, sources: Iterable[str] = ()):
+        self._items: List[str] = [intern_source(source) for source in sources]
+        self._size = len(self._items)
+
+    def append(self, source: str) -> None:
+        if self._size != len(self._items):
+            self._items = self._items[: self._size]
+        self._items.append(intern_source(source))
+        self._size += 1
+
+    def extend(self, sources: Iterable[str]) -> None:
+        for source in sources:
+            self.append(source)
+
+    def __iadd__(self, sources: Iterable[str]) -> "Provenance":
+        self.extend(sources)
+        return self
+
+    def copy(self) -> "Provenance":
+        view = Provenance.__new__(Provenance)
+        view._items = self._items
+        view._size = self._size
+        return view
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return self._items[: self._size][index]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("provenance index out of range")
+        return self._items[index]
+
+    def __iter__(self) -> Iterator[str]:
+        return islice(self._items, self._size)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (Provenance, list, tuple)):
+            return NotImplemented
+        return len(self) == len(other) and all(mine == theirs for mine, theirs in zip(self, other))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __add__(self, other: Iterable[str]) -> List[str]:
+        return list(self) + list(other)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def __reduce__(self) -> Any:
+        return (Provenance, (list(self),))
+
+
 class FactValue:
-    fact_id: Any
-    value: Any
-    status: FactStatus = FactStatus.SOLID
-    provenance: List[str] = field(default_factory=list)
-    notes: List[str] = field(default_factory=list)
-    confidence: float = 1.0
+    """A merged fact; slotted, with ``notes`` only allocated once a note is added."""
+
+    # _digest memoizes (value, fingerprint) for cache keys; see cache.fingerprint
+    __slots__ = ("fact_id", "value", "status", "_provenance", "_notes", "confidence", "_digest")
+
+    def __init__(
+        self,
+        fact_id: Any,
+        value: Any,
+        status: FactStatus = FactStatus.SOLID,
+        provenance: Iterable[str] | None = None,
+        notes: List[str] | None = None,
+        confidence: float = 1.0,
+    ):
+        self.fact_id = fact_id
+        self.value = value
+        self.status = status
+        self.provenance = provenance if provenance is not None else ()
+        self._notes = notes if notes else None
+        self.confidence = confidence
+        self._digest: Tuple[Any, bytes] | None = None
+
+    @property
+    def provenance(self) -> Provenance:
+        return self._provenance
+
+    @provenance.setter
+    def provenance(self, sources: Iterable[str]) -> None:
+        self._provenance = sources if isinstance(sources, Provenance) else Provenance(sources)
+
+    @property
+    def notes(self) -> List[str]:
+        if self._notes is None:
+            self._notes = []
+        return self._notes
+
+    @notes.setter
+    def notes(self, notes: List[str]) -> None:
+        self._notes = notes
+
+    def copy(self) -> "FactValue":
+        """Shallow copy that shares provenance storage until either side appends."""
+
+        return FactValue(
+            self.fact_id,
+            self.value,
+            self.status,
+            self._provenance.copy(),
+            list(self._notes) if self._notes else None,
+            self.confidence,
+        )
+
+    def _fields(self) -> Tuple[Any, ...]:
+        return (self.fact_id, self.value, self.status, self._provenance, self._notes or [], self.confidence)
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._fields() == other._fields()  # type: ignore[attr-defined]
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return (
+            f"FactValue(fact_id={self.fact_id!r}, value={self.value!r}, status={self.status!r}, "
+            f"provenance={self._provenance!r}, notes={self._notes or []!r}, confidence={self.confidence!r})"
+        )
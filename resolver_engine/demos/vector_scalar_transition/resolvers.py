@@ -1,4 +1,4 @@
-from typing import List
+from typing import Iterator, List
 
 import duckdb
 
@@ -25,14 +25,13 @@ def register_vector_scalar_resolvers() -> None:
         )
     )
     class VectorizedUserBatchResolver(BaseResolver):
-        def run(self, ctx: ResolutionContext) -> List[ResolverOutput]:
+        def run(self, ctx: ResolutionContext) -> Iterator[ResolverOutput]:
+            # Yielding lets the planner hand records to PrimaryUserResolver before the count is merged.
             relation = ctx.state[VectorScalarFacts.USER_BATCH_RELATION].value
             columns = relation.columns
             records = [dict(zip(columns, row)) for row in relation.fetchall()]
-            return [
-                ResolverOutput(VectorScalarFacts.USER_RECORDS, records, source="duckdb.vectorized"),
-                ResolverOutput(VectorScalarFacts.USER_COUNT, len(records), source="duckdb.vectorized"),
-            ]
+            yield ResolverOutput(VectorScalarFacts.USER_RECORDS, records, source="duckdb.vectorized")
+            yield ResolverOutput(VectorScalarFacts.USER_COUNT, len(records), source="duckdb.vectorized")
 
     @BaseResolver.register(
         ResolverSpec(
@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from resolver_engine.core.merge import merge_outputs
 from resolver_engine.core.planner import Planner
 from resolver_engine.core.resolver_base import RESOLVER_REGISTRY, ResolverOutput
@@ -51,3 +53,109 @@ def test_support_triage_demo_flow():
     assert ctx.state[SupportFacts.SEVERITY].value == "critical"
     assert ctx.state[SupportFacts.ASSIGNED_TEAM].value == "SRE"
     assert ctx.state[SupportFacts.ETA_DAYS].value == 1
+
+
+def test_weather_and_support_demos_share_a_wave():
+    register_weather_schemas()
+    weather_resolvers.register_weather_resolvers()
+    register_support_schemas()
+    support_resolvers.register_support_resolvers()
+
+    ctx = ResolutionContext()
+    merge_outputs(
+        ctx,
+        [
+            ResolverOutput(WeatherFacts.LOCATION, "Phoenix", source="demo.input"),
+            ResolverOutput(SupportFacts.INCIDENT_SUMMARY, "Checkout is slow", source="demo.input"),
+        ],
+    )
+
+    result = Planner(required_facts=set(), user_priority={}, max_workers=2).run(ctx)
+
+    assert set(result.waves[0]) == {"WeatherLookupResolver", "SeverityClassifierResolver"}
+    assert ctx.state[WeatherFacts.WARDROBE].value == "T-shirt"
+    assert ctx.state[SupportFacts.ASSIGNED_TEAM].value == "Backend"
+
+
+def test_update_inputs_reruns_only_the_affected_chain():
+    register_weather_schemas()
+    weather_resolvers.register_weather_resolvers()
+    register_support_schemas()
+    support_resolvers.register_support_resolvers()
+
+    ctx = ResolutionContext()
+    merge_outputs(
+        ctx,
+        [
+            ResolverOutput(WeatherFacts.LOCATION, "Seattle", source="demo.input"),
+            ResolverOutput(SupportFacts.INCIDENT_SUMMARY, "Checkout is slow", source="demo.input"),
+        ],
+    )
+    planner = Planner(
+        required_facts={WeatherFacts.WARDROBE, WeatherFacts.UMBRELLA_NEEDED, SupportFacts.ASSIGNED_TEAM},
+        user_priority={},
+    )
+    first = planner.run(ctx)
+    assert "SeverityClassifierResolver" in first.executed_resolvers
+    assert ctx.state[WeatherFacts.WARDROBE].value == "Light jacket"
+
+    result = planner.update_inputs(ctx, {WeatherFacts.LOCATION: "Phoenix"})
+
+    assert result.executed_resolvers == ["WeatherLookupResolver", "WardrobePlannerResolver"]
+    assert ctx.state[WeatherFacts.LOCATION].value == "Phoenix"
+    assert ctx.state[WeatherFacts.WARDROBE].value == "T-shirt"
+    assert ctx.state[WeatherFacts.UMBRELLA_NEEDED].value is False
+    assert ctx.state[SupportFacts.ASSIGNED_TEAM].value == "Backend"
+    assert [d.resolver for d in ctx.derivations[WeatherFacts.TEMPERATURE_F]] == ["WeatherLookupResolver"]
+
+
+def test_update_inputs_with_unchanged_values_runs_nothing():
+    register_weather_schemas()
+    weather_resolvers.register_weather_resolvers()
+
+    ctx = ResolutionContext()
+    merge_outputs(ctx, [ResolverOutput(WeatherFacts.LOCATION, "Seattle", source="demo.input")])
+    planner = Planner(required_facts={WeatherFacts.WARDROBE}, user_priority={})
+    planner.run(ctx)
+
+    result = planner.update_inputs(ctx, {WeatherFacts.LOCATION: "Seattle"})
+
+    assert result.executed_resolvers == []
+    assert ctx.state[WeatherFacts.WARDROBE].value == "Light jacket"
+
+
+def test_forks_run_what_if_scenarios_in_parallel_over_a_shared_base():
+    register_weather_schemas()
+    weather_resolvers.register_weather_resolvers()
+    register_support_schemas()
+    support_resolvers.register_support_resolvers()
+
+    base = ResolutionContext()
+    merge_outputs(
+        base,
+        [
+            ResolverOutput(WeatherFacts.LOCATION, "Seattle", source="demo.input"),
+            ResolverOutput(SupportFacts.INCIDENT_SUMMARY, "Checkout is slow", source="demo.input"),
+        ],
+    )
+    planner = Planner(required_facts={WeatherFacts.WARDROBE, SupportFacts.ASSIGNED_TEAM}, user_priority={})
+    planner.run(base)
+    snapshot = {fid: fact.copy() for fid, fact in base.state.items()}
+
+    locations = ["Phoenix", "New York", "Seattle", "Nowhere"] * 2
+    forks = [base.fork() for _ in locations]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda fork, loc: planner.update_inputs(fork, {WeatherFacts.LOCATION: loc}), forks, locations))
+
+    assert [fork.state[WeatherFacts.WARDROBE].value for fork in forks[:4]] == [
+        "T-shirt",
+        "T-shirt",
+        "Light jacket",
+        "T-shirt",
+    ]
+    assert base.state == snapshot
+    assert forks[0].state[SupportFacts.ASSIGNED_TEAM] is base.state[SupportFacts.ASSIGNED_TEAM]
+    assert WeatherFacts.WARDROBE in forks[0].state.local
+    assert SupportFacts.ASSIGNED_TEAM not in forks[0].state.local
+    # an unchanged input re-runs nothing and materializes nothing
+    assert results[2].executed_resolvers == [] and not forks[2].state.local
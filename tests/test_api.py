@@ -1,10 +1,14 @@
+import json
 from enum import Enum
+from pathlib import Path
 from typing import Type
 
 import pytest
 from fastapi.testclient import TestClient
 
 from resolver_engine.app import create_app
+from resolver_engine.core.cache.sqlite_cache import SQLiteCachePolicy
+from resolver_engine.core.registry import Registry
 from resolver_engine.core.schema import FactSchema, FACT_SCHEMAS, register_fact_schema
 from resolver_engine.core.resolver_base import BaseResolver, ResolverSpec, ResolverOutput, RESOLVER_REGISTRY
 from resolver_engine.core.state import ResolutionContext
@@ -113,3 +117,181 @@ def test_explain_endpoint_lists_resolvers_and_metadata() -> None:
     assert DemoFacts.USER_NAME.value in resolver_info["inputs"]
     assert DemoFacts.USER_ID.value in resolver_info["outputs"]
     assert resolver_info["impact"][DemoFacts.USER_ID.value] == 1.0
+
+
+def test_plan_endpoint_estimates_without_executing(tmp_path: Path) -> None:
+    register_fact_schema(FactSchema(DemoFacts.USER_NAME, py_type=str, description="name"))
+    register_fact_schema(FactSchema(DemoFacts.USER_ID, py_type=int, description="id"))
+    cache = SQLiteCachePolicy(db_path=tmp_path / "cache.db")
+    calls: list[str] = []
+
+    @BaseResolver.register(
+        ResolverSpec(
+            name="UserIdResolver",
+            description="maps name to id",
+            input_facts={DemoFacts.USER_NAME},
+            output_facts={DemoFacts.USER_ID},
+            impact={DemoFacts.USER_ID: 1.0},
+            cost=3,
+            cache_policy=cache,
+        )
+    )
+    class UserIdResolver(BaseResolver):
+        def run(self, ctx: ResolutionContext) -> list[ResolverOutput]:
+            calls.append(ctx.state[DemoFacts.USER_NAME].value)
+            return [ResolverOutput(DemoFacts.USER_ID, len(ctx.state[DemoFacts.USER_NAME].value))]
+
+    client = TestClient(create_app())
+    body = {
+        "inputs": {DemoFacts.USER_NAME.value: "Alice"},
+        "required_facts": [DemoFacts.USER_ID.value],
+    }
+
+    resp = client.post("/api/plan", json=body)
+    assert resp.status_code == 200
+    planned = resp.json()
+    assert planned["plan"] == [["UserIdResolver"]]
+    assert planned["estimated_cost"] == 3
+    assert planned["predicted_cache_hits"] == []
+    assert calls == []
+
+    client.post("/api/run", json=body)
+    assert client.post("/api/plan", json=body).json()["predicted_cache_hits"] == ["UserIdResolver"]
+    assert calls == ["Alice"]
+
+
+def test_plan_endpoint_matches_run_and_is_rate_limited() -> None:
+    register_fact_schema(FactSchema(DemoFacts.USER_NAME, py_type=str, description="name"))
+    register_fact_schema(FactSchema(DemoFacts.USER_ID, py_type=int, description="id"))
+
+    for name, inputs, cost, impact in (("Shortcut", set(), 10, 5.0), ("Lookup", {DemoFacts.USER_NAME}, 2, 0.5)):
+
+        @BaseResolver.register(
+            ResolverSpec(
+                name=name,
+                description=name,
+                input_facts=inputs,
+                output_facts={DemoFacts.USER_ID},
+                impact={DemoFacts.USER_ID: impact},
+                cost=cost,
+            )
+        )
+        class _Res(BaseResolver):
+            def run(self, ctx: ResolutionContext) -> list[ResolverOutput]:
+                return [ResolverOutput(DemoFacts.USER_ID, 1)]
+
+    body = {"inputs": {DemoFacts.USER_NAME.value: "Alice"}, "required_facts": [DemoFacts.USER_ID.value]}
+    for optimal, expected in ((False, "Shortcut"), (True, "Lookup")):
+        client = TestClient(create_app(rate_limit_per_minute=3, optimal=optimal))
+        planned = client.post("/api/plan", json=body).json()["plan"]
+        assert planned == [[expected]]
+        assert client.post("/api/run", json=body).json()["trace"] == [expected]
+        client.post("/api/plan", json=body)
+        assert client.post("/api/plan", json=body).status_code == 429
+
+
+def test_run_endpoint_reports_facts_left_unresolved_by_deadline() -> None:
+    register_fact_schema(FactSchema(DemoFacts.USER_NAME, py_type=str, description="name"))
+    register_fact_schema(FactSchema(DemoFacts.USER_ID, py_type=int, description="id"))
+
+    @BaseResolver.register(
+        ResolverSpec(
+            name="ExpensiveUserId",
+            description="too slow for the request budget",
+            input_facts={DemoFacts.USER_NAME},
+            output_facts={DemoFacts.USER_ID},
+            impact={DemoFacts.USER_ID: 1.0},
+            cost=10_000,
+        )
+    )
+    class ExpensiveUserId(BaseResolver):
+        def run(self, ctx: ResolutionContext) -> list[ResolverOutput]:
+            return [ResolverOutput(DemoFacts.USER_ID, 1)]
+
+    client = TestClient(create_app())
+    resp = client.post(
+        "/api/run",
+        json={
+            "inputs": {DemoFacts.USER_NAME.value: "Alice"},
+            "required_facts": [DemoFacts.USER_ID.value],
+            "deadline_ms": 50,
+        },
+    )
+
+    body = resp.json()
+    assert resp.status_code == 200
+    assert body["skipped"] == ["ExpensiveUserId"]
+    assert body["unresolved_facts"] == [DemoFacts.USER_ID.value]
+    assert DemoFacts.USER_ID.value not in body["facts"]
+
+
+def test_run_endpoints_reject_invalid_deadlines() -> None:
+    _setup_demo_resolver()
+    client = TestClient(create_app())
+    body = {"inputs": {DemoFacts.USER_NAME.value: "Alice"}, "required_facts": [DemoFacts.USER_ID.value]}
+
+    for deadline in ("soon", -5, True, [50]):
+        for path in ("/api/run", "/api/run/stream"):
+            resp = client.post(path, json={**body, "deadline_ms": deadline})
+            assert resp.status_code == 422, (path, deadline)
+
+
+def test_run_stream_endpoint_emits_facts_then_summary() -> None:
+    _setup_demo_resolver()
+    client = TestClient(create_app())
+    body = {
+        "inputs": {DemoFacts.USER_NAME.value: "Alice"},
+        "required_facts": [DemoFacts.USER_ID.value],
+    }
+
+    resp = client.post("/api/run/stream", json=body)
+    events = [json.loads(line) for line in resp.text.splitlines()]
+
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    assert events == [
+        {
+            "event": "fact",
+            "fact": DemoFacts.USER_ID.value,
+            "value": 5,
+            "status": "solid",
+            "provenance": [],
+            "resolver": "UserIdResolver",
+        },
+        {"event": "done", "trace": ["UserIdResolver"], "unresolved_facts": [], "timed_out": [], "skipped": []},
+    ]
+
+    sse = client.post("/api/run/stream", json=body, headers={"Accept": "text/event-stream"})
+    assert sse.headers["content-type"].startswith("text/event-stream")
+    assert sse.text.startswith("event: fact\ndata: {")
+    assert "event: done\n" in sse.text
+
+
+def test_apps_with_registry_snapshots_serve_separate_tenants() -> None:
+    clients = {}
+    for tenant, factor in (("short", 1), ("long", 10)):
+        registry = Registry()
+        registry.add_schema(FactSchema(DemoFacts.USER_NAME, py_type=str, description="name"))
+        registry.add_schema(FactSchema(DemoFacts.USER_ID, py_type=int, description="id"))
+
+        def make_resolver(factor: int) -> None:
+            @registry.register(
+                ResolverSpec(
+                    name="UserIdResolver",
+                    description="maps name to id",
+                    input_facts={DemoFacts.USER_NAME},
+                    output_facts={DemoFacts.USER_ID},
+                    impact={DemoFacts.USER_ID: 1.0},
+                )
+            )
+            class UserIdResolver(BaseResolver):
+                def run(self, ctx: ResolutionContext) -> list[ResolverOutput]:
+                    return [ResolverOutput(DemoFacts.USER_ID, len(ctx.state[DemoFacts.USER_NAME].value) * factor)]
+
+        make_resolver(factor)
+        clients[tenant] = TestClient(create_app(registry=registry.compile()))
+
+    body = {"inputs": {DemoFacts.USER_NAME.value: "Alice"}, "required_facts": [DemoFacts.USER_ID.value]}
+    assert not FACT_SCHEMAS and not RESOLVER_REGISTRY
+    assert clients["short"].post("/api/run", json=body).json()["facts"][DemoFacts.USER_ID.value] == 5
+    assert clients["long"].post("/api/run", json=body).json()["facts"][DemoFacts.USER_ID.value] == 50
+    assert list(clients["long"].get("/api/schema").json()) == [DemoFacts.USER_NAME.value, DemoFacts.USER_ID.value]
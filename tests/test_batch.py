@@ -0,0 +1,96 @@
+from enum import Enum
+
+from resolver_engine.core.batch import BatchPlanner
+from resolver_engine.core.merge import merge_outputs
+from resolver_engine.core.planner import Planner
+from resolver_engine.core.resolver_base import BaseResolver, ResolverSpec, ResolverOutput, RESOLVER_REGISTRY
+from resolver_engine.core.schema import FACT_SCHEMAS, FactSchema, register_fact_schema
+from resolver_engine.core.state import ResolutionContext
+
+
+class DemoFacts(str, Enum):
+    NAME = "demo.name"
+    LENGTH = "demo.length"
+    PARITY = "demo.parity"
+
+
+def setup_function(function):
+    FACT_SCHEMAS.clear()
+    RESOLVER_REGISTRY.clear()
+
+
+def _register(batch_calls):
+    register_fact_schema(FactSchema(DemoFacts.NAME, py_type=str, description="name"))
+    register_fact_schema(FactSchema(DemoFacts.LENGTH, py_type=int, description="length"))
+    register_fact_schema(FactSchema(DemoFacts.PARITY, py_type=str, description="parity"))
+
+    @BaseResolver.register(
+        ResolverSpec(
+            name="LengthResolver",
+            description="vectorized length",
+            input_facts={DemoFacts.NAME},
+            output_facts={DemoFacts.LENGTH},
+            impact={DemoFacts.LENGTH: 1.0},
+        )
+    )
+    class LengthResolver(BaseResolver):
+        def run(self, ctx: ResolutionContext):
+            return [ResolverOutput(DemoFacts.LENGTH, len(ctx.state[DemoFacts.NAME].value))]
+
+        def run_batch(self, contexts):
+            batch_calls.append(len(contexts))
+            names = [ctx.state[DemoFacts.NAME].value for ctx in contexts]
+            return [[ResolverOutput(DemoFacts.LENGTH, len(name))] for name in names]
+
+    @BaseResolver.register(
+        ResolverSpec(
+            name="ParityResolver",
+            description="scalar fallback",
+            input_facts={DemoFacts.LENGTH},
+            output_facts={DemoFacts.PARITY},
+            impact={DemoFacts.PARITY: 1.0},
+        )
+    )
+    class ParityResolver(BaseResolver):
+        def run(self, ctx: ResolutionContext):
+            length = ctx.state[DemoFacts.LENGTH].value
+            return [ResolverOutput(DemoFacts.PARITY, "even" if length % 2 == 0 else "odd")]
+
+
+def _contexts(names):
+    contexts = []
+    for name in names:
+        ctx = ResolutionContext()
+        merge_outputs(ctx, [ResolverOutput(DemoFacts.NAME, name, source="input")])
+        contexts.append(ctx)
+    return contexts
+
+
+def test_batch_planner_makes_one_call_per_resolver_per_wave():
+    batch_calls = []
+    _register(batch_calls)
+    contexts = _contexts(["Ada", "Grace", "Alan", "Edsger"])
+
+    batch = BatchPlanner(required_facts={DemoFacts.PARITY}, user_priority={}).run(contexts)
+
+    assert batch_calls == [4]
+    assert batch.waves == [["LengthResolver"], ["ParityResolver"]]
+    assert [ctx.state[DemoFacts.PARITY].value for ctx in contexts] == ["odd", "odd", "even", "even"]
+    assert all(result.executed_resolvers == ["LengthResolver", "ParityResolver"] for result in batch.results)
+
+
+def test_batch_planner_matches_per_context_planner_runs():
+    _register([])
+    batched = _contexts(["Ada", "Grace"])
+    # a context that already knows its length skips the first resolver
+    merge_outputs(batched[1], [ResolverOutput(DemoFacts.LENGTH, 2, source="input")])
+    single = _contexts(["Ada", "Grace"])
+    merge_outputs(single[1], [ResolverOutput(DemoFacts.LENGTH, 2, source="input")])
+
+    batch = BatchPlanner(required_facts={DemoFacts.PARITY}, user_priority={}).run(batched)
+    planner = Planner(required_facts={DemoFacts.PARITY}, user_priority={})
+    expected = [planner.run(ctx).executed_resolvers for ctx in single]
+
+    assert [result.executed_resolvers for result in batch.results] == expected
+    assert batch.waves == [["LengthResolver", "ParityResolver"], ["ParityResolver"]]
+    assert [ctx.state[DemoFacts.PARITY].value for ctx in batched] == ["odd", "even"]
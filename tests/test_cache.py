@@ -1,10 +1,24 @@
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import FrozenInstanceError, dataclass
 from enum import Enum
+from pathlib import Path
+
+import duckdb
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
 
 from resolver_engine.core.schema import FactSchema, register_fact_schema, FACT_SCHEMAS
+from resolver_engine.core.cache import parquet_cache, sqlite_cache
 from resolver_engine.core.cache.sqlite_cache import SQLiteCachePolicy
+from resolver_engine.core.cache.fingerprint import fingerprint, register_hasher
 from resolver_engine.core.cache.parquet_cache import ParquetCachePolicy
+from resolver_engine.core.cache.tiered_cache import TieredCachePolicy
 from resolver_engine.core.resolver_base import BaseResolver, ResolverSpec, ResolverOutput
 from resolver_engine.core.state import ResolutionContext
+from resolver_engine.core.types import FactValue
 from resolver_engine.core.merge import merge_outputs
 
 
@@ -81,6 +95,44 @@ def test_cache_key_includes_relevant_facts(tmp_path):
     assert outputs1[0].value != outputs2[0].value
 
 
+def test_sqlite_cache_uses_wal_and_one_connection_per_thread(tmp_path):
+    cache = SQLiteCachePolicy(db_path=tmp_path / "cache.db", synchronous="OFF")
+    cache.store("key", [ResolverOutput(DemoFacts.A, "x", source="calc")])
+
+    def lookup(_):
+        return cache.fetch("key")[0].value
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        values = list(pool.map(lookup, range(40)))
+
+    conn = cache._connection()
+    assert values == ["x"] * 40
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 0
+    assert conn is cache._connection()
+    # the pool's connections were closed with its threads
+    assert cache._connections == [conn]
+    cache.close()
+
+
+def test_sqlite_cache_batches_commits_but_serves_pending_entries(tmp_path):
+    cache = SQLiteCachePolicy(db_path=tmp_path / "cache.db", batch_size=3)
+    other = SQLiteCachePolicy(db_path=tmp_path / "cache.db")
+
+    cache.store("a", [ResolverOutput(DemoFacts.A, 1)])
+    cache.store("b", [ResolverOutput(DemoFacts.A, 2)])
+
+    assert cache.fetch("a")[0].value == 1 and cache.contains("b")
+    assert other.fetch("a") is None
+
+    cache.store("c", [ResolverOutput(DemoFacts.A, 3)])
+    assert [other.fetch(key)[0].value for key in "abc"] == [1, 2, 3]
+
+    cache.store("d", [ResolverOutput(DemoFacts.A, 4)])
+    cache.close()
+    assert other.fetch("d")[0].value == 4
+
+
 def test_parquet_cache_limit_enforced(tmp_path):
     cache_dir = tmp_path / "parquet"
     cache = ParquetCachePolicy(base_path=cache_dir, max_total_bytes=1500)
@@ -94,3 +146,506 @@ def test_parquet_cache_limit_enforced(tmp_path):
 
     total = sum(p.stat().st_size for p in cache_dir.glob("*.parquet"))
     assert total <= cache.max_total_bytes
+
+
+def test_tiered_cache_promotes_l2_hits_and_shares_frozen_outputs(tmp_path):
+    l2 = SQLiteCachePolicy(db_path=tmp_path / "cache.db")
+    l2.store("warm", [ResolverOutput(DemoFacts.A, "w", source="calc")])
+    cache = TieredCachePolicy(l2, max_entries=8)
+
+    first = cache.fetch("warm")
+    second = cache.fetch("warm")
+
+    assert first == [ResolverOutput(DemoFacts.A, "w", source="calc")]
+    assert first is not second and first[0] is second[0]
+    assert (cache.l1_hits, cache.l2_hits, cache.misses) == (1, 1, 0)
+    with pytest.raises(FrozenInstanceError):
+        first[0].value = "changed"
+
+    cache.store("new", [ResolverOutput(DemoFacts.B, 1)])
+    assert l2.fetch("new")[0].value == 1 and cache.contains("new")
+    assert cache.fetch("missing") is None and cache.misses == 1
+
+
+def test_tiered_cache_plugs_into_resolver_spec(tmp_path):
+    register_fact_schema(FactSchema(DemoFacts.A, py_type=str, description="a"))
+    register_fact_schema(FactSchema(DemoFacts.B, py_type=str, description="b"))
+    cache = TieredCachePolicy(SQLiteCachePolicy(db_path=tmp_path / "cache.db"))
+    calls = []
+
+    class Upper(BaseResolver):
+        spec = ResolverSpec(
+            name="Upper",
+            description="upper",
+            input_facts={DemoFacts.A},
+            output_facts={DemoFacts.B},
+            impact={DemoFacts.B: 1.0},
+            cache_policy=cache,
+        )
+
+        def run(self, ctx):
+            calls.append(1)
+            return [ResolverOutput(DemoFacts.B, ctx.state[DemoFacts.A].value.upper(), source="upper")]
+
+    for _ in range(3):
+        ctx = ResolutionContext()
+        merge_outputs(ctx, [ResolverOutput(DemoFacts.A, "x", source="input")])
+        merge_outputs(ctx, Upper().execute(ctx))
+        assert ctx.state[DemoFacts.B].value == "X"
+
+    assert len(calls) == 1 and cache.l1_hits == 2
+
+
+def test_tiered_cache_evicts_by_entries_and_bytes(tmp_path):
+    lru = TieredCachePolicy(SQLiteCachePolicy(db_path=tmp_path / "lru.db"), max_entries=2)
+    for key in "abc":
+        lru.store(key, [ResolverOutput(DemoFacts.A, key)])
+        lru.fetch("a")
+    assert set(lru._entries) == {"a", "c"}
+
+    lfu = TieredCachePolicy(SQLiteCachePolicy(db_path=tmp_path / "lfu.db"), max_entries=2, eviction="lfu")
+    lfu.store("hot", [ResolverOutput(DemoFacts.A, 1)])
+    for _ in range(3):
+        lfu.fetch("hot")
+    lfu.store("warm", [ResolverOutput(DemoFacts.A, 2)])
+    lfu.fetch("hot")
+    lfu.store("cold", [ResolverOutput(DemoFacts.A, 3)])
+    assert set(lfu._entries) == {"hot", "cold"}
+
+    sized = TieredCachePolicy(SQLiteCachePolicy(db_path=tmp_path / "sized.db"), max_bytes=2_000)
+    for index in range(4):
+        sized.store(str(index), [ResolverOutput(DemoFacts.A, "x" * 600)])
+    assert 0 < len(sized._entries) < 4 and sized.l1_bytes <= 2_000
+    assert sized.fetch("0")[0].value == "x" * 600
+
+
+def test_tiered_cache_reports_l1_hits_to_the_l2(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(sqlite_cache.time, "time", lambda: now[0])
+    monkeypatch.setattr(parquet_cache.time, "monotonic", lambda: now[0])
+
+    sqlite = SQLiteCachePolicy(db_path=tmp_path / "cache.db", max_rows=2)
+    tier = TieredCachePolicy(sqlite)
+    for key in "ab":
+        now[0] += 1
+        tier.store(key, [ResolverOutput(DemoFacts.A, key)])
+    now[0] += 1
+    assert tier.fetch("a")[0].value == "a" and tier.l1_hits == 1
+    tier.store("c", [ResolverOutput(DemoFacts.A, "c")])
+    sqlite.evict()
+    assert sqlite.contains("a") and not sqlite.contains("b")
+
+    parquet = ParquetCachePolicy(base_path=tmp_path / "parquet", keep_served_for=30)
+    tier = TieredCachePolicy(parquet)
+    parquet.store("table", [ResolverOutput(DemoFacts.A, pa.table({"x": [1, 2]}))])
+    parquet.store("relation", [ResolverOutput(DemoFacts.A, duckdb.sql("SELECT 1 AS x"))])
+    tier.fetch("table")
+    tier.fetch("relation")
+    now[0] += 60
+    assert tier.fetch("table")[0].value.equals(pa.table({"x": [1, 2]}))
+    # relations are not promoted, so each fetch goes back to the L2 for a fresh one
+    assert "relation" not in tier._entries and tier.l2_hits == 2
+
+    parquet.max_total_bytes = 0
+    parquet.enforce_limit()
+    assert tier.fetch("relation") is None
+    assert len(list((tmp_path / "parquet").glob("*.parquet"))) == 1
+
+
+def test_sqlite_cache_hides_expired_rows_with_policy_and_resolver_ttls(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(sqlite_cache.time, "time", lambda: now[0])
+    cache = SQLiteCachePolicy(db_path=tmp_path / "cache.db", ttl=60)
+    spec = ResolverSpec(
+        name="Short",
+        description="short lived",
+        input_facts=set(),
+        output_facts={DemoFacts.A},
+        impact={DemoFacts.A: 1.0},
+        cache_policy=cache,
+        cache_ttl=5,
+    )
+
+    class Short(BaseResolver):
+        def run(self, ctx):
+            return [ResolverOutput(DemoFacts.A, "fresh")]
+
+    Short.spec = spec
+    Short().execute(ResolutionContext())
+    cache.store("long", [ResolverOutput(DemoFacts.A, 1)])
+    cache.store("forever", [ResolverOutput(DemoFacts.A, 2)], ttl=10**9)
+
+    now[0] += 10
+    assert cache.fetch("{}") is None and not cache.contains("{}")
+    assert cache.fetch("long")[0].value == 1
+    now[0] += 60
+    assert cache.fetch("long") is None and cache.contains("forever")
+
+    plan = cache._connection().execute("EXPLAIN QUERY PLAN " + sqlite_cache._FETCH_SQL, ("k", 0)).fetchall()
+    assert all("SCAN" not in row[-1] for row in plan)
+    assert cache.evict() == 2
+    assert cache._connection().execute("SELECT cache_key FROM cache").fetchall() == [("forever",)]
+
+
+def test_sqlite_cache_migrates_old_tables(tmp_path):
+    conn = sqlite3.connect(tmp_path / "cache.db")
+    conn.execute("CREATE TABLE cache (cache_key TEXT PRIMARY KEY, payload TEXT)")
+    conn.execute("INSERT INTO cache VALUES ('old', ?)", (json.dumps([{"fact_id": "demo.a", "value": 7}]),))
+    conn.commit()
+    conn.close()
+
+    cache = SQLiteCachePolicy(db_path=tmp_path / "cache.db", max_rows=10)
+
+    assert cache.fetch("old")[0].value == 7
+    assert cache._connection().execute("SELECT size > 0, expires FROM cache").fetchone() == (1, None)
+
+
+def test_sqlite_cache_evicts_least_recently_accessed_rows_in_background(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(sqlite_cache.time, "time", lambda: now[0])
+    cache = SQLiteCachePolicy(db_path=tmp_path / "cache.db", max_rows=3, evict_every=5)
+
+    for key in "abcd":
+        now[0] += 1
+        cache.store(key, [ResolverOutput(DemoFacts.A, key)])
+    now[0] += 1
+    cache.fetch("a")
+    now[0] += 1
+    cache.store("e", [ResolverOutput(DemoFacts.A, "e")])
+    cache._evictor.join()
+
+    keys = {row[0] for row in cache._connection().execute("SELECT cache_key FROM cache")}
+    assert keys == {"a", "d", "e"}
+
+    bounded = SQLiteCachePolicy(db_path=tmp_path / "bounded.db", max_bytes=300)
+    for index in range(10):
+        bounded.store(str(index), [ResolverOutput(DemoFacts.A, "x" * 50)])
+    bounded.evict()
+    total = bounded._connection().execute("SELECT SUM(size) FROM cache").fetchone()[0]
+    assert total <= 300 and bounded.contains("9") and not bounded.contains("0")
+    cache.close()
+
+
+def test_sqlite_cache_keeps_running_totals_without_scanning(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(sqlite_cache.time, "time", lambda: now[0])
+    conn = sqlite3.connect(tmp_path / "cache.db")
+    conn.execute("CREATE TABLE cache (cache_key TEXT PRIMARY KEY, payload TEXT)")
+    conn.execute("INSERT INTO cache VALUES ('old', ?)", (json.dumps([{"fact_id": "demo.a", "value": 7}]),))
+    conn.commit()
+    conn.close()
+
+    cache = SQLiteCachePolicy(db_path=tmp_path / "cache.db", max_rows=4)
+    db = cache._connection()
+
+    def totals():
+        assert db.execute(sqlite_cache._STATS_SQL).fetchone() == db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+        ).fetchone()
+        return db.execute(sqlite_cache._STATS_SQL).fetchone()
+
+    assert totals()[0] == 1
+    for index in range(6):
+        cache.store(str(index), [ResolverOutput(DemoFacts.A, "x" * index)])
+    cache.store("0", [ResolverOutput(DemoFacts.A, "longer than before")])
+    cache.store("short", [ResolverOutput(DemoFacts.A, 1)], ttl=1)
+    assert totals()[0] == 8
+
+    now[0] += 5
+    assert cache.evict() == 4
+    assert totals()[0] == 4
+    cache.clear()
+    assert totals() == (0, 0)
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+def test_parquet_cache_round_trips_relation_outputs_lazily(tmp_path, file_format):
+    register_fact_schema(FactSchema(DemoFacts.A, py_type=str, description="a"))
+    cache = ParquetCachePolicy(base_path=tmp_path, file_format=file_format)
+    calls = []
+
+    class Users(BaseResolver):
+        spec = ResolverSpec(
+            name="Users",
+            description="relation",
+            input_facts={DemoFacts.A},
+            output_facts={DemoFacts.B},
+            impact={DemoFacts.B: 1.0},
+            cache_policy=cache,
+        )
+
+        def run(self, ctx):
+            calls.append(1)
+            relation = duckdb.sql("SELECT range AS user_id, 'u' || range AS name FROM range(5)")
+            return [
+                ResolverOutput(DemoFacts.B, relation, source="duckdb", note="users"),
+                ResolverOutput(DemoFacts.A, pa.table({"x": [1, 2]}), source="arrow"),
+            ]
+
+    ctx = ResolutionContext()
+    merge_outputs(ctx, [ResolverOutput(DemoFacts.A, "seed", source="input")])
+    Users().execute(ctx)
+    relation, table = Users().execute(ctx)
+
+    assert len(calls) == 1
+    assert isinstance(relation.value, duckdb.DuckDBPyRelation) and relation.note == "users"
+    assert relation.value.aggregate("count(*)").fetchone() == (5,)
+    assert table.value.equals(pa.table({"x": [1, 2]}))
+    assert cache.total_bytes == sum(p.stat().st_size for p in tmp_path.glob(f"*.{file_format}"))
+
+    reopened = ParquetCachePolicy(base_path=tmp_path, file_format=file_format)
+    assert reopened.contains(cache.build_cache_key(ctx, Users.spec))
+
+
+def test_parquet_cache_keys_relation_inputs_by_content(tmp_path):
+    cache = ParquetCachePolicy(base_path=tmp_path)
+    spec = ResolverSpec("R", "r", {DemoFacts.A}, {DemoFacts.B}, {DemoFacts.B: 1.0})
+
+    def key(sql):
+        ctx = ResolutionContext()
+        ctx.state[DemoFacts.A] = FactValue(DemoFacts.A, duckdb.sql(sql))
+        return cache.build_cache_key(ctx, spec)
+
+    assert key("SELECT 1 AS a") == key("SELECT 1 AS a") != key("SELECT 2 AS a")
+
+
+def test_parquet_cache_enforces_limit_from_its_index(tmp_path, monkeypatch):
+    cache = ParquetCachePolicy(base_path=tmp_path, max_total_bytes=10_000_000)
+    for index in range(6):
+        cache.store(str(index), [ResolverOutput(DemoFacts.A, pa.table({"x": list(range(100))}))])
+    cache.fetch("0")
+    entry_size = cache.total_bytes // 6
+
+    stats = []
+    original_stat = Path.stat
+    monkeypatch.setattr(Path, "stat", lambda self, **kw: stats.append(self) or original_stat(self, **kw))
+    cache.max_total_bytes = entry_size * 4
+    cache.enforce_limit()
+
+    assert stats == []
+    assert [key for key in "012345" if cache.contains(key)] == ["0", "3", "4", "5"]
+    assert len(list(tmp_path.glob("*.parquet"))) == 4
+
+    cache.close()
+    reopened = ParquetCachePolicy(base_path=tmp_path)
+    assert reopened.total_bytes == cache.total_bytes and reopened.fetch("1") is None
+    assert len((tmp_path / "manifest.jsonl").read_text().splitlines()) == 4
+
+
+def test_parquet_cache_keeps_recently_served_files_past_eviction(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(parquet_cache.time, "monotonic", lambda: now[0])
+    cache = ParquetCachePolicy(base_path=tmp_path, keep_served_for=30)
+    relation = duckdb.sql("SELECT range AS x FROM range(100)")
+    cache.store("served", [ResolverOutput(DemoFacts.A, relation)])
+    cache.store("idle", [ResolverOutput(DemoFacts.A, relation)])
+    (lazy,) = cache.fetch("served")
+
+    cache.max_total_bytes = 0
+    cache.enforce_limit()
+
+    assert not cache.contains("served") and cache.total_bytes == 0
+    assert lazy.value.aggregate("sum(x)").fetchone() == (4950,)
+    assert len(list(tmp_path.glob("*.parquet"))) == 1
+    # the grace period survives a rescan triggered by another writer
+    (tmp_path / "other.txt").write_text("x")
+    assert not cache.contains("idle") and cache.total_bytes == 0
+
+    now[0] += 31
+    cache.enforce_limit()
+    assert list(tmp_path.glob("*.parquet")) == []
+
+
+def test_parquet_cache_compacts_its_manifest_and_expires_without_rescanning(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(parquet_cache.time, "time", lambda: now[0])
+    cache = ParquetCachePolicy(base_path=tmp_path)
+    for index in range(500):
+        outputs = [ResolverOutput(DemoFacts.A, pa.table({"x": [index]})), ResolverOutput(DemoFacts.B, index)]
+        cache.store(str(index % 3), outputs)
+
+    lines = (tmp_path / "manifest.jsonl").read_text().splitlines()
+    assert len(lines) <= 2 * 3 + parquet_cache.COMPACT_SLACK
+    assert ParquetCachePolicy(base_path=tmp_path).fetch("2")[1].value == 497
+
+    cache.store("short", [ResolverOutput(DemoFacts.A, pa.table({"x": [1]}))], ttl=5)
+    now[0] += 10
+    rescans = []
+    monkeypatch.setattr(cache, "_rescan", lambda: rescans.append(1))
+    assert cache.fetch("short") is None
+    assert cache.fetch("0") is not None and rescans == []
+
+
+def test_fingerprints_are_fixed_size_and_type_aware(tmp_path):
+    table = pa.table({"x": [1, 2, 3], "s": ["a", "b", None]})
+    same = pa.table({"x": [1, 2, 3], "s": ["a", "b", None]})
+
+    assert len(fingerprint({"a": [1, 2], "b": {3}})) == 16
+    assert fingerprint({"a": 1, "b": 2}) == fingerprint({"b": 2, "a": 1})
+    assert len({fingerprint(value) for value in (1, "1", True, 1.0, None, b"1")}) == 6
+    assert fingerprint(table) == fingerprint(same) != fingerprint(pa.table({"x": [1, 2, 4], "s": ["a", "b", None]}))
+    assert fingerprint(duckdb.arrow(table)) == fingerprint(duckdb.arrow(same))
+    assert fingerprint(duckdb.sql("SELECT 1 AS a")) == fingerprint(duckdb.sql("SELECT 1 AS a"))
+
+    path = tmp_path / "users.parquet"
+    pq.write_table(table, path)
+    before = (fingerprint(path), fingerprint(str(path)), fingerprint(duckdb.read_parquet(str(path))))
+    pq.write_table(pa.table({"x": [9]}), path)
+    after = (fingerprint(path), fingerprint(str(path)), fingerprint(duckdb.read_parquet(str(path))))
+    assert all(old != new for old, new in zip(before, after))
+
+
+def test_fingerprints_walk_object_fields_instead_of_pickling():
+    @dataclass
+    class Point:
+        x: int
+        tags: list
+
+    class Box:
+        def __init__(self, content):
+            self.content = content
+
+    class Slotted:
+        __slots__ = ("x",)
+
+    assert fingerprint(Point(1, ["a"])) == fingerprint(Point(1, ["a"])) != fingerprint(Point(2, ["a"]))
+    assert fingerprint(Box(Point(1, ["a"]))) == fingerprint(Box(Point(1, ["a"]))) != fingerprint(Box(1))
+    assert fingerprint(Box(1)) != fingerprint(Point(1, []))
+    with pytest.raises(TypeError, match="register a hasher"):
+        fingerprint(Slotted())
+
+
+def test_cache_keys_memoize_fact_fingerprints_and_include_the_resolver(tmp_path):
+    register_fact_schema(FactSchema(DemoFacts.A, py_type=object, description="a", allow_ambiguity=True))
+    hashed = []
+
+    class Payload:
+        def __init__(self, key):
+            self.key = key
+
+        def __eq__(self, other):
+            return isinstance(other, Payload) and other.key == self.key
+
+        __hash__ = None
+
+    @register_hasher(Payload)
+    def _hash_payload(value, h):
+        hashed.append(value.key)
+        h.update(value.key.encode())
+
+    cache = SQLiteCachePolicy(db_path=tmp_path / "cache.db")
+    first = ResolverSpec("First", "first", {DemoFacts.A, DemoFacts.B}, {DemoFacts.B}, {DemoFacts.B: 1.0})
+    second = ResolverSpec("Second", "second", {DemoFacts.A}, {DemoFacts.B}, {DemoFacts.B: 1.0})
+    ctx = ResolutionContext()
+    merge_outputs(ctx, [ResolverOutput(DemoFacts.A, Payload("x"), source="r1")])
+
+    key = cache.build_cache_key(ctx, first)
+    assert cache.build_cache_key(ctx, first) == key != cache.build_cache_key(ctx, second)
+    assert len(key) == 32 and hashed == ["x"]
+
+    merge_outputs(ctx, [ResolverOutput(DemoFacts.A, Payload("y"), source="r2")])
+    assert cache.build_cache_key(ctx, first) != key
+    assert hashed == ["x", "x", "y"]
+
+
+def test_sqlite_fetch_many_and_store_many_use_one_round_trip(tmp_path):
+    cache = SQLiteCachePolicy(db_path=tmp_path / "cache.db", ttl=60)
+    statements = []
+    cache._connection().set_trace_callback(statements.append)
+
+    cache.store_many([(str(index), [ResolverOutput(DemoFacts.A, index)]) for index in range(1200)])
+    # the cache_stats triggers re-trace the statement that fired them
+    writes = [statement for index, statement in enumerate(statements) if statements[index - 1 : index] != [statement]]
+    statements.clear()
+    found = cache.fetch_many(["5", "missing", "1100", "5"])
+
+    assert [statement.split()[0] for statement in writes] == ["BEGIN", "INSERT", *["INSERT"] * 1199, "COMMIT"]
+    assert len(statements) == 1 and " IN (" in statements[0]
+    assert [None if outputs is None else outputs[0].value for outputs in found] == [5, None, 1100, 5]
+    assert len(cache.fetch_many([str(index) for index in range(1200)])) == 1200
+
+
+def test_execute_batch_uses_batched_cache_calls(tmp_path):
+    register_fact_schema(FactSchema(DemoFacts.A, py_type=int, description="a"))
+    register_fact_schema(FactSchema(DemoFacts.B, py_type=int, description="b"))
+    calls = []
+
+    class CountingCache(SQLiteCachePolicy):
+        def fetch(self, cache_key):
+            calls.append("fetch")
+            return super().fetch(cache_key)
+
+        def fetch_many(self, cache_keys):
+            calls.append(("fetch_many", len(cache_keys)))
+            return super().fetch_many(cache_keys)
+
+        def store_many(self, items, ttl=None):
+            items = list(items)
+            calls.append(("store_many", len(items)))
+            super().store_many(items, ttl)
+
+    cache = TieredCachePolicy(CountingCache(db_path=tmp_path / "cache.db"))
+
+    class Double(BaseResolver):
+        spec = ResolverSpec("Double", "double", {DemoFacts.A}, {DemoFacts.B}, {DemoFacts.B: 1.0}, cache_policy=cache)
+
+        def run(self, ctx):
+            return [ResolverOutput(DemoFacts.B, ctx.state[DemoFacts.A].value * 2)]
+
+    def contexts(values):
+        rows = []
+        for value in values:
+            ctx = ResolutionContext()
+            merge_outputs(ctx, [ResolverOutput(DemoFacts.A, value)])
+            rows.append(ctx)
+        return rows
+
+    first = Double().execute_batch(contexts([1, 2, 3]))
+    cache.clear()
+    second = Double().execute_batch(contexts([1, 2, 3, 4]))
+    third = Double().execute_batch(contexts([4, 1]))
+
+    assert [outputs[0].value for outputs in first + second + third] == [2, 4, 6, 2, 4, 6, 8, 8, 2]
+    assert calls == [("fetch_many", 3), ("store_many", 3), ("fetch_many", 4), ("store_many", 4)]
+
+
+def test_parquet_cache_honours_resolver_cache_ttl(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(parquet_cache.time, "time", lambda: now[0])
+    register_fact_schema(FactSchema(DemoFacts.A, py_type=str, description="a"))
+    cache = ParquetCachePolicy(base_path=tmp_path)
+    calls = []
+
+    class Table(BaseResolver):
+        spec = ResolverSpec(
+            name="Table",
+            description="short-lived relation",
+            input_facts={DemoFacts.A},
+            output_facts={DemoFacts.B},
+            impact={DemoFacts.B: 1.0},
+            cache_policy=TieredCachePolicy(cache, ttl=60),
+            cache_ttl=5,
+        )
+
+        def run(self, ctx):
+            calls.append(1)
+            return [ResolverOutput(DemoFacts.B, pa.table({"x": [len(calls)]}))]
+
+    ctx = ResolutionContext()
+    merge_outputs(ctx, [ResolverOutput(DemoFacts.A, "seed", source="input")])
+    Table().execute(ctx)
+    key = cache.build_cache_key(ctx, Table.spec)
+    assert cache.contains(key)
+
+    now[0] += 10
+    assert not cache.contains(key) and cache.fetch(key) is None
+    assert not list(tmp_path.glob("*.parquet"))
+
+    direct = ParquetCachePolicy(base_path=tmp_path / "direct", ttl=5)
+    Table.spec.cache_policy = direct
+    Table().execute(ctx)
+    assert Table().execute(ctx)[0].value.equals(pa.table({"x": [2]}))
+    assert ParquetCachePolicy(base_path=tmp_path / "direct").contains(key)
+    now[0] += 10
+    assert Table().execute(ctx)[0].value.equals(pa.table({"x": [3]}))
+    assert len(calls) == 3
@@ -0,0 +1,139 @@
+import tracemalloc
+from enum import Enum
+
+import pyarrow.parquet as pq
+
+from resolver_engine.core.batch import BatchPlanner
+from resolver_engine.core.columnar import ColumnarContext
+from resolver_engine.core.merge import merge_outputs
+from resolver_engine.core.resolver_base import RESOLVER_REGISTRY, BaseResolver, ResolverOutput, ResolverSpec
+from resolver_engine.core.schema import FACT_SCHEMAS, FactSchema, register_fact_schema
+from resolver_engine.core.state import ResolutionContext
+from resolver_engine.core.types import FactStatus
+
+
+class DemoFacts(str, Enum):
+    NAME = "demo.name"
+    GREETING = "demo.greeting"
+    TAG = "demo.tag"
+    AGE = "demo.age"
+    ACTIVE = "demo.active"
+
+
+def setup_function(function):
+    FACT_SCHEMAS.clear()
+    RESOLVER_REGISTRY.clear()
+
+
+def _register_greeting():
+    register_fact_schema(FactSchema(DemoFacts.NAME, py_type=str, description="name", normalize=str.strip))
+    register_fact_schema(FactSchema(DemoFacts.GREETING, py_type=str, description="greeting"))
+    register_fact_schema(FactSchema(DemoFacts.TAG, py_type=str, description="tag", allow_ambiguity=True))
+
+    @BaseResolver.register(
+        ResolverSpec(
+            name="Greeter",
+            description="scalar resolver reading ctx.state[fid].value",
+            input_facts={DemoFacts.NAME},
+            output_facts={DemoFacts.GREETING},
+            impact={DemoFacts.GREETING: 1.0},
+        )
+    )
+    class Greeter(BaseResolver):
+        def run(self, ctx: ResolutionContext):
+            return [ResolverOutput(DemoFacts.GREETING, f"hi {ctx.state[DemoFacts.NAME].value}", source="greeter")]
+
+
+def test_row_views_resolve_with_batch_planner_and_expose_columns():
+    _register_greeting()
+    store = ColumnarContext(3)
+    store.set_column(DemoFacts.NAME, [" ada ", "bob", None], source="input")
+
+    rows = store.rows()
+    batch = BatchPlanner(required_facts={DemoFacts.GREETING}, user_priority={}).run(rows)
+
+    assert [result.executed_resolvers for result in batch.results] == [["Greeter"], ["Greeter"], []]
+    assert rows[0].state[DemoFacts.GREETING].value == "hi ada"
+    assert rows[1].state[DemoFacts.GREETING].provenance == ["greeter"]
+    assert DemoFacts.GREETING not in rows[2].state
+    assert store.column(DemoFacts.GREETING).to_pylist() == ["hi ada", "hi bob", None]
+
+
+def test_row_merges_keep_in_place_updates_and_export_to_parquet(tmp_path):
+    _register_greeting()
+    store = ColumnarContext(2)
+    row = store.rows()[0]
+
+    merge_outputs(row, [ResolverOutput(DemoFacts.TAG, "a", source="r1", note="first")])
+    merge_outputs(row, [ResolverOutput(DemoFacts.TAG, "b", source="r2")])
+
+    tag = row.state[DemoFacts.TAG]
+    assert tag.status is FactStatus.AMBIGUOUS
+    assert tag.value == ["a", "b"] and tag.provenance == ["r1", "r2"] and tag.notes == ["first"]
+
+    path = tmp_path / "facts.parquet"
+    store.to_parquet(path)
+    table = pq.read_table(path)
+
+    assert table.column("demo.tag").to_pylist() == [None, None]
+    assert table.column("demo.tag.status").to_pylist() == ["ambiguous", None]
+    assert table.column("demo.tag.provenance").to_pylist() == [["r1", "r2"], None]
+    assert table.column("demo.tag.candidates").to_pylist() == [["a", "b"], None]
+
+
+def test_columnar_rows_use_far_less_memory_than_fact_values():
+    _register_greeting()
+    register_fact_schema(FactSchema(DemoFacts.AGE, py_type=int, description="age"))
+    size = 5_000
+    names = [f"user{index}" for index in range(size)]
+    ages = [1_000 + index for index in range(size)]
+
+    tracemalloc.start()
+    contexts = []
+    for name, age in zip(names, ages):
+        ctx = ResolutionContext()
+        outputs = [
+            ResolverOutput(DemoFacts.NAME, name, source="input"),
+            ResolverOutput(DemoFacts.AGE, age, source="input"),
+        ]
+        merge_outputs(ctx, outputs)
+        contexts.append(ctx)
+    per_context = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # the store is only useful together with the row views resolvers run on
+    tracemalloc.start()
+    store = ColumnarContext(size)
+    store.set_column(DemoFacts.NAME, names, source="input")
+    store.set_column(DemoFacts.AGE, ages, source="input")
+    rows = store.rows()
+    columnar = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    assert rows[42].state[DemoFacts.NAME].value == "user42" and rows[42].state[DemoFacts.AGE].value == 1_042
+    assert columnar * 3 < per_context
+
+
+def test_typed_columns_keep_schema_types_unboxed():
+    register_fact_schema(FactSchema(DemoFacts.AGE, py_type=int, description="age", allow_ambiguity=True))
+    register_fact_schema(FactSchema(DemoFacts.ACTIVE, py_type=bool, description="active"))
+    store = ColumnarContext(4)
+    store.set_column(DemoFacts.AGE, [30, None, 41, "unknown"], source="input")
+    store.set_column(DemoFacts.ACTIVE, [True, False, None, True], source="input")
+    rows = store.rows()
+    merge_outputs(rows[2], [ResolverOutput(DemoFacts.AGE, 42, source="other")])
+
+    column = store.columns[DemoFacts.AGE]
+    assert column.values.typecode == "q" and set(column.boxed) == {2, 3}
+    assert rows[0].state[DemoFacts.AGE].value == 30 and type(rows[0].state[DemoFacts.AGE].value) is int
+    assert rows[2].state[DemoFacts.AGE].value == [41, 42]
+    assert rows[3].state[DemoFacts.AGE].value == "unknown"
+    assert store.column(DemoFacts.AGE).to_pylist() == [30, None, None, None]
+    assert store.column(DemoFacts.ACTIVE).to_pylist() == [True, False, None, True]
+
+    table = store.to_arrow()
+    assert table.column("demo.age.status").to_pylist() == ["solid", None, "ambiguous", "solid"]
+    assert table.column("demo.age.candidates").to_pylist() == [None, None, [41, 42], None]
+    assert table.column("demo.active.confidence").to_pylist() == [1.0, 1.0, None, 1.0]
+    # rows only allocate bookkeeping once they use it
+    assert "trace" not in vars(rows[1]) and rows[1].trace == [] and "trace" in vars(rows[1])
@@ -0,0 +1,132 @@
+from enum import Enum
+
+from resolver_engine.core.cache.sqlite_cache import SQLiteCachePolicy
+from resolver_engine.core.cost_model import COST_MODEL, CostModel
+from resolver_engine.core.plan_cache import PlanCache
+from resolver_engine.core.planner import Planner
+from resolver_engine.core.resolver_base import BaseResolver, ResolverSpec, ResolverOutput, RESOLVER_REGISTRY
+from resolver_engine.core.schema import FACT_SCHEMAS, FactSchema, register_fact_schema
+from resolver_engine.core.state import ResolutionContext
+
+
+class DemoFacts(str, Enum):
+    FOO = "demo.foo"
+    BAR = "demo.bar"
+
+
+def setup_function(function):
+    FACT_SCHEMAS.clear()
+    RESOLVER_REGISTRY.clear()
+    COST_MODEL.clear()
+
+
+def test_execute_records_cache_hits_and_misses_separately(tmp_path):
+    register_fact_schema(FactSchema(DemoFacts.FOO, py_type=str, description="foo"))
+    register_fact_schema(FactSchema(DemoFacts.BAR, py_type=str, description="bar"))
+
+    @BaseResolver.register(
+        ResolverSpec(
+            name="CachedBar",
+            description="cached",
+            input_facts={DemoFacts.FOO},
+            output_facts={DemoFacts.BAR},
+            impact={DemoFacts.BAR: 1.0},
+            cache_policy=SQLiteCachePolicy(db_path=tmp_path / "cache.db"),
+        )
+    )
+    class CachedBar(BaseResolver):
+        def run(self, ctx: ResolutionContext):
+            return [ResolverOutput(DemoFacts.BAR, "bar")]
+
+    for _ in range(3):
+        CachedBar().execute(ResolutionContext(), [ResolverOutput(DemoFacts.FOO, "x")])
+
+    assert COST_MODEL.misses["CachedBar"].samples == 1
+    assert COST_MODEL.hits["CachedBar"].samples == 2
+    assert COST_MODEL.expected_cost("CachedBar") is not None
+
+
+def test_learned_costs_override_static_spec_costs():
+    register_fact_schema(FactSchema(DemoFacts.FOO, py_type=str, description="foo"))
+
+    for name, cost in (("Guessed", 1), ("Honest", 5)):
+
+        @BaseResolver.register(
+            ResolverSpec(
+                name=name,
+                description=name,
+                input_facts=set(),
+                output_facts={DemoFacts.FOO},
+                cost=cost,
+                impact={DemoFacts.FOO: 1.0},
+            )
+        )
+        class _Res(BaseResolver):
+            def run(self, ctx: ResolutionContext):
+                return [ResolverOutput(DemoFacts.FOO, "foo")]
+
+    # "Guessed" claims to be cheap but was observed to take 50ms
+    COST_MODEL.record("Guessed", 50.0)
+    COST_MODEL.record("Honest", 5.0)
+
+    static = Planner(required_facts={DemoFacts.FOO}, user_priority={})
+    learned = Planner(required_facts={DemoFacts.FOO}, user_priority={}, learned_costs=True)
+
+    assert static.run(ResolutionContext()).executed_resolvers == ["Guessed"]
+    assert learned.run(ResolutionContext()).executed_resolvers == ["Honest"]
+
+
+def test_cached_plans_follow_learned_costs():
+    register_fact_schema(FactSchema(DemoFacts.FOO, py_type=str, description="foo"))
+
+    for name, cost in (("X", 1), ("Y", 5)):
+
+        @BaseResolver.register(
+            ResolverSpec(
+                name=name,
+                description=name,
+                input_facts=set(),
+                output_facts={DemoFacts.FOO},
+                cost=cost,
+                impact={DemoFacts.FOO: 1.0},
+            )
+        )
+        class _Res(BaseResolver):
+            def run(self, ctx: ResolutionContext):
+                return [ResolverOutput(DemoFacts.FOO, "foo")]
+
+    cache = PlanCache()
+
+    def planned():
+        planner = Planner(required_facts={DemoFacts.FOO}, user_priority={}, plan_cache=cache, learned_costs=True)
+        return planner.run(ResolutionContext()).executed_resolvers
+
+    assert planned() == ["X"]
+    for _ in range(5):
+        COST_MODEL.record("X", 500.0)
+        COST_MODEL.record("Y", 1.0)
+
+    assert planned() == ["Y"]
+    hits = cache.hits
+    # small drifts keep serving the cached plan
+    COST_MODEL.record("Y", 1.0)
+    assert planned() == ["Y"]
+    assert cache.hits == hits + 1
+
+
+def test_cost_model_ewma_and_persistence(tmp_path):
+    model = CostModel(alpha=0.5)
+    model.record("Res", 10.0)
+    model.record("Res", 20.0)
+    model.record("Res", 2.0, cache_hit=True)
+
+    assert model.misses["Res"].wall_ms == 15.0
+    assert model.expected_cost("Res") == 15.0 * 2 / 3 + 2.0 / 3
+
+    path = tmp_path / "costs.json"
+    model.save(path)
+    restored = CostModel()
+    restored.load(path)
+
+    assert restored.expected_cost("Res") == model.expected_cost("Res")
+    assert restored.misses["Res"].samples == 2
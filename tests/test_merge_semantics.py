@@ -1,10 +1,12 @@
+import sys
+import threading
 from enum import Enum
 
 from resolver_engine.core.schema import FactSchema, FACT_SCHEMAS, register_fact_schema
 from resolver_engine.core.state import ResolutionContext
-from resolver_engine.core.merge import merge_outputs
+from resolver_engine.core.merge import merge_outputs, merge_outputs_bulk
 from resolver_engine.core.resolver_base import ResolverOutput
-from resolver_engine.core.types import FactStatus
+from resolver_engine.core.types import CandidateList, FactStatus
 
 
 class DemoFacts(str, Enum):
@@ -85,3 +87,136 @@ def test_merge_preserves_notes_and_confidence():
     fact = ctx.state[DemoFacts.FOO]
     assert "first" in fact.notes and "second" in fact.notes
     assert fact.confidence == 0.9
+
+
+def test_ambiguous_candidates_are_indexed_without_changing_list_semantics():
+    register_fact_schema(
+        FactSchema(DemoFacts.FOO, py_type=list, description="foo", allow_ambiguity=True)
+    )
+    ctx = ResolutionContext()
+    first = [1, 2]
+    merge_outputs(ctx, [ResolverOutput(DemoFacts.FOO, first, source="r1")])
+
+    merge_outputs(
+        ctx,
+        [
+            ResolverOutput(DemoFacts.FOO, 3, source="r2"),
+            ResolverOutput(DemoFacts.FOO, {"a": [1]}, source="r3"),
+            ResolverOutput(DemoFacts.FOO, 2, source="r4"),
+            ResolverOutput(DemoFacts.FOO, {"a": [1]}, source="r5"),
+        ],
+    )
+
+    fact = ctx.state[DemoFacts.FOO]
+    assert fact.status is FactStatus.AMBIGUOUS
+    assert fact.value == [1, 2, 3, {"a": [1]}]
+    assert isinstance(fact.value, CandidateList)
+    assert fact.provenance == ["r1", "r2", "r3", "r4", "r5"]
+    # the solid list a resolver produced is copied, not extended in place
+    assert first == [1, 2]
+
+
+def test_candidate_list_falls_back_to_equality_for_unhashable_values():
+    class Unhashable:
+        __hash__ = None
+
+        def __init__(self, key):
+            self.key = key
+
+        def __eq__(self, other):
+            return isinstance(other, Unhashable) and other.key == self.key
+
+    candidates = CandidateList(["x"])
+
+    assert candidates.add(Unhashable(1))
+    assert not candidates.add(Unhashable(1))
+    assert not candidates.add("x")
+    candidates.append([5])
+    assert [5] in candidates and Unhashable(1) in candidates and Unhashable(2) not in candidates
+
+
+def test_bulk_merge_normalizes_each_fact_id_in_one_batch_call():
+    batches = []
+
+    def upper_batch(values):
+        batches.append(list(values))
+        return [value.upper() for value in values]
+
+    register_fact_schema(
+        FactSchema(DemoFacts.FOO, py_type=str, description="foo", normalize_batch=upper_batch)
+    )
+    contexts = [ResolutionContext() for _ in range(3)]
+
+    merge_outputs_bulk(
+        contexts,
+        [
+            [ResolverOutput(DemoFacts.FOO, "a", source="r1")],
+            [ResolverOutput(DemoFacts.FOO, "b", source="r1")],
+            [ResolverOutput(DemoFacts.FOO, "c", source="r1"), ResolverOutput(DemoFacts.FOO, "C", source="r2")],
+        ],
+    )
+
+    assert batches == [["a", "b", "c", "C"]]
+    assert [ctx.state[DemoFacts.FOO].value for ctx in contexts] == ["A", "B", "C"]
+    assert contexts[2].state[DemoFacts.FOO].status is FactStatus.SOLID
+    assert contexts[2].state[DemoFacts.FOO].provenance == ["r1", "r2"]
+
+
+def test_bulk_merge_falls_back_to_per_value_normalize():
+    register_fact_schema(
+        FactSchema(DemoFacts.FOO, py_type=str, description="foo", normalize=str.strip, allow_ambiguity=True)
+    )
+    ctx = ResolutionContext()
+
+    merge_outputs_bulk([ctx], [[ResolverOutput(DemoFacts.FOO, " x "), ResolverOutput(DemoFacts.FOO, "y")]])
+
+    assert ctx.state[DemoFacts.FOO].status is FactStatus.AMBIGUOUS
+    assert ctx.state[DemoFacts.FOO].value == ["x", "y"]
+
+
+def test_fact_values_are_slotted_with_lazy_notes_and_shared_provenance():
+    register_fact_schema(FactSchema(DemoFacts.FOO, py_type=str, description="foo"))
+    ctx = ResolutionContext()
+    source = "".join(["resolver", ".a"])
+    merge_outputs(ctx, [ResolverOutput(DemoFacts.FOO, "x", source=source)])
+
+    fact = ctx.state[DemoFacts.FOO]
+    assert not hasattr(fact, "__dict__") and not hasattr(ResolverOutput("f", 1), "__dict__")
+    assert fact._notes is None and fact.notes == []
+    assert fact.provenance[0] is ResolverOutput(DemoFacts.FOO, "y", source="resolver.a").source
+
+    snapshot = fact.copy()
+    merge_outputs(ctx, [ResolverOutput(DemoFacts.FOO, "x", source="r2")])
+    snapshot.provenance.append("r3")
+
+    assert fact.provenance == ["resolver.a", "r2"]
+    assert snapshot.provenance == ("resolver.a", "r3")
+    assert snapshot != fact and snapshot.value == fact.value
+
+
+def test_parallel_forks_keep_their_own_provenance():
+    register_fact_schema(FactSchema(DemoFacts.FOO, py_type=str, description="foo"))
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for _ in range(100):
+            base = ResolutionContext()
+            merge_outputs(base, [ResolverOutput(DemoFacts.FOO, "same", source="base")])
+            forks = [base.fork() for _ in range(8)]
+            start = threading.Barrier(len(forks))
+
+            def merge(index):
+                start.wait()
+                merge_outputs(forks[index], [ResolverOutput(DemoFacts.FOO, "same", source=f"fork{index}")])
+
+            threads = [threading.Thread(target=merge, args=(index,)) for index in range(len(forks))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            assert base.state[DemoFacts.FOO].provenance == ["base"]
+            for index, fork in enumerate(forks):
+                assert fork.state[DemoFacts.FOO].provenance == ["base", f"fork{index}"]
+    finally:
+        sys.setswitchinterval(interval)
@@ -1,15 +1,22 @@
+import asyncio
+import threading
+import time
 from enum import Enum
 
 from resolver_engine.core.schema import FactSchema, FACT_SCHEMAS, register_fact_schema
-from resolver_engine.core.resolver_base import BaseResolver, ResolverSpec, ResolverOutput, RESOLVER_REGISTRY
+from resolver_engine.core.resolver_base import AsyncBaseResolver, BaseResolver, ResolverSpec, ResolverOutput, RESOLVER_REGISTRY
+from resolver_engine.core import planner as planner_module
 from resolver_engine.core.planner import Planner
 from resolver_engine.core.state import ResolutionContext
 from resolver_engine.core.merge import merge_outputs
+from resolver_engine.core.types import FactStatus
+from resolver_engine.core.cache.sqlite_cache import SQLiteCachePolicy
 
 
 class DemoFacts(str, Enum):
     FOO = "demo.foo"
     BAR = "demo.bar"
+    BAZ = "demo.baz"
 
 
 def setup_function(function):
@@ -157,3 +164,779 @@ def test_planner_uses_impact_and_cost_in_scheduling():
 
     assert result.executed_resolvers
     assert result.executed_resolvers[0] == "ExpensiveHighImpact"
+
+
+def test_incremental_planner_matches_scanning_order():
+    register_fact_schema(FactSchema(DemoFacts.FOO, py_type=str, description="foo"))
+    register_fact_schema(FactSchema(DemoFacts.BAR, py_type=str, description="bar"))
+
+    def make(name, inputs, output, cost):
+        @BaseResolver.register(
+            ResolverSpec(
+                name=name,
+                description=name,
+                input_facts=inputs,
+                output_facts={output},
+                cost=cost,
+                impact={output: 1.0},
+            )
+        )
+        class _Res(BaseResolver):
+            def run(self, ctx: ResolutionContext):
+                return [ResolverOutput(output, name)]
+
+    make("BarFromFoo", {DemoFacts.FOO}, DemoFacts.BAR, 1)
+    make("SlowFoo", set(), DemoFacts.FOO, 5)
+    make("FastFoo", set(), DemoFacts.FOO, 2)
+    make("TiedFoo", set(), DemoFacts.FOO, 2)
+
+    scanning = Planner(required_facts=set(), user_priority={}).run(ResolutionContext())
+    incremental = Planner(required_facts=set(), user_priority={}, incremental=True).run(
+        ResolutionContext()
+    )
+
+    assert scanning.executed_resolvers == ["FastFoo", "BarFromFoo", "TiedFoo", "SlowFoo"]
+    assert incremental.executed_resolvers == scanning.executed_resolvers
+
+
+def test_incremental_planner_respects_required_facts():
+    register_fact_schema(FactSchema(DemoFacts.FOO, py_type=str, description="foo"))
+    register_fact_schema(FactSchema(DemoFacts.BAR, py_type=str, description="bar"))
+
+    @BaseResolver.register(
+        ResolverSpec(
+            name="ResBar",
+            description="bar",
+            input_facts={DemoFacts.FOO},
+            output_facts={DemoFacts.BAR},
+            impact={DemoFacts.BAR: 1.0},
+        )
+    )
+    class ResBar(BaseResolver):
+        def run(self, ctx: ResolutionContext):
+            return [ResolverOutput(DemoFacts.BAR, ctx.state[DemoFacts.FOO].value + "bar")]
+
+    ctx = ResolutionContext()
+    merge_outputs(ctx, [ResolverOutput(DemoFacts.FOO, "foo")])
+    result = Planner(required_facts={DemoFacts.BAR}, user_priority={}, incremental=True).run(ctx)
+
+    assert result.executed_resolvers == ["ResBar"]
+    assert ctx.state[DemoFacts.BAR].value == "foobar"
+
+
+def test_planner_prunes_resolvers_that_cannot_reach_required_facts():
+    register_fact_schema(FactSchema(DemoFacts.FOO, py_type=str, description="foo"))
+    register_fact_schema(FactSchema(DemoFacts.BAR, py_type=str, description="bar"))
+
+    @BaseResolver.register(
+        ResolverSpec(
+            name="Unrelated",
+            description="high scoring but never leads to BAR",
+            input_facts=set(),
+            output_facts={DemoFacts.FOO},
+            impact={DemoFacts.FOO: 10.0},
+        )
+    )
+    class Unrelated(BaseResolver):
+        def run(self, ctx: ResolutionContext):
+            return [ResolverOutput(DemoFacts.FOO, "foo")]
+
+    @BaseResolver.register(
+        ResolverSpec(
+            name="ResBar",
+            description="bar",
+            input_facts=set(),
+            output_facts={DemoFacts.BAR},
+            impact={DemoFacts.BAR: 1.0},
+        )
+    )
+    class ResBar(BaseResolver):
+        def run(self, ctx: ResolutionContext):
+            return [ResolverOutput(DemoFacts.BAR, "bar")]
+
+    for incremental in (False, True):
+        ctx = ResolutionContext()
+        result = Planner(
+            required_facts={DemoFacts.BAR}, user_priority={}, incremental=incremental
+        ).run(ctx)
+
+        assert result.relevant_resolvers == ["ResBar"]
+        assert result.executed_resolvers == ["ResBar"]
+        assert DemoFacts.FOO not in ctx.state
+
+    unpruned = Planner(required_facts={DemoFacts.BAR}, user_priority={}, prune=False).run(
+        ResolutionContext()
+    )
+    assert unpruned.relevant_resolvers is None
+    assert unpruned.executed_resolvers == ["Unrelated", "ResBar"]
+
+
+def test_wave_planner_runs_independent_resolvers_concurrently():
+    for fact in DemoFacts:
+        register_fact_schema(FactSchema(fact, py_type=str, description=fact.value))
+    barrier = threading.Barrier(2, timeout=5)
+
+    def make(name, inputs, output, cost=1):
+        @BaseResolver.register(
+            ResolverSpec(
+                name=name,
+                description=name,
+                input_facts=inputs,
+                output_facts={output},
+                cost=cost,
+                impact={output: 1.0},
+            )
+        )
+        class _Res(BaseResolver):
+            def run(self, ctx: ResolutionContext):
+                if not inputs:
+                    # both root resolvers must be in flight at the same time
+                    barrier.wait()
+                return [ResolverOutput(output, name)]
+
+    make("MakeFoo", set(), DemoFacts.FOO)
+    make("MakeBar", set(), DemoFacts.BAR, cost=2)
+    make("MakeBaz", {DemoFacts.FOO, DemoFacts.BAR}, DemoFacts.BAZ)
+
+    for incremental in (False, True):
+        ctx = ResolutionContext()
+        result = Planner(
+            required_facts=set(), user_priority={}, incremental=incremental, max_workers=4
+        ).run(ctx)
+
+        assert result.waves == [["MakeFoo", "MakeBar"], ["MakeBaz"]]
+        assert result.executed_resolvers == ["MakeFoo", "MakeBar", "MakeBaz"]
+        assert ctx.state[DemoFacts.BAZ].value == "MakeBaz"
+
+
+def test_wave_planner_serializes_resolvers_sharing_facts():
+    register_fact_schema(
+        FactSchema(DemoFacts.FOO, py_type=str, description="foo", allow_ambiguity=True)
+    )
+
+    for name, cost in (("FooA", 1), ("FooB", 2)):
+
+        @BaseResolver.register(
+            ResolverSpec(
+                name=name,
+                description=name,
+                input_facts=set(),
+                output_facts={DemoFacts.FOO},
+                cost=cost,
+                impact={DemoFacts.FOO: 1.0},
+            )
+        )
+        class _Res(BaseResolver):
+            value = name
+
+            def run(self, ctx: ResolutionContext):
+                return [ResolverOutput(DemoFacts.FOO, self.value)]
+
+    ctx = ResolutionContext()
+    result = Planner(required_facts=set(), user_priority={}, max_workers=2).run(ctx)
+
+    assert result.waves == [["FooA"], ["FooB"]]
+    assert ctx.state[DemoFacts.FOO].value == ["FooA", "FooB"]
+
+
+def test_async_planner_awaits_async_and_threaded_sync_resolvers_together():
+    for fact in DemoFacts:
+        register_fact_schema(FactSchema(fact, py_type=str, description=fact.value))
+
+    async def scenario():
+        barrier = asyncio.Barrier(2)
+
+        @BaseResolver.register(
+            ResolverSpec(
+                name="AsyncFoo",
+                description="async",
+                input_facts=set(),
+                output_facts={DemoFacts.FOO},
+                impact={DemoFacts.FOO: 1.0},
+            )
+        )
+        class AsyncFoo(AsyncBaseResolver):
+            async def run(self, ctx: ResolutionContext):
+                await asyncio.wait_for(barrier.wait(), timeout=5)
+                return [ResolverOutput(DemoFacts.FOO, "foo")]
+
+        @BaseResolver.register(
+            ResolverSpec(
+                name="AsyncBar",
+                description="async",
+                input_facts=set(),
+                output_facts={DemoFacts.BAR},
+                impact={DemoFacts.BAR: 1.0},
+            )
+        )
+        class AsyncBar(AsyncBaseResolver):
+            async def run(self, ctx: ResolutionContext):
+                await asyncio.wait_for(barrier.wait(), timeout=5)
+                return [ResolverOutput(DemoFacts.BAR, "bar")]
+
+        @BaseResolver.register(
+            ResolverSpec(
+                name="SyncBaz",
+                description="sync",
+                input_facts={DemoFacts.FOO, DemoFacts.BAR},
+                output_facts={DemoFacts.BAZ},
+                impact={DemoFacts.BAZ: 1.0},
+            )
+        )
+        class SyncBaz(BaseResolver):
+            def run(self, ctx: ResolutionContext):
+                return [ResolverOutput(DemoFacts.BAZ, ctx.state[DemoFacts.FOO].value + "baz")]
+
+        ctx = ResolutionContext()
+        result = await Planner(required_facts={DemoFacts.BAZ}, user_priority={}).arun(ctx)
+        return ctx, result
+
+    ctx, result = asyncio.run(scenario())
+
+    assert result.waves == [["AsyncFoo", "AsyncBar"], ["SyncBaz"]]
+    assert ctx.state[DemoFacts.BAZ].value == "foobaz"
+
+
+def test_async_resolver_executes_from_synchronous_planner():
+    register_fact_schema(FactSchema(DemoFacts.FOO, py_type=str, description="foo"))
+
+    @BaseResolver.register(
+        ResolverSpec(
+            name="AsyncFoo",
+            description="async",
+            input_facts=set(),
+            output_facts={DemoFacts.FOO},
+            impact={DemoFacts.FOO: 1.0},
+        )
+    )
+    class AsyncFoo(AsyncBaseResolver):
+        async def run(self, ctx: ResolutionContext):
+            await asyncio.sleep(0)
+            return [ResolverOutput(DemoFacts.FOO, "foo")]
+
+    ctx = ResolutionContext()
+    result = Planner(required_facts={DemoFacts.FOO}, user_priority={}).run(ctx)
+
+    assert result.executed_resolvers == ["AsyncFoo"]
+    assert ctx.state[DemoFacts.FOO].value == "foo"
+
+
+def test_async_resolver_executes_synchronously_inside_a_running_loop():
+    register_fact_schema(FactSchema(DemoFacts.FOO, py_type=str, description="foo"))
+
+    @BaseResolver.register(
+        ResolverSpec(
+            name="AsyncFoo",
+            description="async",
+            input_facts=set(),
+            output_facts={DemoFacts.FOO},
+            impact={DemoFacts.FOO: 1.0},
+        )
+    )
+    class AsyncFoo(AsyncBaseResolver):
+        async def run(self, ctx: ResolutionContext):
+            await asyncio.sleep(0)
+            return [ResolverOutput(DemoFacts.FOO, "foo")]
+
+    async def caller():
+        ctx = ResolutionContext()
+        result = Planner(required_facts={DemoFacts.FOO}, user_priority={}).run(ctx)
+        batch = AsyncFoo().run_batch([ResolutionContext(), ResolutionContext()])
+        return ctx, result, batch
+
+    ctx, result, batch = asyncio.run(caller())
+
+    assert result.executed_resolvers == ["AsyncFoo"]
+    assert ctx.state[DemoFacts.FOO].value == "foo"
+    assert [[out.value for out in outputs] for outputs in batch] == [["foo"], ["foo"]]
+
+
+def _register_chain():
+    register_fact_schema(FactSchema(DemoFacts.FOO, py_type=str, description="foo"))
+    register_fact_schema(FactSchema(DemoFacts.BAR, py_type=str, description="bar"))
+    register_fact_schema(FactSchema(DemoFacts.BAZ, py_type=str, description="baz"))
+
+    @BaseResolver.register(
+        ResolverSpec(
+            name="ResBar",
+            description="bar",
+            input_facts={DemoFacts.FOO},
+            output_facts={DemoFacts.BAR},
+            impact={DemoFacts.BAR: 1.0},
+        )
+    )
+    class ResBar(BaseResolver):
+        def run(self, ctx: ResolutionContext):
+            foo = ctx.state[DemoFacts.FOO].value
+            if foo == "surprise":
+                return [ResolverOutput(DemoFacts.BAR, "bar"), ResolverOutput(DemoFacts.BAZ, "early")]
+            return [ResolverOutput(DemoFacts.BAR, foo + "bar")]
+
+    @BaseResolver.register(
+        ResolverSpec(
+            name="ResBaz",
+            description="baz",
+            input_facts={DemoFacts.BAR},
+            output_facts={DemoFacts.BAZ},
+            impact={DemoFacts.BAZ: 1.0},
+        )
+    )
+    class ResBaz(BaseResolver):
+        def run(self, ctx: ResolutionContext):
+            return [ResolverOutput(DemoFacts.BAZ, ctx.state[DemoFacts.BAR].value + "baz")]
+
+
+def test_plan_cache_reuses_compiled_plan_without_scoring(monkeypatch):
+    from resolver_engine.core.plan_cache import PlanCache
+
+    _register_chain()
+    cache = PlanCache(maxsize=4)
+
+    def resolve(value):
+        ctx = ResolutionContext()
+        merge_outputs(ctx, [ResolverOutput(DemoFacts.FOO, value)])
+        planner = Planner(required_facts={DemoFacts.BAZ}, user_priority={}, plan_cache=cache)
+        return ctx, planner.run(ctx)
+
+    _, first = resolve("a")
+    assert first.executed_resolvers == ["ResBar", "ResBaz"]
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    def fail_scoring(self, resolver):
+        raise AssertionError("hot plans should not be re-scored")
+
+    monkeypatch.setattr(Planner, "_score_resolver", fail_scoring)
+    ctx, second = resolve("b")
+
+    assert second.executed_resolvers == ["ResBar", "ResBaz"]
+    assert ctx.state[DemoFacts.BAZ].value == "bbarbaz"
+    assert cache.hits == 1
+
+
+def test_plan_cache_invalidated_when_registry_changes():
+    from resolver_engine.core.plan_cache import PlanCache
+
+    _register_chain()
+    cache = PlanCache()
+    planner = Planner(required_facts={DemoFacts.BAZ}, user_priority={}, plan_cache=cache)
+    ctx = ResolutionContext()
+    merge_outputs(ctx, [ResolverOutput(DemoFacts.FOO, "a")])
+    planner.run(ctx)
+    assert len(cache) == 1
+
+    RESOLVER_REGISTRY.pop("ResBaz")
+
+    assert cache.get(planner._plan_key(ctx, staged=False)) is None
+    assert len(cache) == 0
+
+
+def test_plan_cache_falls_back_to_dynamic_planning_on_unexpected_outputs():
+    from resolver_engine.core.plan_cache import PlanCache
+
+    _register_chain()
+    cache = PlanCache()
+    ctx = ResolutionContext()
+    merge_outputs(ctx, [ResolverOutput(DemoFacts.FOO, "surprise")])
+
+    result = Planner(required_facts={DemoFacts.BAZ}, user_priority={}, plan_cache=cache).run(ctx)
+
+    # ResBar also produced BAZ, so the plan's second stage is skipped
+    assert result.executed_resolvers == ["ResBar"]
+    assert ctx.state[DemoFacts.BAZ].value == "early"
+
+
+def _register_expensive_shortcut():
+    for fact in DemoFacts:
+        register_fact_schema(FactSchema(fact, py_type=str, description=fact.value))
+
+    def make(name, inputs, output, cost, impact):
+        @BaseResolver.register(
+            ResolverSpec(
+                name=name,
+                description=name,
+                input_facts=inputs,
+                output_facts={output},
+                cost=cost,
+                impact={output: impact},
+            )
+        )
+        class _Res(BaseResolver):
+            def run(self, ctx: ResolutionContext):
+                return [ResolverOutput(output, name)]
+
+    make("Shortcut", set(), DemoFacts.BAZ, 10, 5.0)
+    make("MakeFoo", set(), DemoFacts.FOO, 2, 0.5)
+    make("FooToBaz", {DemoFacts.FOO}, DemoFacts.BAZ, 2, 0.5)
+
+
+def test_optimal_planner_finds_cheapest_covering_resolvers():
+    _register_expensive_shortcut()
+
+    greedy = Planner(required_facts={DemoFacts.BAZ}, user_priority={})
+    optimal = Planner(required_facts={DemoFacts.BAZ}, user_priority={}, optimal=True)
+
+    assert greedy.compile_plan(set()).estimated_cost == 10
+    plan = optimal.compile_plan(set())
+    assert plan.stages == (("MakeFoo",), ("FooToBaz",))
+    assert plan.estimated_cost == 4
+
+    ctx = ResolutionContext()
+    result = optimal.run(ctx)
+    assert result.executed_resolvers == ["MakeFoo", "FooToBaz"]
+    assert ctx.state[DemoFacts.BAZ].value == "FooToBaz"
+
+
+def test_optimal_planner_falls_back_to_greedy_when_search_budget_exhausted():
+    _register_expensive_shortcut()
+
+    planner = Planner(required_facts={DemoFacts.BAZ}, user_priority={}, optimal=True, max_expansions=0)
+
+    assert planner.compile_plan(set()).stages == (("Shortcut",),)
+
+
+def _register_slow_and_fast(sleep_s, timeout_ms=None, slow_cost=1):
+    import time
+
+    register_fact_schema(FactSchema(DemoFacts.FOO, py_type=str, description="foo"))
+    register_fact_schema(FactSchema(DemoFacts.BAR, py_type=str, description="bar"))
+
+    @BaseResolver.register(
+        ResolverSpec(
+            name="SlowFoo",
+            description="slow",
+            input_facts=set(),
+            output_facts={DemoFacts.FOO},
+            cost=slow_cost,
+            impact={DemoFacts.FOO: 1.0},
+            timeout_ms=timeout_ms,
+        )
+    )
+    class SlowFoo(BaseResolver):
+        def run(self, ctx: ResolutionContext):
+            time.sleep(sleep_s)
+            return [ResolverOutput(DemoFacts.FOO, "slow")]
+
+    @BaseResolver.register(
+        ResolverSpec(
+            name="FastBar",
+            description="fast",
+            input_facts=set(),
+            output_facts={DemoFacts.BAR},
+            cost=2,
+            impact={DemoFacts.BAR: 1.0},
+        )
+    )
+    class FastBar(BaseResolver):
+        def run(self, ctx: ResolutionContext):
+            return [ResolverOutput(DemoFacts.BAR, "fast")]
+
+
+def test_resolver_timeout_abandons_overrun_and_reports_unresolved_facts():
+    _register_slow_and_fast(sleep_s=0.5, timeout_ms=20)
+
+    ctx = ResolutionContext()
+    result = Planner(required_facts=set(), user_priority={}).run(ctx)
+
+    assert result.timed_out_resolvers == ["SlowFoo"]
+    assert result.executed_resolvers == ["FastBar"]
+    assert result.unresolved_facts == [DemoFacts.FOO]
+    assert DemoFacts.FOO not in ctx.state
+
+
+def test_deadline_skips_resolvers_estimated_over_budget():
+    _register_slow_and_fast(sleep_s=0, slow_cost=500)
+
+    ctx = ResolutionContext()
+    result = Planner(required_facts=set(), user_priority={}, deadline_ms=100).run(ctx)
+
+    assert result.skipped_resolvers == ["SlowFoo"]
+    assert result.executed_resolvers == ["FastBar"]
+    assert result.unresolved_facts == [DemoFacts.FOO]
+
+
+def test_deadline_reports_required_facts_downstream_of_skipped_resolvers():
+    for fid in DemoFacts:
+        register_fact_schema(FactSchema(fid, py_type=str, description=fid.value))
+
+    def chain(name, inputs, output, cost):
+        @BaseResolver.register(
+            ResolverSpec(
+                name=name,
+                description=name,
+                input_facts=inputs,
+                output_facts={output},
+                cost=cost,
+                impact={output: 1.0},
+            )
+        )
+        class Link(BaseResolver):
+            def run(self, ctx: ResolutionContext):
+                return [ResolverOutput(output, name)]
+
+    chain("RA", set(), DemoFacts.FOO, 1)
+    chain("RB", {DemoFacts.FOO}, DemoFacts.BAR, 10_000)
+    chain("RC", {DemoFacts.BAR}, DemoFacts.BAZ, 1)
+
+    ctx = ResolutionContext()
+    result = Planner(required_facts={DemoFacts.BAZ}, user_priority={}, deadline_ms=60).run(ctx)
+
+    assert result.executed_resolvers == ["RA"]
+    assert result.skipped_resolvers == ["RB"]
+    assert result.unresolved_facts == [DemoFacts.BAR, DemoFacts.BAZ]
+
+
+def test_async_planner_cancels_resolvers_past_the_deadline():
+    register_fact_schema(FactSchema(DemoFacts.FOO, py_type=str, description="foo"))
+    cancelled = []
+
+    @BaseResolver.register(
+        ResolverSpec(
+            name="HangingFoo",
+            description="never finishes in time",
+            input_facts=set(),
+            output_facts={DemoFacts.FOO},
+            impact={DemoFacts.FOO: 1.0},
+        )
+    )
+    class HangingFoo(AsyncBaseResolver):
+        async def run(self, ctx: ResolutionContext):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+            return [ResolverOutput(DemoFacts.FOO, "late")]
+
+    ctx = ResolutionContext()
+    result = asyncio.run(
+        Planner(required_facts={DemoFacts.FOO}, user_priority={}, deadline_ms=30).arun(ctx)
+    )
+
+    assert cancelled == [True]
+    assert result.timed_out_resolvers == ["HangingFoo"]
+    assert result.unresolved_facts == [DemoFacts.FOO]
+
+
+def test_iter_run_yields_facts_before_later_resolvers_finish():
+    register_fact_schema(FactSchema(DemoFacts.FOO, py_type=str, description="foo"))
+    register_fact_schema(FactSchema(DemoFacts.BAR, py_type=str, description="bar"))
+    released = threading.Event()
+
+    @BaseResolver.register(
+        ResolverSpec(
+            name="FastFoo",
+            description="foo",
+            input_facts=set(),
+            output_facts={DemoFacts.FOO},
+            impact={DemoFacts.FOO: 1.0},
+        )
+    )
+    class FastFoo(BaseResolver):
+        def run(self, ctx: ResolutionContext):
+            return [ResolverOutput(DemoFacts.FOO, "foo", source="fast")]
+
+    @BaseResolver.register(
+        ResolverSpec(
+            name="BlockedBar",
+            description="bar waits until the first fact was consumed",
+            input_facts={DemoFacts.FOO},
+            output_facts={DemoFacts.BAR},
+            impact={DemoFacts.BAR: 1.0},
+        )
+    )
+    class BlockedBar(BaseResolver):
+        def run(self, ctx: ResolutionContext):
+            assert released.wait(timeout=5)
+            return [ResolverOutput(DemoFacts.BAR, "bar", source="blocked")]
+
+    ctx = ResolutionContext()
+    stream = Planner(required_facts={DemoFacts.BAR}, user_priority={}).iter_run(ctx)
+
+    first = next(stream)
+    assert (first.fact_id, first.value.value, first.value.provenance, first.resolver) == (
+        DemoFacts.FOO,
+        "foo",
+        ["fast"],
+        "FastFoo",
+    )
+    assert DemoFacts.BAR not in ctx.state
+
+    released.set()
+    second = next(stream)
+    assert (second.fact_id, second.resolver) == (DemoFacts.BAR, "BlockedBar")
+    try:
+        next(stream)
+    except StopIteration as stop:
+        result = stop.value
+    assert result.executed_resolvers == ["FastFoo", "BlockedBar"]
+
+
+def test_generator_outputs_unlock_consumers_before_the_producer_finishes(tmp_path):
+    register_fact_schema(FactSchema(DemoFacts.FOO, py_type=str, description="foo"))
+    register_fact_schema(FactSchema(DemoFacts.BAR, py_type=str, description="bar"))
+    register_fact_schema(FactSchema(DemoFacts.BAZ, py_type=str, description="baz"))
+    consumed = threading.Event()
+    cache = SQLiteCachePolicy(db_path=tmp_path / "cache.db")
+
+    @BaseResolver.register(
+        ResolverSpec(
+            name="SlowProducer",
+            description="yields foo, then waits for its consumer before yielding bar",
+            input_facts=set(),
+            output_facts={DemoFacts.FOO, DemoFacts.BAR},
+            impact={DemoFacts.FOO: 1.0, DemoFacts.BAR: 1.0},
+            cache_policy=cache,
+        )
+    )
+    class SlowProducer(BaseResolver):
+        def run(self, ctx: ResolutionContext):
+            yield ResolverOutput(DemoFacts.FOO, "foo")
+            assert consumed.wait(timeout=5)
+            yield ResolverOutput(DemoFacts.BAR, "bar")
+
+    @BaseResolver.register(
+        ResolverSpec(
+            name="FooConsumer",
+            description="needs only foo",
+            input_facts={DemoFacts.FOO},
+            output_facts={DemoFacts.BAZ},
+            impact={DemoFacts.BAZ: 1.0},
+        )
+    )
+    class FooConsumer(BaseResolver):
+        def run(self, ctx: ResolutionContext):
+            consumed.set()
+            return [ResolverOutput(DemoFacts.BAZ, ctx.state[DemoFacts.FOO].value + "baz")]
+
+    ctx = ResolutionContext()
+    result = Planner(required_facts={DemoFacts.BAR, DemoFacts.BAZ}, user_priority={}, pipeline=True).run(ctx)
+
+    assert result.executed_resolvers == ["FooConsumer", "SlowProducer"]
+    assert ctx.state[DemoFacts.BAZ].value == "foobaz"
+    assert ctx.state[DemoFacts.BAR].value == "bar"
+    cached = cache.fetch(cache.build_cache_key(ResolutionContext(), SlowProducer.spec))
+    assert [output.value for output in cached] == ["foo", "bar"]
+
+
+def test_streaming_producers_claim_their_outputs_until_they_finish():
+    register_fact_schema(FactSchema(DemoFacts.FOO, py_type=int, description="foo"))
+    register_fact_schema(FactSchema(DemoFacts.BAR, py_type=int, description="bar"))
+
+    def producer(name, cost, value, delay):
+        @BaseResolver.register(
+            ResolverSpec(
+                name=name,
+                description="streams foo",
+                input_facts=set(),
+                output_facts={DemoFacts.FOO},
+                impact={DemoFacts.FOO: 1.0},
+                cost=cost,
+            )
+        )
+        class Producer(BaseResolver):
+            def run(self, ctx: ResolutionContext):
+                time.sleep(delay)
+                yield ResolverOutput(DemoFacts.FOO, value)
+
+    # the cheap producer is slow to yield, leaving room to start anything else meanwhile
+    producer("A", 1, 1, 0.2)
+    producer("B", 5, 2, 0)
+
+    @BaseResolver.register(
+        ResolverSpec(
+            name="Unrelated",
+            description="cheap but not needed once foo lands",
+            input_facts=set(),
+            output_facts={DemoFacts.BAR},
+            impact={DemoFacts.BAR: 0.1},
+            cost=1,
+        )
+    )
+    class Unrelated(BaseResolver):
+        def run(self, ctx: ResolutionContext):
+            return [ResolverOutput(DemoFacts.BAR, 1)]
+
+    ctx = ResolutionContext()
+    result = Planner(required_facts={DemoFacts.FOO}, user_priority={}, pipeline=True).run(ctx)
+
+    assert result.executed_resolvers == ["A"]
+    assert ctx.state[DemoFacts.FOO].status is FactStatus.SOLID
+    assert ctx.state[DemoFacts.FOO].value == 1
+
+
+def test_cache_connections_are_released_with_planner_threads(tmp_path):
+    register_fact_schema(FactSchema(DemoFacts.FOO, py_type=str, description="foo"))
+    register_fact_schema(FactSchema(DemoFacts.BAR, py_type=str, description="bar"))
+    cache = SQLiteCachePolicy(db_path=tmp_path / "cache.db")
+
+    @BaseResolver.register(
+        ResolverSpec(
+            name="StreamBar",
+            description="cached generator",
+            input_facts={DemoFacts.FOO},
+            output_facts={DemoFacts.BAR},
+            impact={DemoFacts.BAR: 1.0},
+            cache_policy=cache,
+        )
+    )
+    class StreamBar(BaseResolver):
+        def run(self, ctx: ResolutionContext):
+            yield ResolverOutput(DemoFacts.BAR, ctx.state[DemoFacts.FOO].value + "bar")
+
+    for index in range(60):
+        for streamed in (False, True):
+            ctx = ResolutionContext()
+            merge_outputs(ctx, [ResolverOutput(DemoFacts.FOO, str(index % 3))])
+            planner = Planner(required_facts={DemoFacts.BAR}, user_priority={})
+            if streamed:
+                list(planner.iter_run(ctx))
+            else:
+                planner.run(ctx)
+            assert ctx.state[DemoFacts.BAR].value == f"{index % 3}bar"
+
+    assert len(cache._connections) <= 3
+    cache.close()
+
+
+def test_generator_resolvers_do_not_grow_threads_or_connections(tmp_path):
+    register_fact_schema(FactSchema(DemoFacts.FOO, py_type=str, description="foo"))
+    register_fact_schema(FactSchema(DemoFacts.BAR, py_type=str, description="bar"))
+    cache = SQLiteCachePolicy(db_path=tmp_path / "cache.db")
+    threads = []
+
+    @BaseResolver.register(
+        ResolverSpec(
+            name="StreamBar",
+            description="cached generator",
+            input_facts={DemoFacts.FOO},
+            output_facts={DemoFacts.BAR},
+            impact={DemoFacts.BAR: 1.0},
+            cache_policy=cache,
+        )
+    )
+    class StreamBar(BaseResolver):
+        def run(self, ctx: ResolutionContext):
+            threads.append(threading.current_thread())
+            yield ResolverOutput(DemoFacts.BAR, ctx.state[DemoFacts.FOO].value + "bar")
+
+    def resolve(index, pipeline):
+        ctx = ResolutionContext()
+        merge_outputs(ctx, [ResolverOutput(DemoFacts.FOO, str(index))])
+        Planner(required_facts={DemoFacts.BAR}, user_priority={}, pipeline=pipeline).run(ctx)
+        assert ctx.state[DemoFacts.BAR].value == f"{index}bar"
+
+    # sequential by default: generators run on the planner thread
+    for index in range(20):
+        resolve(index, pipeline=False)
+    assert set(threads) == {threading.main_thread()}
+
+    for index in range(20, 120):
+        resolve(index, pipeline=True)
+    before = threading.active_count()
+    for index in range(120, 220):
+        resolve(index, pipeline=True)
+
+    assert threading.active_count() == before
+    assert len(set(threads)) <= 1 + planner_module.PRODUCER_WORKERS
+    assert len(cache._connections) <= 1 + planner_module.PRODUCER_WORKERS
+    cache.close()
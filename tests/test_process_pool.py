@@ -0,0 +1,78 @@
+import os
+from enum import Enum
+
+from resolver_engine.core.batch import BatchPlanner
+from resolver_engine.core.merge import merge_outputs
+from resolver_engine.core.planner import Planner
+from resolver_engine.core.process_pool import configure_process_pool, shutdown_process_pool
+from resolver_engine.core.resolver_base import BaseResolver, ResolverSpec, ResolverOutput, RESOLVER_REGISTRY
+from resolver_engine.core.schema import FACT_SCHEMAS, FactSchema, register_fact_schema
+from resolver_engine.core.state import ResolutionContext
+
+
+class DemoFacts(str, Enum):
+    NUMBER = "demo.number"
+    SQUARE = "demo.square"
+
+
+def register_square_resolver():
+    if "SquareResolver" in RESOLVER_REGISTRY:
+        return
+
+    @BaseResolver.register(
+        ResolverSpec(
+            name="SquareResolver",
+            description="CPU-bound work shipped to a worker process",
+            input_facts={DemoFacts.NUMBER},
+            output_facts={DemoFacts.SQUARE},
+            impact={DemoFacts.SQUARE: 1.0},
+            executor="process",
+        )
+    )
+    class SquareResolver(BaseResolver):
+        def run(self, ctx: ResolutionContext):
+            number = ctx.state[DemoFacts.NUMBER].value
+            return [ResolverOutput(DemoFacts.SQUARE, number * number, source=f"pid-{os.getpid()}")]
+
+
+def setup_module(module):
+    configure_process_pool(initializers=[f"{__name__}:register_square_resolver"], max_workers=1)
+
+
+def teardown_module(module):
+    shutdown_process_pool()
+
+
+def setup_function(function):
+    FACT_SCHEMAS.clear()
+    RESOLVER_REGISTRY.clear()
+    register_fact_schema(FactSchema(DemoFacts.NUMBER, py_type=int, description="number"))
+    register_fact_schema(FactSchema(DemoFacts.SQUARE, py_type=int, description="square"))
+    register_square_resolver()
+
+
+def _context(number):
+    ctx = ResolutionContext()
+    merge_outputs(ctx, [ResolverOutput(DemoFacts.NUMBER, number, source="input")])
+    return ctx
+
+
+def test_process_executor_runs_resolver_in_worker_process():
+    ctx = _context(7)
+
+    Planner(required_facts={DemoFacts.SQUARE}, user_priority={}).run(ctx)
+
+    fact = ctx.state[DemoFacts.SQUARE]
+    assert fact.value == 49
+    assert fact.provenance[0].startswith("pid-")
+    assert fact.provenance[0] != f"pid-{os.getpid()}"
+
+
+def test_process_executor_ships_batches_in_one_call():
+    contexts = [_context(number) for number in (2, 3, 4)]
+
+    BatchPlanner(required_facts={DemoFacts.SQUARE}, user_priority={}).run(contexts)
+
+    assert [ctx.state[DemoFacts.SQUARE].value for ctx in contexts] == [4, 9, 16]
+    # the single worker process served every row of the batch
+    assert len({ctx.state[DemoFacts.SQUARE].provenance[0] for ctx in contexts}) == 1
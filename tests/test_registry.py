@@ -0,0 +1,109 @@
+from enum import Enum
+
+import pytest
+
+from resolver_engine.core.merge import merge_outputs
+from resolver_engine.core.plan_cache import PlanCache
+from resolver_engine.core.planner import Planner
+from resolver_engine.core.registry import Registry
+from resolver_engine.core.resolver_base import RESOLVER_REGISTRY, BaseResolver, ResolverOutput, ResolverSpec
+from resolver_engine.core.schema import FACT_SCHEMAS, FactSchema, register_fact_schema
+from resolver_engine.core.state import ResolutionContext
+
+
+class DemoFacts(str, Enum):
+    FOO = "demo.foo"
+    BAR = "demo.bar"
+
+
+def setup_function(function):
+    FACT_SCHEMAS.clear()
+    RESOLVER_REGISTRY.clear()
+
+
+def _tenant(suffix):
+    registry = Registry()
+    registry.add_schema(FactSchema(DemoFacts.FOO, py_type=str, description="foo"))
+    registry.add_schema(FactSchema(DemoFacts.BAR, py_type=str, description="bar"))
+
+    @registry.register(
+        ResolverSpec(
+            name="BarFromFoo",
+            description="bar",
+            input_facts={DemoFacts.FOO},
+            output_facts={DemoFacts.BAR},
+            impact={DemoFacts.BAR: 1.0},
+        )
+    )
+    class BarFromFoo(BaseResolver):
+        def run(self, ctx: ResolutionContext):
+            return [ResolverOutput(DemoFacts.BAR, ctx.state[DemoFacts.FOO].value + suffix)]
+
+    return registry
+
+
+def test_compiled_snapshot_interns_facts_and_precomputes_adjacency():
+    snapshot = _tenant("!").compile()
+
+    assert snapshot.fact_ids == (DemoFacts.FOO, DemoFacts.BAR)
+    assert snapshot.fact_index[DemoFacts.BAR] == 1
+    assert snapshot.resolver_inputs["BarFromFoo"] == frozenset({0})
+    assert snapshot.producers_of(DemoFacts.BAR) == ("BarFromFoo",)
+    assert snapshot.consumers_of(DemoFacts.FOO) == ("BarFromFoo",)
+    assert snapshot.resolve_fact_id("demo.bar") is DemoFacts.BAR
+    assert snapshot.resolve_fact_id("unknown") == "unknown"
+    with pytest.raises(TypeError):
+        snapshot.resolvers["Other"] = snapshot.resolvers["BarFromFoo"]  # type: ignore[index]
+
+
+def test_planners_on_separate_snapshots_ignore_globals_and_each_other():
+    first = _tenant("!").compile()
+    second_registry = _tenant("?")
+    second = second_registry.compile()
+    # neither later registry changes nor the globals leak into compiled snapshots
+    second_registry.resolvers.clear()
+    assert not RESOLVER_REGISTRY and not FACT_SCHEMAS
+
+    values = []
+    for snapshot in (first, second):
+        ctx = ResolutionContext()
+        merge_outputs(ctx, [ResolverOutput(DemoFacts.FOO, "foo")], snapshot.schemas)
+        result = Planner(required_facts={DemoFacts.BAR}, user_priority={}, registry=snapshot).run(ctx)
+        assert result.executed_resolvers == ["BarFromFoo"]
+        values.append(ctx.state[DemoFacts.BAR].value)
+
+    assert values == ["foo!", "foo?"]
+
+
+def test_snapshot_plans_survive_global_registrations():
+    snapshot = _tenant("!").compile()
+    cache = PlanCache()
+    planner = Planner(required_facts={DemoFacts.BAR}, user_priority={}, registry=snapshot, plan_cache=cache)
+
+    def run():
+        ctx = ResolutionContext()
+        merge_outputs(ctx, [ResolverOutput(DemoFacts.FOO, "foo")], snapshot.schemas)
+        return planner.run(ctx)
+
+    run()
+    # another tenant registering globally must not drop this snapshot's plans
+    @BaseResolver.register(
+        ResolverSpec(name="Other", description="other", input_facts=set(), output_facts={DemoFacts.FOO}, impact={})
+    )
+    class Other(BaseResolver):
+        def run(self, ctx: ResolutionContext):
+            return []
+
+    assert run().executed_resolvers == ["BarFromFoo"]
+    assert cache.hits == 1 and len(cache) == 1
+
+
+def test_registry_from_globals_copies_current_registrations():
+    register_fact_schema(FactSchema(DemoFacts.FOO, py_type=str, description="foo"))
+
+    registry = Registry.from_globals()
+    FACT_SCHEMAS.clear()
+
+    assert list(registry.compile().schemas) == [DemoFacts.FOO]
+    with pytest.raises(ValueError):
+        registry.add_schema(FactSchema(DemoFacts.FOO, py_type=str, description="again"))